@@ -1,6 +1,10 @@
 import contextlib
+import hashlib
 import os
 import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from importlib import metadata
 from pathlib import Path
 
@@ -28,6 +32,122 @@ def get_project_root_path() -> Path:
 # path fixtures
 
 
+# http server fixtures
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    """Serve files in the server directory with ETag and Last-Modified
+    headers and support conditional and range requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.clients.append(self.client_address)
+        if server.errors:
+            status = server.errors.pop(0)
+            server.requests.append((self.path, status, dict(self.headers)))
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        fpth = Path(server.directory) / self.path.lstrip("/")
+        if not fpth.is_file():
+            server.requests.append((self.path, 404, dict(self.headers)))
+            self.send_error(404)
+            return
+        data = fpth.read_bytes()
+        mtime = int(fpth.stat().st_mtime)
+        etag = f'"{hashlib.sha256(data).hexdigest()}"'
+        last_modified = formatdate(mtime, usegmt=True)
+
+        # evaluate conditional request headers
+        not_modified = False
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None and server.etag:
+            not_modified = if_none_match == etag
+        elif if_modified_since is not None:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+            not_modified = mtime <= since
+
+        # evaluate range request headers
+        start = 0
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if server.ranges and range_header is not None and not not_modified:
+            match = re.fullmatch(r"bytes=(\d+)-", range_header)
+            if match is not None and int(match.group(1)) < len(data):
+                if if_range is None or if_range in (etag, last_modified):
+                    start = int(match.group(1))
+
+        if not_modified:
+            status = 304
+        elif start > 0:
+            status = 206
+        else:
+            status = 200
+        server.requests.append((self.path, status, dict(self.headers)))
+        self.send_response(status)
+        if server.etag:
+            self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        if server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if not_modified:
+            self.end_headers()
+            return
+        if status == 206:
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        # break the connection after part of the file has been sent
+        if server.fail_after is not None:
+            self.wfile.write(body[: server.fail_after])
+            server.fail_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Local http server that serves the files in server.directory. The url
+    of the server is server.url and each request is recorded in
+    server.requests as a tuple with the path, status code, and request
+    headers. ETag headers are not returned if server.etag is False and range
+    requests are not supported if server.ranges is False. The connection is
+    broken after server.fail_after bytes of the next response are sent if
+    server.fail_after is not None. The status codes in server.errors are
+    returned, in order, before files are served and the client address of
+    each request is recorded in server.clients."""
+    directory = tmp_path / "http_server"
+    directory.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileRequestHandler)
+    server.directory = directory
+    server.requests = []
+    server.etag = True
+    server.ranges = True
+    server.fail_after = None
+    server.errors = []
+    server.clients = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
 # pytest configuration hooks
 
 
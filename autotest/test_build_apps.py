@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake import pymake_build_apps
+from pymake.cmds import build as make_program
+from pymake.utils import _download_planner
+from pymake.utils._download_planner import _DownloadPlanner
+from pymake.utils._process_runner import _get_active_job_budget
+from pymake.utils.usgsprograms import usgs_program_data
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Replace downloads with a function that creates the extracted
+    directory of the archive and records every url that is downloaded."""
+    lock = threading.Lock()
+    urls = []
+
+    def download_and_unzip(url, pth="./", verify=True, timeout=30, verbose=False):
+        with lock:
+            urls.append(url)
+        time.sleep(0.1)
+        for target in usgs_program_data.get_keys():
+            prog_dict = usgs_program_data.get_target(target)
+            if prog_dict.url == url:
+                dirname = Path(pth) / prog_dict.dirname
+                dirname.mkdir(parents=True, exist_ok=True)
+                break
+        return True
+
+    monkeypatch.setattr(_download_planner, "download_and_unzip", download_and_unzip)
+    return urls
+
+
+@pytest.mark.base
+def test_download_planner(function_tmpdir, downloads):
+    mf6 = usgs_program_data.get_target("mf6")
+    mf2005 = usgs_program_data.get_target("mf2005")
+    with set_dir(function_tmpdir):
+        with _DownloadPlanner(["mf6", "zbud6", "mf2005", "libmf6"], "temp") as planner:
+            mf6_dir = planner.wait("zbud6")
+            assert mf6_dir == os.path.join("temp", mf6.dirname)
+            assert os.path.isdir(mf6_dir)
+            assert planner.wait("mf2005") == os.path.join("temp", mf2005.dirname)
+
+            # each unique archive is downloaded once
+            assert sorted(downloads) == sorted([mf6.url, mf2005.url])
+
+            # the extracted archive is kept until the last target that needs
+            # it is released
+            assert not planner.release("mf6")
+            assert not planner.release("zbud6")
+            assert os.path.isdir(mf6_dir)
+            assert planner.release("libmf6")
+            assert not os.path.isdir(mf6_dir)
+            assert planner.release("mf2005")
+    assert sorted(downloads) == sorted([mf6.url, mf2005.url])
+
+
+@pytest.mark.base
+def test_build_apps_parallel(function_tmpdir, monkeypatch, downloads, capsys):
+    monkeypatch.setattr("sys.argv", ["pytest"])
+    lock = threading.Lock()
+    running = []
+    concurrent = []
+    calls = {}
+
+    def build_target(
+        pmobj, target, idt, initial, download_dir, double, profile, planner
+    ):
+        planner.wait(target)
+        with lock:
+            running.append(target)
+            concurrent.append(len(running))
+            calls[target] = (download_dir, _get_active_job_budget().jobs, running[:])
+        time.sleep(0.2)
+        with lock:
+            running.remove(target)
+        planner.release(target)
+        if target == "mf2005":
+            raise FileNotFoundError(f"could not build {target}")
+        pmobj.build_targets.append(os.path.abspath(target))
+        return 0
+
+    monkeypatch.setattr(pymake_build_apps, "_build_target", build_target)
+
+    pm = pymake.Pymake()
+    pm.jobs = 4
+    targets = ["mf6", "mf2005", "zbud6", "mfnwt", "triangle"]
+    with set_dir(function_tmpdir):
+        with pytest.raises(FileNotFoundError, match="mf2005"):
+            pymake.build_apps(targets, pymake_object=pm, parallel=3)
+
+    # targets are built at the same time using a shared job budget and each
+    # unique archive is downloaded once
+    assert max(concurrent) == 3
+    assert len(downloads) == 4
+    for download_dir, jobs, _ in calls.values():
+        assert download_dir == "temp"
+        assert jobs == 4
+    assert _get_active_job_budget() is None
+
+    # targets built from the same archive are not built at the same time
+    assert "mf6" not in calls["zbud6"][2]
+
+    # targets that did not fail are built and every failure is reported
+    assert [os.path.basename(fpth) for fpth in pm.build_targets] == [
+        "mf6",
+        "zbud6",
+        "mfnwt",
+        "triangle",
+    ]
+    assert pm.returncode == 1
+    out = capsys.readouterr().out
+    assert "1 of 5 targets failed to build" in out
+    assert "mf2005: could not build mf2005" in out
+
+
+@pytest.mark.base
+def test_build_apps_shared_download(function_tmpdir, monkeypatch, downloads):
+    monkeypatch.setattr("sys.argv", ["pytest"])
+    builds = []
+
+    def build(self, target=None, srcdir=None, modify_exe_name=False):
+        builds.append((self.target, self.download, os.path.isdir(self.download_dir)))
+        self.update_build_targets()
+        return 0
+
+    monkeypatch.setattr(pymake.Pymake, "build", build)
+
+    with set_dir(function_tmpdir):
+        pm = pymake.Pymake()
+        returncode = pymake.build_apps(
+            ["mf6", "mf2005", "zbud6"], pymake_object=pm, double=True
+        )
+        assert returncode == 0
+
+        # the mf6 archive is downloaded once and kept until zbud6 is built
+        assert len(downloads) == 2
+        assert [(download, exists) for _, download, exists in builds] == [
+            (None, True),
+            (None, True),
+            (None, True),
+        ]
+        assert not any(Path("temp").iterdir())
+
+
+@pytest.mark.base
+def test_make_program_parallel_option(monkeypatch):
+    calls = []
+
+    def build_apps(**kwargs):
+        calls.append((kwargs, list(sys.argv)))
+        return 0
+
+    monkeypatch.setattr(make_program, "build_apps", build_apps)
+    monkeypatch.setattr(
+        "sys.argv",
+        ["make-program", "mf6,mf2005", "--parallel", "3", "--jobs", "3"],
+    )
+    make_program.main()
+
+    # the number of targets built at the same time is an integer and only the
+    # arguments used by make-program are removed from the command line
+    kwargs, argv = calls[0]
+    assert kwargs["parallel"] == 3
+    assert kwargs["targets"] == "mf6,mf2005"
+    assert argv == ["make-program", "--jobs", "3"]
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake.utils import _build_profile
+from pymake.utils._build_profile import _BuildProfile, _profile_step
+from pymake.utils._compile_scheduler import _CompileJob, _run_compile_job
+from pymake.utils._process_runner import _ProcessRunner
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "util.f90": """\
+        module UtilModule
+          use KindModule, only: DP
+          implicit none
+        contains
+          function twice(x) result(y)
+            real(DP), intent(in) :: x
+            real(DP) :: y
+            y = 2.0_DP * x
+          end function twice
+        end module UtilModule
+        """,
+    "main.f90": """\
+        program main
+          use KindModule, only: DP
+          use UtilModule, only: twice
+          implicit none
+          write(*,*) twice(2.0_DP)
+        end program main
+        """,
+}
+
+requires_gfortran = pytest.mark.skipif(
+    shutil.which("gfortran") is None, reason="gfortran is not available"
+)
+
+
+@pytest.mark.base
+def test_build_profile_trace(function_tmpdir, monkeypatch, capsys):
+    profile = _BuildProfile(str(function_tmpdir / "profile.json"))
+    monkeypatch.setattr(_build_profile, "_ACTIVE_PROFILE", profile)
+
+    # overlapping compile steps are written to separate lanes
+    profile.add("a.f90", "compile", 0.0, 2.0, returncode=0, output_size=10)
+    profile.add("b.f90", "compile", 0.5, 1.0, returncode=0)
+    profile.add("c.f90", "compile", 1.5, 3.0, returncode=1)
+    profile.add("app", "link", 3.0, 3.5)
+    with _profile_step("src", "patch") as step:
+        step["output_size"] = 5
+
+    profile.write_trace()
+    with open(function_tmpdir / "profile.json") as f:
+        trace = json.load(f)
+    events = {
+        event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"
+    }
+    assert events["a.f90"]["tid"] == 1
+    assert events["b.f90"]["tid"] == 2
+    assert events["c.f90"]["tid"] == 2
+    assert events["app"]["tid"] == 0
+    assert events["a.f90"]["dur"] == 2e6
+    assert events["a.f90"]["args"] == {"returncode": 0, "output_size": 10}
+    assert events["src"]["args"] == {"output_size": 5}
+
+    profile.summary(top=2)
+    out = capsys.readouterr().out
+    assert re.search(r"compile\s+4\.000 s in\s+3 step\(s\)", out)
+    assert "slowest 2 step(s)" in out
+    assert out.index("a.f90") < out.index("c.f90")
+
+
+@pytest.mark.base
+def test_build_profile_compile_wait(function_tmpdir, monkeypatch):
+    profile = _BuildProfile(str(function_tmpdir / "profile.json"))
+    monkeypatch.setattr(_build_profile, "_ACTIVE_PROFILE", profile)
+    cmdlist = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+    jobs = [_CompileJob(name, cmdlist) for name in ("a.f90", "b.f90")]
+
+    async def run():
+        runner = _ProcessRunner(1)
+        try:
+            await asyncio.gather(*[_run_compile_job(job, runner) for job in jobs])
+        finally:
+            runner.close()
+
+    asyncio.run(run())
+
+    # compile steps do not include the time spent waiting for a slot
+    events = sorted(profile.events, key=lambda event: event["start"])
+    assert [event["name"] for event in events] == ["a.f90", "b.f90"]
+    assert events[1]["start"] >= events[0]["end"]
+    for event in events:
+        assert 0.5 <= event["duration"] < 0.9
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_build_profile(function_tmpdir, capsys):
+    srcdir = Path(function_tmpdir) / "src"
+    srcdir.mkdir()
+    for name, source in SOURCES.items():
+        (srcdir / name).write_text(dedent(source))
+
+    with set_dir(function_tmpdir):
+        returncode = pymake.main(
+            "src",
+            "app",
+            makeclean=False,
+            jobs=2,
+            profile="profile.json",
+        )
+    assert returncode == 0
+    assert _build_profile._ACTIVE_PROFILE is None
+
+    with open(function_tmpdir / "profile.json") as f:
+        trace = json.load(f)
+    events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    categories = {}
+    for event in events:
+        categories.setdefault(event["cat"], []).append(event)
+    assert sorted(event["name"] for event in categories["compile"]) == [
+        str(Path("src_app") / name) for name in sorted(SOURCES)
+    ]
+    for event in categories["compile"]:
+        assert event["args"]["returncode"] == 0
+        assert event["args"]["output_size"] > 0
+    assert len(categories["link"]) == 1
+    assert categories["build"][0]["args"]["output_size"] > 0
+    assert "initialize" in categories
+    assert "scan" in categories
+
+    out = capsys.readouterr().out
+    assert "build profile written to 'profile.json'" in out
+    assert "slowest" in out
@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake.utils._compile_commands import _write_compile_commands
+from pymake.utils._compile_scheduler import _CompileJob
+from pymake.utils._process_runner import _run_process
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "main.f90": """\
+        program main
+          use KindModule, only: DP
+          implicit none
+          write(*,*) 2.0_DP
+        end program main
+        """,
+}
+
+requires_gfortran = pytest.mark.skipif(
+    shutil.which("gfortran") is None, reason="gfortran is not available"
+)
+
+
+def compile_job(srcfile, objdir, flags=()):
+    objfile = os.path.join(objdir, Path(srcfile).stem + ".o")
+    cmdlist = ["gfortran", "-O2", *flags, "-c", srcfile, "-o", objfile]
+    return _CompileJob(srcfile, cmdlist, objfile=objfile)
+
+
+@pytest.mark.base
+def test_compile_commands_incremental(function_tmpdir):
+    fpth = str(function_tmpdir / "compile_commands.json")
+    with set_dir(function_tmpdir):
+        jobs_a = [compile_job(f"src/{name}", "obj_a") for name in ("a.f90", "b.f90")]
+        jobs_b = [compile_job("src/c.f90", "obj_b")]
+        assert _write_compile_commands(fpth, jobs_a, "obj_a")
+        assert _write_compile_commands(fpth, jobs_b, "obj_b")
+
+        # unchanged compile commands do not rewrite the file
+        mtime = os.stat(fpth).st_mtime_ns
+        assert not _write_compile_commands(fpth, jobs_a, "obj_a")
+        assert os.stat(fpth).st_mtime_ns == mtime
+
+        # changed and removed compile commands replace the target entries
+        jobs_a = [compile_job("src/a.f90", "obj_a", flags=("-g",))]
+        assert _write_compile_commands(fpth, jobs_a, "obj_a")
+
+    with open(fpth) as f:
+        entries = json.load(f)
+    files = sorted(os.path.basename(entry["file"]) for entry in entries)
+    assert files == ["a.f90", "c.f90"]
+    for entry in entries:
+        assert entry["directory"] == str(function_tmpdir.resolve())
+        assert os.path.isabs(entry["file"])
+        assert os.path.isabs(entry["output"])
+        if entry["file"].endswith("a.f90"):
+            assert "-g" in entry["arguments"]
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_commands_dryrun(function_tmpdir):
+    srcdir = Path(function_tmpdir) / "src"
+    srcdir.mkdir()
+    for name, source in SOURCES.items():
+        (srcdir / name).write_text(dedent(source))
+
+    with set_dir(function_tmpdir):
+        returncode = pymake.main(
+            "src",
+            "app",
+            makeclean=False,
+            dryrun=True,
+            compile_commands="compile_commands.json",
+        )
+        assert returncode == 0
+        assert not os.path.isfile("app")
+
+        with open("compile_commands.json") as f:
+            entries = json.load(f)
+        assert sorted(os.path.basename(entry["file"]) for entry in entries) == sorted(
+            SOURCES
+        )
+
+        # the planned commands compile the source files in compile order
+        for name in ("kind.f90", "main.f90"):
+            entry = next(e for e in entries if e["file"].endswith(name))
+            assert entry["arguments"][0] == "gfortran"
+            result = _run_process(entry["arguments"], cwd=entry["directory"])
+            assert result.returncode == 0
+            assert os.path.isfile(entry["output"])
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_commands_makeclean(function_tmpdir, capsys):
+    srcdir = Path(function_tmpdir) / "src"
+    srcdir.mkdir()
+    for name, source in SOURCES.items():
+        (srcdir / name).write_text(dedent(source))
+
+    # the temporary files used by the compile commands are removed if
+    # makeclean is True, so a compilation database is not written
+    with set_dir(function_tmpdir):
+        returncode = pymake.main("src", "app", compile_commands="compile_commands.json")
+        assert returncode == 0
+        assert os.path.isfile("app")
+        assert not os.path.isdir("src_app")
+        assert not os.path.isfile("compile_commands.json")
+    assert "a compilation database is not written" in capsys.readouterr().out
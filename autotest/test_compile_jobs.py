@@ -0,0 +1,377 @@
+import gzip
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from platform import system
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake.utils._build_database import _get_module_hash
+from pymake.utils._object_cache import _parse_cache_size
+
+TARGET_NAME = "app"
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "sub/util.f90": """\
+        module UtilModule
+          use KindModule, only: DP
+          implicit none
+        contains
+          function twice(x) result(y)
+            real(DP), intent(in) :: x
+            real(DP) :: y
+            y = 2.0_DP * x
+          end function twice
+        end module UtilModule
+        """,
+    "sub/other.f90": """\
+        module OtherModule
+          use KindModule, only: DP
+          implicit none
+        contains
+          function half(x) result(y)
+            real(DP), intent(in) :: x
+            real(DP) :: y
+            y = 0.5_DP * x
+          end function half
+        end module OtherModule
+        """,
+    "main.f90": """\
+        program main
+          use KindModule, only: DP
+          use UtilModule, only: twice
+          use OtherModule, only: half
+          implicit none
+          write(*,*) twice(2.0_DP), half(2.0_DP)
+        end program main
+        """,
+}
+
+requires_gfortran = pytest.mark.skipif(
+    shutil.which("gfortran") is None, reason="gfortran is not available"
+)
+
+
+def write_sources(ws: Path) -> Path:
+    srcdir = ws / "src"
+    for name, source in SOURCES.items():
+        fpth = srcdir / name
+        fpth.parent.mkdir(parents=True, exist_ok=True)
+        fpth.write_text(dedent(source))
+    return srcdir
+
+
+def get_target(ws: Path) -> Path:
+    ext = ".exe" if system() == "Windows" else ""
+    return ws / f"{TARGET_NAME}{ext}"
+
+
+def run_target(target: Path) -> str:
+    return subprocess.run(
+        [str(target)], capture_output=True, text=True, check=True
+    ).stdout
+
+
+@pytest.mark.base
+@requires_gfortran
+@pytest.mark.parametrize("jobs", [1, 4, 0])
+def test_compile_jobs(function_tmpdir, jobs):
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir)
+        returncode = pymake.main(
+            "src",
+            TARGET_NAME,
+            include_subdirs=True,
+            makeclean=False,
+            jobs=jobs,
+        )
+        assert returncode == 0, f"could not compile {TARGET_NAME} with jobs={jobs}"
+
+        target = get_target(function_tmpdir)
+        assert target.is_file(), f"{target} does not exist"
+        values = [float(v) for v in run_target(target).split()]
+        assert values == [4.0, 1.0]
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_jobs_failure(function_tmpdir):
+    with set_dir(function_tmpdir):
+        srcdir = write_sources(function_tmpdir)
+        with open(srcdir / "sub" / "util.f90", "a") as f:
+            f.write("this is not fortran\n")
+        returncode = pymake.main(
+            "src",
+            TARGET_NAME,
+            include_subdirs=True,
+            makeclean=False,
+            jobs=4,
+        )
+        assert returncode != 0, "compilation should have failed"
+        assert not get_target(function_tmpdir).exists()
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_jobs_keep_going(function_tmpdir, capsys):
+    with set_dir(function_tmpdir):
+        srcdir = write_sources(function_tmpdir)
+        with open(srcdir / "sub" / "util.f90", "a") as f:
+            f.write("this is not fortran\n")
+        (srcdir / "sub" / "bad.f90").write_text("this is not fortran either\n")
+        returncode = pymake.main(
+            "src",
+            TARGET_NAME,
+            include_subdirs=True,
+            makeclean=False,
+            jobs=1,
+            keep_going=True,
+        )
+        assert returncode != 0, "compilation should have failed"
+        assert not get_target(function_tmpdir).exists()
+
+        # source files that do not depend on a failed source file are compiled
+        objdir = function_tmpdir / f"obj_{TARGET_NAME}"
+        assert (objdir / "kind.o").is_file()
+        assert (objdir / "other.o").is_file()
+        assert not (objdir / "main.o").exists()
+
+    out = capsys.readouterr().out
+    assert "2 of 5 source files failed to compile" in out
+    assert "1 source files were not compiled" in out
+    assert re.search(r"main\.f90 \(depends on \S*util\.f90\)", out)
+
+
+def get_object_times(ws: Path) -> dict:
+    objdir = ws / f"obj_{TARGET_NAME}"
+    return {fpth.name: fpth.stat().st_mtime_ns for fpth in objdir.glob("*.o")}
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_jobs_expedite(function_tmpdir):
+    with set_dir(function_tmpdir):
+        srcdir = write_sources(function_tmpdir)
+        kwargs = {
+            "include_subdirs": True,
+            "makeclean": False,
+            "expedite": True,
+            "jobs": 4,
+        }
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not compile {TARGET_NAME}"
+        initial = get_object_times(function_tmpdir)
+        assert len(initial) == len(SOURCES)
+
+        # a warm rebuild should not compile any source files
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        assert get_object_times(function_tmpdir) == initial
+
+        # touching a source file without changing it should not compile
+        # any source files
+        os.utime(srcdir / "kind.f90")
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        assert get_object_times(function_tmpdir) == initial
+
+        # changing the implementation in a source file should only compile
+        # the source file because the module file does not change
+        fpth = srcdir / "sub" / "other.f90"
+        fpth.write_text(fpth.read_text().replace("0.5_DP", "0.25_DP"))
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        current = get_object_times(function_tmpdir)
+        changed = sorted(k for k, v in current.items() if v != initial[k])
+        assert changed == ["other.o"]
+
+        # changing the interface in a source file should also compile the
+        # source files that use its module
+        initial = current
+        fpth.write_text(
+            fpth.read_text().replace(
+                "  end function half\n",
+                "  end function half\n"
+                "  function third(x) result(y)\n"
+                "    real(DP), intent(in) :: x\n"
+                "    real(DP) :: y\n"
+                "    y = x / 3.0_DP\n"
+                "  end function third\n",
+            )
+        )
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        current = get_object_times(function_tmpdir)
+        changed = sorted(k for k, v in current.items() if v != initial[k])
+        assert changed == ["main.o", "other.o"]
+
+        values = [float(v) for v in run_target(get_target(function_tmpdir)).split()]
+        assert values == [4.0, 0.5]
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_jobs_expedite_missing_module(function_tmpdir):
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir)
+        kwargs = {
+            "include_subdirs": True,
+            "makeclean": False,
+            "expedite": True,
+        }
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not compile {TARGET_NAME}"
+        initial = get_object_times(function_tmpdir)
+
+        # a source file is compiled again if a module file it creates has
+        # been removed
+        modfile = function_tmpdir / f"mod_{TARGET_NAME}" / "utilmodule.mod"
+        modfile.unlink()
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        assert modfile.is_file()
+        current = get_object_times(function_tmpdir)
+        assert [k for k, v in current.items() if v != initial[k]] == ["util.o"]
+
+
+INCLUDE_SOURCES = {
+    "c": {
+        "main.c": """\
+            #include <stdio.h>
+            #include "val.h"
+            int main(void) {
+              printf("%d\\n", VALUE);
+              return 0;
+            }
+            """,
+        "val.h": """\
+            #include "base.h"
+            #define VALUE (BASE + 1)
+            """,
+        "base.h": """\
+            #define BASE 1
+            """,
+    },
+    "fortran": {
+        "main.f90": """\
+            program main
+              implicit none
+              integer :: value
+              include 'val.fi'
+              write(*,*) value
+            end program main
+            """,
+        "val.fi": """\
+              value = 1 + 1
+            """,
+    },
+}
+
+
+@pytest.mark.base
+@requires_gfortran
+@pytest.mark.parametrize("language", ["c", "fortran"])
+def test_compile_jobs_expedite_include(function_tmpdir, language):
+    sources = INCLUDE_SOURCES[language]
+    if language == "c":
+        include, old, new = "base.h", "BASE 1", "BASE 2"
+    else:
+        include, old, new = "val.fi", "1 + 1", "1 + 2"
+    with set_dir(function_tmpdir):
+        srcdir = function_tmpdir / "src"
+        srcdir.mkdir()
+        for name, source in sources.items():
+            (srcdir / name).write_text(dedent(source))
+        kwargs = {
+            "makeclean": False,
+            "expedite": True,
+            "cc": "gcc",
+            "fc": "gfortran" if language == "fortran" else None,
+        }
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not compile {TARGET_NAME}"
+        initial = get_object_times(function_tmpdir)
+        assert int(run_target(get_target(function_tmpdir))) == 2
+
+        # a warm rebuild should not compile any source files
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        assert get_object_times(function_tmpdir) == initial
+
+        # changing only an included file should compile the source file
+        fpth = srcdir / include
+        fpth.write_text(fpth.read_text().replace(old, new))
+        returncode = pymake.main("src", TARGET_NAME, **kwargs)
+        assert returncode == 0, f"could not rebuild {TARGET_NAME}"
+        current = get_object_times(function_tmpdir)
+        assert [k for k, v in current.items() if v != initial[k]] == ["main.o"]
+        assert int(run_target(get_target(function_tmpdir))) == 3
+
+
+@pytest.mark.base
+def test_module_interface_hash(function_tmpdir):
+    body = b"(() () ())\n(('kindmodule' 'kindmodule' 2))\n"
+    fpths = []
+    for idx, name in enumerate(("src/kind.f90", "src_app/kind.f90")):
+        fpth = function_tmpdir / f"kind{idx}.mod"
+        header = f"GFORTRAN module version '15' created from {name}\n"
+        fpth.write_bytes(gzip.compress(header.encode() + body, mtime=idx))
+        fpths.append(fpth)
+    fpth = function_tmpdir / "kind2.mod"
+    fpth.write_bytes(body.replace(b"2", b"3"))
+    fpths.append(fpth)
+
+    hashes = [_get_module_hash(str(fpth)) for fpth in fpths]
+    assert hashes[0] == hashes[1], "gfortran header changed the interface hash"
+    assert hashes[0] != hashes[2], "different interfaces have the same hash"
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compile_jobs_object_cache(function_tmpdir, monkeypatch, capsys):
+    monkeypatch.setenv("PYMAKE_CACHE_DIR", str(function_tmpdir / "cache"))
+    for idx, name in enumerate(("first", "second")):
+        ws = function_tmpdir / name
+        ws.mkdir()
+        with set_dir(ws):
+            write_sources(ws)
+            returncode = pymake.main(
+                "src",
+                TARGET_NAME,
+                include_subdirs=True,
+                makeclean=False,
+                jobs=4,
+                cache=True,
+            )
+            assert returncode == 0, f"could not compile {TARGET_NAME} in {ws}"
+            values = [float(v) for v in run_target(get_target(ws)).split()]
+            assert values == [4.0, 1.0]
+
+        # the second checkout should restore all of the object files
+        output = capsys.readouterr().out
+        nsrc = len(SOURCES)
+        if idx == 0:
+            assert f"object cache: 0 hits, {nsrc} misses" in output
+        else:
+            assert f"object cache: {nsrc} hits, 0 misses" in output
+            assert "-c src_app" not in output
+
+
+@pytest.mark.base
+@pytest.mark.parametrize(
+    "size, expected",
+    [(1024, 1024), ("2K", 2048), ("1.5M", 1572864), ("5G", 5 * 1024**3)],
+)
+def test_object_cache_size(size, expected):
+    assert _parse_cache_size(size) == expected
@@ -0,0 +1,40 @@
+import shutil
+
+import pytest
+
+from pymake.utils import _compiler_switches
+from pymake.utils._compiler_switches import _check_gnu_switch_available
+
+requires_gfortran = pytest.mark.skipif(
+    shutil.which("gfortran") is None, reason="gfortran is not available"
+)
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_compiler_probe_cache(function_tmpdir, monkeypatch):
+    monkeypatch.setenv("PYMAKE_CACHE_DIR", str(function_tmpdir))
+    monkeypatch.setattr(_compiler_switches, "_COMPILER_SWITCHES", {})
+
+    # count the number of times the compiler help is run
+    cmdlists = []
+    run_process = _compiler_switches._run_process
+
+    def counting_run_process(cmdlist, *args, **kwargs):
+        if "--help" in cmdlist:
+            cmdlists.append(cmdlist)
+        return run_process(cmdlist, *args, **kwargs)
+
+    monkeypatch.setattr(_compiler_switches, "_run_process", counting_run_process)
+
+    for _ in range(5):
+        assert _check_gnu_switch_available("-ffpe-trap")
+        assert not _check_gnu_switch_available("-fnot-a-real-switch")
+    assert len(cmdlists) == 1
+    assert (function_tmpdir / "compiler_probes.json").is_file()
+
+    # the compiler probe is loaded from the user cache directory in a new
+    # session
+    monkeypatch.setattr(_compiler_switches, "_COMPILER_SWITCHES", {})
+    assert _check_gnu_switch_available("-ffpe-trap")
+    assert len(cmdlists) == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from pymake.utils._dag import DirectedAcyclicGraph, Node
+
+
+def build_nodes(weights, dependencies):
+    nodes = {name: Node(name, weight=weight) for name, weight in weights.items()}
+    for name, names in dependencies.items():
+        for dependency in names:
+            nodes[name].add_dependency(nodes[dependency])
+    return nodes
+
+
+@pytest.mark.base
+def test_critical_path_lengths():
+    # a <- b <- d and a <- c, where b and d are expensive
+    nodes = build_nodes(
+        {"a": 1.0, "b": 5.0, "c": 1.0, "d": 3.0},
+        {"b": ["a"], "c": ["a"], "d": ["b"]},
+    )
+    dag = DirectedAcyclicGraph(list(nodes.values()))
+    lengths = dag.critical_path_lengths()
+    assert lengths == {"a": 9.0, "b": 8.0, "c": 1.0, "d": 3.0}
+
+
+@pytest.mark.base
+def test_critical_path_lengths_cycle():
+    nodes = build_nodes({"a": 1.0, "b": 1.0}, {"a": ["b"], "b": ["a"]})
+    dag = DirectedAcyclicGraph(list(nodes.values()))
+    with pytest.raises(ValueError):
+        dag.critical_path_lengths()
+
+
+@pytest.mark.base
+def test_toposort():
+    nodes = build_nodes(
+        {name: 1.0 for name in "edcba"},
+        {"e": ["d", "c"], "d": ["b"], "c": ["b", "a"], "b": ["a"]},
+    )
+    nodelist = list(nodes.values())
+    dependencies = {node.name: list(node.dependencies) for node in nodelist}
+
+    order = [node.name for node in DirectedAcyclicGraph(nodelist).toposort()]
+    assert order == ["a", "b", "d", "c", "e"]
+
+    # the nodes are not modified and the order does not change
+    assert {node.name: node.dependencies for node in nodelist} == dependencies
+    order2 = [node.name for node in DirectedAcyclicGraph(nodelist).toposort()]
+    assert order2 == order
+
+
+@pytest.mark.base
+def test_toposort_cycle():
+    nodes = build_nodes(
+        {name: 1.0 for name in "abcd"},
+        {"a": ["b"], "b": ["c"], "c": ["b"], "d": ["a"]},
+    )
+    dag = DirectedAcyclicGraph(list(nodes.values()))
+    with pytest.raises(ValueError, match="b -> c -> b"):
+        dag.toposort()
+    with pytest.raises(ValueError, match=r"(b -> c -> b|c -> b -> c)"):
+        dag.critical_path_lengths()
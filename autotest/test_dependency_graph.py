@@ -0,0 +1,231 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+from pymake import DependencyGraph
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "sub/util.f90": """\
+        module UtilModule
+          use KindModule, only: DP
+          implicit none
+        contains
+          function twice(x) result(y)
+            real(DP), intent(in) :: x
+            real(DP) :: y
+            y = 2.0_DP * x
+          end function twice
+        end module UtilModule
+        """,
+    "sub/other.f90": """\
+        module OtherModule
+          use, intrinsic :: iso_fortran_env, only: output_unit
+          use KindModule, only: DP
+          implicit none
+        end module OtherModule
+        """,
+    "main.f90": """\
+        program main
+          use UtilModule, only: twice
+          implicit none
+          include 'openspec.inc'
+          write(*,*) twice(2.0d0)
+        end program main
+        """,
+    "cycle_a.f90": """\
+        module CycleA
+          use CycleB
+        end module CycleA
+        """,
+    "cycle_b.f90": """\
+        module CycleB
+          use CycleA
+        end module CycleB
+        """,
+}
+
+
+def write_sources(ws: Path, cycles=False) -> Path:
+    srcdir = ws / "src"
+    for name, source in SOURCES.items():
+        if name.startswith("cycle") and not cycles:
+            continue
+        fpth = srcdir / name
+        fpth.parent.mkdir(parents=True, exist_ok=True)
+        fpth.write_text(dedent(source))
+    (srcdir / "openspec.inc").write_text("      CHARACTER*20 ACCESS\n")
+    return srcdir
+
+
+def names(srcfiles):
+    return [Path(fpth).name for fpth in srcfiles]
+
+
+@pytest.mark.base
+def test_dependency_graph(function_tmpdir):
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir)
+        graph = DependencyGraph.from_directory("src", include_subdirs=True)
+
+        # source files are in compile order
+        order = names(graph.srcfiles)
+        assert order.index("kind.f90") < order.index("util.f90")
+        assert order.index("util.f90") < order.index("main.f90")
+        assert graph.cycles() == []
+
+        kind = str(Path("src") / "kind.f90")
+        util = str(Path("src") / "sub" / "util.f90")
+        assert graph.provides(kind) == ["KINDMODULE"]
+        assert graph.consumes(util) == ["KINDMODULE"]
+        assert graph.consumes("src/sub/other.f90") == [
+            "ISO_FORTRAN_ENV",
+            "KINDMODULE",
+        ]
+        assert graph.module_files["UTILMODULE"] == util
+        assert sorted(names(graph.dependents(kind))) == ["other.f90", "util.f90"]
+        assert names(graph.dependencies("src/main.f90", transitive=True)) == [
+            "kind.f90",
+            "util.f90",
+        ]
+
+        # transitive impact of changed files, modules, and include files
+        assert sorted(names(graph.impacted(files=[kind]))) == [
+            "kind.f90",
+            "main.f90",
+            "other.f90",
+            "util.f90",
+        ]
+        assert names(graph.impacted(modules=["utilmodule"])) == [
+            "util.f90",
+            "main.f90",
+        ]
+        assert names(graph.impacted(modules="UtilModule", include_changed=False)) == [
+            "main.f90"
+        ]
+        assert names(graph.impacted(files="src/openspec.inc")) == ["main.f90"]
+        assert names(graph.impacted(modules=["iso_fortran_env"])) == ["other.f90"]
+        assert graph.impacted(files=["README.md"]) == []
+
+        with pytest.raises(ValueError):
+            graph.provides("src/missing.f90")
+
+        data = graph.to_dict()
+        assert data["srcfiles"][util]["dependencies"] == [kind]
+
+        # the dependency graph is written to dot and json files
+        dot = graph.to_dot()
+        assert dot.startswith("digraph dependencies {")
+        assert f'"{util}" -> "{kind}" [label="KINDMODULE"];' in dot
+        graph.write("deps.gv")
+        assert Path("deps.gv").read_text() == dot
+        graph.write("deps.json")
+        assert json.loads(Path("deps.json").read_text()) == data
+        with pytest.raises(ValueError):
+            graph.write("deps.svg")
+
+
+@pytest.mark.base
+def test_dependency_graph_parallelism(function_tmpdir):
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir)
+        graph = DependencyGraph.from_directory("src", include_subdirs=True)
+        weights = {
+            srcfile: {"util.f90": 2.0}.get(Path(srcfile).name, 1.0)
+            for srcfile in graph.srcfiles
+        }
+        report = graph.parallelism(weights=weights, max_jobs=3)
+        assert report["depth"] == 3
+        assert report["widths"] == [1, 2, 1]
+        assert report["total_work"] == 5.0
+        assert report["critical_path_length"] == 4.0
+        assert names(report["critical_path"]) == ["kind.f90", "util.f90", "main.f90"]
+        assert report["max_speedup"] == 1.25
+        assert report["speedups"] == {1: 1.0, 2: 1.25, 3: 1.25}
+        assert [
+            (item["module"], item["consumers"], item["reduction"])
+            for item in report["serializing_modules"]
+        ] == [("KINDMODULE", 2, 1.0), ("UTILMODULE", 1, 1.0)]
+
+        # compile times from a previous build are matched using the file name
+        objdir = Path("obj_app")
+        objdir.mkdir()
+        times = {str(Path("src_app") / "sub" / "util.f90"): 3.0}
+        (objdir / ".pymake_compile_times.json").write_text(json.dumps(times))
+        weights, timed = graph.compile_weights(objdir=str(objdir))
+        assert timed == 1
+        assert weights[str(Path("src") / "sub" / "util.f90")] == 3.0
+        report = graph.parallelism(objdir=str(objdir), max_jobs=2)
+        assert report["timed"] == 1
+        assert report["speedups"][1] == 1.0
+
+
+@pytest.mark.base
+def test_dependency_graph_cycles(function_tmpdir):
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir, cycles=True)
+        graph = DependencyGraph.from_directory("src", include_subdirs=True)
+        cycles = graph.cycles()
+        assert len(cycles) == 1
+        assert cycles[0][0] == cycles[0][-1]
+        assert sorted(names(cycles[0][:-1])) == ["cycle_a.f90", "cycle_b.f90"]
+        assert sorted(names(graph.impacted(modules="CycleA"))) == [
+            "cycle_a.f90",
+            "cycle_b.f90",
+        ]
+
+
+@pytest.mark.base
+def test_dependency_graph_cli(function_tmpdir):
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, "-m", "pymake.cmds.depgraph", *args],
+            capture_output=True,
+            text=True,
+            cwd=function_tmpdir,
+        )
+
+    write_sources(function_tmpdir)
+    result = run("impacted", "src", "--subdirs", "--modules", "KindModule")
+    assert result.returncode == 0, result.stderr
+    assert sorted(names(result.stdout.split())) == [
+        "kind.f90",
+        "main.f90",
+        "other.f90",
+        "util.f90",
+    ]
+
+    util = str(Path("src") / "sub" / "util.f90")
+    result = run("modules", "src", "-sd", "--json", "-f", util)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {
+        util: {"provides": ["UTILMODULE"], "consumes": ["KINDMODULE"]}
+    }
+
+    result = run("cycles", "src", "--subdirs")
+    assert result.returncode == 0
+    assert result.stdout == ""
+
+    result = run("parallelism", "src", "--subdirs", "--max-jobs", "2")
+    assert result.returncode == 0, result.stderr
+    assert "critical path length" in result.stdout
+    assert "KINDMODULE" in result.stdout
+
+    result = run("export", "src", "--subdirs", "--output", "deps.dot")
+    assert result.returncode == 0, result.stderr
+    assert "KINDMODULE" in (Path(function_tmpdir) / "deps.dot").read_text()
+
+    write_sources(function_tmpdir, cycles=True)
+    result = run("cycles", "src", "--subdirs")
+    assert result.returncode == 1
+    assert "cycle_a.f90" in result.stdout
@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake.plot import dependency_graphs
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "sub/util.f90": """\
+        module UtilModule
+          use KindModule, only: DP
+          implicit none
+        end module UtilModule
+        """,
+    "sub/other.f90": """\
+        module OtherModule
+          use KindModule, only: DP
+          implicit none
+        end module OtherModule
+        """,
+    "main.f90": """\
+        program main
+          use UtilModule
+          implicit none
+        end program main
+        """,
+}
+
+
+def write_sources(ws: Path):
+    for name, source in SOURCES.items():
+        fpth = ws / "src" / name
+        fpth.parent.mkdir(parents=True, exist_ok=True)
+        fpth.write_text(dedent(source))
+
+
+@pytest.mark.base
+def test_make_plots(function_tmpdir, monkeypatch):
+    rendered = {}
+
+    def render_subgraph(filename, nodes, edges, extension):
+        rendered[Path(filename).name] = (nodes, edges)
+        Path(filename).write_text(extension)
+        return filename
+
+    monkeypatch.setattr(dependency_graphs, "_render_subgraph", render_subgraph)
+
+    with set_dir(function_tmpdir):
+        write_sources(function_tmpdir)
+        outdir = Path("deps")
+        outdir.mkdir()
+
+        filenames = pymake.make_plots(
+            "src",
+            str(outdir),
+            include_subdir=True,
+            level=2,
+            jobs=1,
+            graph_file="deps.json",
+        )
+        assert sorted(Path(fpth).name for fpth in filenames) == [
+            "kind.f90.png",
+            "main.f90.png",
+            "other.f90.png",
+            "util.f90.png",
+        ]
+
+        # each subgraph is limited to level - 1 dependencies
+        assert rendered["main.f90.png"] == (
+            ["main.f90", "util.f90"],
+            [("main.f90", "util.f90")],
+        )
+        assert rendered["kind.f90.png"] == (["kind.f90"], [])
+
+        # the dependency graph of all of the source files is written
+        data = json.loads(Path("deps.json").read_text())
+        assert len(data["srcfiles"]) == 4
+
+        # unchanged plots are not rendered again
+        rendered.clear()
+        filenames = pymake.make_plots("src", str(outdir), include_subdir=True, jobs=1)
+        assert sorted(rendered) == ["main.f90.png"]
+        assert pymake.make_plots("src", str(outdir), include_subdir=True) == []
+
+        # plots are rendered again when a dependency changes
+        util = Path("src") / "sub" / "util.f90"
+        util.write_text(util.read_text().replace("use KindModule, only: DP\n", ""))
+        rendered.clear()
+        pymake.make_plots("src", str(outdir), include_subdir=True, jobs=1)
+        assert sorted(rendered) == ["main.f90.png", "util.f90.png"]
+        assert rendered["main.f90.png"][1] == [("main.f90", "util.f90")]
+
+        with pytest.raises(Exception):
+            pymake.make_plots("src", str(outdir), extension=".svg")
+
+
+@pytest.mark.base
+def test_get_subgraphs():
+    from pymake.utils._dag import Node
+
+    kind = Node("kind.f90")
+    util = Node("util.f90")
+    main = Node("main.f90")
+    util.add_dependency(kind)
+    main.add_dependency(util)
+    main.add_dependency(kind)
+
+    subgraphs = dependency_graphs._get_subgraphs([kind, util, main], 1)
+    assert subgraphs[main] == (["main.f90"], [])
+
+    subgraphs = dependency_graphs._get_subgraphs([kind, util, main], 3)
+    assert subgraphs[main] == (
+        ["kind.f90", "main.f90", "util.f90"],
+        [("main.f90", "kind.f90"), ("main.f90", "util.f90"), ("util.f90", "kind.f90")],
+    )
@@ -0,0 +1,116 @@
+import os
+import time
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from pymake import download_and_unzip
+from pymake.utils._download_cache import _DownloadCache
+from pymake.utils._http_session import _get_session
+
+
+def write_zip(fpth: Path, text: str):
+    with ZipFile(fpth, "w") as zf:
+        zf.writestr("app/readme.txt", text)
+
+
+def download(url, pth, cachedir, **kwargs):
+    return download_and_unzip(
+        url, pth=str(pth), cache=str(cachedir), max_requests=1, timeout=5, **kwargs
+    )
+
+
+@pytest.mark.base
+def test_download_cache(function_tmpdir, http_server, capsys):
+    cachedir = function_tmpdir / "cache"
+    archive = http_server.directory / "app.zip"
+    write_zip(archive, "version 1")
+    url = f"{http_server.url}/app.zip"
+
+    # the first download is stored in the download cache
+    assert download(url, function_tmpdir / "first", cachedir)
+    assert (function_tmpdir / "first" / "app" / "readme.txt").read_text() == (
+        "version 1"
+    )
+    _, status, headers = http_server.requests[-1]
+    assert status == 200
+    assert "If-None-Match" not in headers
+
+    # the cached file is used if it has not changed
+    assert download(url, function_tmpdir / "second", cachedir)
+    assert (function_tmpdir / "second" / "app" / "readme.txt").read_text() == (
+        "version 1"
+    )
+    _, status, headers = http_server.requests[-1]
+    assert status == 304
+    assert "If-None-Match" in headers
+    assert "using the cached copy" in capsys.readouterr().out
+
+    # a changed file is downloaded again
+    write_zip(archive, "version 2")
+    os.utime(archive, (time.time() + 10, time.time() + 10))
+    assert download(url, function_tmpdir / "third", cachedir)
+    assert (function_tmpdir / "third" / "app" / "readme.txt").read_text() == (
+        "version 2"
+    )
+    assert http_server.requests[-1][1] == 200
+
+    # the cached file is validated using Last-Modified if the server does not
+    # return an ETag
+    http_server.etag = False
+    write_zip(http_server.directory / "other.zip", "other")
+    other_url = f"{http_server.url}/other.zip"
+    assert download(other_url, function_tmpdir / "fourth", cachedir)
+    assert http_server.requests[-1][1] == 200
+    assert download(other_url, function_tmpdir / "fifth", cachedir)
+    _, status, headers = http_server.requests[-1]
+    assert status == 304
+    assert "If-None-Match" not in headers
+    assert "If-Modified-Since" in headers
+    assert (function_tmpdir / "fifth" / "app" / "readme.txt").read_text() == "other"
+
+    # the download cache is not used if cache is False
+    nrequests = len(http_server.requests)
+    download_and_unzip(url, pth=str(function_tmpdir / "sixth"), cache=False)
+    _, status, headers = http_server.requests[nrequests]
+    assert status == 200
+    assert "If-Modified-Since" not in headers
+
+    # the cached file is used if the server is not available. Connections
+    # kept alive by the session are closed first.
+    http_server.shutdown()
+    http_server.server_close()
+    _get_session().close()
+    assert download(url, function_tmpdir / "seventh", cachedir)
+    assert (function_tmpdir / "seventh" / "app" / "readme.txt").read_text() == (
+        "version 2"
+    )
+    assert "could not validate the cached copy" in capsys.readouterr().out
+
+
+@pytest.mark.base
+def test_download_cache_trim(function_tmpdir):
+    cache = _DownloadCache(cachedir=str(function_tmpdir / "cache"), max_size=250)
+    urls = [f"https://example.com/file{idx}.bin" for idx in range(3)]
+    now = time.time()
+    for idx, url in enumerate(urls):
+        fpth = function_tmpdir / f"file{idx}.bin"
+        fpth.write_bytes(bytes([idx]) * 100)
+        if idx == 2:
+            # using a cached file makes it the most recently used file
+            assert cache.restore(urls[0], str(function_tmpdir / "restored.bin"))
+        assert cache.store(url, str(fpth)) is not None
+        blob = cache._get_blob(cache._load_entry(url)["sha256"])
+        if idx < 2:
+            os.utime(blob, (now - 10 + idx, now - 10 + idx))
+
+    # the least recently used file and its index entry are removed
+    assert cache._load_entry(urls[1]) is None
+    assert not Path(cache._get_entry(urls[1])).exists()
+    assert cache._load_entry(urls[0]) is not None
+    assert cache._load_entry(urls[2]) is not None
+
+    # files that are not cached are not restored
+    assert not cache.restore("https://example.com/missing.bin", "missing.bin")
+    assert cache.get_headers("https://example.com/missing.bin") == {}
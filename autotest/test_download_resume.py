@@ -0,0 +1,60 @@
+import hashlib
+import os
+from zipfile import ZIP_STORED, ZipFile
+
+import pytest
+
+from pymake import download_and_unzip
+
+
+def write_zip(fpth, data):
+    with ZipFile(fpth, "w", compression=ZIP_STORED) as zf:
+        zf.writestr("app/data.bin", data)
+
+
+def download(url, pth):
+    return download_and_unzip(
+        url,
+        pth=str(pth),
+        cache=False,
+        max_requests=3,
+        timeout=5,
+        chunk_size=1024,
+    )
+
+
+@pytest.mark.base
+def test_download_resume(function_tmpdir, http_server):
+    data = os.urandom(200_000)
+    write_zip(http_server.directory / "app.zip", data)
+    http_server.fail_after = 50_000
+
+    assert download(f"{http_server.url}/app.zip", function_tmpdir)
+    assert (function_tmpdir / "app" / "data.bin").read_bytes() == data
+    assert not (function_tmpdir / "app.zip.part").exists()
+
+    # the interrupted download is resumed with a range request
+    statuses = [status for _, status, _ in http_server.requests]
+    assert statuses == [200, 206]
+    headers = http_server.requests[1][2]
+    start = int(headers["Range"].removeprefix("bytes=").removesuffix("-"))
+    assert 0 < start <= 50_000
+    archive = (http_server.directory / "app.zip").read_bytes()
+    assert headers["If-Range"] == f'"{hashlib.sha256(archive).hexdigest()}"'
+
+
+@pytest.mark.base
+def test_download_resume_without_ranges(function_tmpdir, http_server):
+    data = os.urandom(200_000)
+    write_zip(http_server.directory / "app.zip", data)
+    http_server.ranges = False
+    http_server.fail_after = 50_000
+
+    assert download(f"{http_server.url}/app.zip", function_tmpdir)
+    assert (function_tmpdir / "app" / "data.bin").read_bytes() == data
+    assert not (function_tmpdir / "app.zip.part").exists()
+
+    # the file is downloaded again if the server does not support ranges
+    statuses = [status for _, status, _ in http_server.requests]
+    assert statuses == [200, 200]
+    assert "Range" not in http_server.requests[1][2]
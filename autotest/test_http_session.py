@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+import requests
+
+from pymake.utils import _http_session
+from pymake.utils._http_session import _get_backoff, _get_session, _get_timeout
+from pymake.utils.download import _request_get, _request_header
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Record the backoff delays instead of waiting."""
+    delays = []
+    monkeypatch.setattr(_http_session.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.mark.base
+def test_session_per_thread():
+    session = _get_session()
+    assert _get_session() is session
+
+    # each thread has a session that uses the shared connection pool
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(_get_session()))
+    thread.start()
+    thread.join()
+    assert sessions[0] is not session
+    assert sessions[0].get_adapter("https://") is session.get_adapter("https://")
+
+
+@pytest.mark.base
+def test_timeout():
+    assert _get_timeout() == (10.0, 60.0)
+    assert _get_timeout(30) == (10.0, 30)
+    assert _get_timeout(1) == (1, 1)
+    assert _get_timeout((5, 120)) == (5, 120)
+
+
+@pytest.mark.base
+def test_backoff(monkeypatch):
+    monkeypatch.setenv("PYMAKE_HTTP_BACKOFF", "1")
+    monkeypatch.setenv("PYMAKE_HTTP_BACKOFF_MAX", "10")
+    for attempt in range(3):
+        delay = _get_backoff(attempt)
+        assert 2**attempt / 2 <= delay <= 2**attempt
+    assert 5 <= _get_backoff(10) <= 10
+
+    # Retry-After is used if it is longer than the backoff delay
+    assert _get_backoff(0, retry_after="4") == 4
+    assert _get_backoff(0, retry_after="60") == 10
+    assert _get_backoff(0, retry_after="soon") <= 1
+
+
+@pytest.mark.base
+def test_request_connection_reuse(http_server):
+    (http_server.directory / "file.txt").write_text("data")
+    url = f"{http_server.url}/file.txt"
+    for _ in range(3):
+        assert _request_get(url).content == b"data"
+
+    # the connection is kept alive and reused
+    assert len(http_server.clients) == 3
+    assert len(set(http_server.clients)) == 1
+
+
+@pytest.mark.base
+def test_request_retry(http_server, delays, monkeypatch):
+    monkeypatch.setenv("PYMAKE_HTTP_BACKOFF", "1")
+    (http_server.directory / "file.txt").write_text("data")
+    url = f"{http_server.url}/file.txt"
+
+    # transient errors are retried with exponential backoff
+    http_server.errors = [503, 429]
+    assert _request_get(url).content == b"data"
+    assert [status for _, status, _ in http_server.requests] == [503, 429, 200]
+    assert len(delays) == 2
+    assert 0.5 <= delays[0] <= 1
+    assert 1 <= delays[1] <= 2
+
+    # the last response is returned if every attempt fails
+    http_server.errors = [503, 503, 503]
+    with pytest.raises(requests.HTTPError):
+        _request_get(url, max_requests=2)
+
+    # other errors are not retried
+    http_server.errors.clear()
+    delays.clear()
+    http_server.requests.clear()
+    with pytest.raises(requests.HTTPError):
+        _request_get(f"{http_server.url}/missing.txt")
+    assert [status for _, status, _ in http_server.requests] == [404]
+    assert delays == []
+
+
+@pytest.mark.base
+def test_request_header_connection_error(delays):
+    with pytest.raises(ConnectionError):
+        _request_header("http://127.0.0.1:9/file.txt", max_requests=3)
+    assert len(delays) == 2
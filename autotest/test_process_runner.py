@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pymake.utils._process_runner import (
+    _activate_job_budget,
+    _deactivate_job_budget,
+    _get_active_job_budget,
+    _ProcessRunner,
+    _run_process,
+    _run_processes,
+)
+
+
+def python_cmd(code):
+    return [sys.executable, "-c", code]
+
+
+@pytest.mark.base
+def test_run_process_stream(capsys):
+    code = "import sys; print('out'); print('err', file=sys.stderr)"
+    result = _run_process(python_cmd(code), prefix="[job] ", echo=True)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "out"
+    assert result.stderr.strip() == "err"
+    assert result.elapsed > 0.0
+    if os.name == "posix":
+        assert result.peak_rss > 0
+
+    captured = capsys.readouterr()
+    assert "[job] out" in captured.out
+    assert "[job] err" in captured.out
+
+    # quiet processes are not written to the terminal
+    result = _run_process(python_cmd("print('quiet')"), verbose=False)
+    assert result.stdout.strip() == "quiet"
+    assert "quiet" not in capsys.readouterr().out
+
+    # missing executables return a non-zero return code
+    result = _run_process(["pymake-missing-executable"], verbose=False)
+    assert result.returncode != 0
+
+
+@pytest.mark.base
+def test_run_processes_jobs():
+    code = "import time; time.sleep(0.5)"
+    tic = time.perf_counter()
+    results = _run_processes([python_cmd(code) for _ in range(4)], jobs=4)
+    elapsed = time.perf_counter() - tic
+    assert [result.returncode for result in results] == [0, 0, 0, 0]
+    assert elapsed < 1.9
+
+    # the number of concurrent processes is limited by jobs
+    tic = time.perf_counter()
+    _run_processes([python_cmd(code) for _ in range(2)], jobs=1)
+    assert time.perf_counter() - tic >= 1.0
+
+
+@pytest.mark.base
+def test_run_processes_job_budget():
+    code = "import time; time.sleep(0.5)"
+
+    def run():
+        return _run_processes([python_cmd(code) for _ in range(2)], jobs=2)
+
+    # process runners in different threads share the active job budget
+    budget = _activate_job_budget(2)
+    try:
+        tic = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(run) for _ in range(2)]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - tic
+    finally:
+        _deactivate_job_budget()
+    assert [result.returncode for result in results] == [0, 0, 0, 0]
+    assert elapsed >= 1.0
+    assert budget.available == 2
+    assert _get_active_job_budget() is None
+
+
+@pytest.mark.base
+def test_run_process_timeout(capsys):
+    code = "import time; time.sleep(30)"
+    tic = time.perf_counter()
+    result = _run_process(python_cmd(code), timeout=0.5)
+    assert time.perf_counter() - tic < 10.0
+    assert result.timed_out
+    assert result.returncode != 0
+    assert "timed out" in capsys.readouterr().out
+
+
+@pytest.mark.base
+def test_run_process_cancel():
+    code = "import time; time.sleep(30)"
+
+    async def run():
+        runner = _ProcessRunner()
+        task = asyncio.ensure_future(runner.run(python_cmd(code)))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        runner.close()
+
+    tic = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - tic < 10.0
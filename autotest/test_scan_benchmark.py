@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+
+import pymake
+from pymake.utils import _source_info
+from pymake.utils._compiler_language_files import (
+    _get_ordered_srcfiles,
+    _get_srcfiles,
+)
+
+TARGET_NAME = "mf6"
+
+
+@pytest.fixture(scope="module")
+def srcfiles(module_tmpdir) -> list:
+    prog_data = pymake.usgs_program_data.get_target(TARGET_NAME)
+    pymake.download_and_unzip(prog_data.url, pth=str(module_tmpdir), verbose=True)
+    srcdir = Path(module_tmpdir) / prog_data.dirname / prog_data.srcdir
+    return _get_srcfiles(str(srcdir), True)
+
+
+def order_srcfiles(srcfiles, jobs):
+    # clear source file information from previous rounds so every source
+    # file is scanned
+    _source_info._SOURCE_INFO.clear()
+    infos = _source_info._scan_source_files(srcfiles, jobs=jobs)
+    assert None not in infos
+    return _get_ordered_srcfiles(srcfiles, False)
+
+
+@pytest.mark.regression
+@pytest.mark.parametrize("jobs", [1, None], ids=["serial", "threads"])
+def test_scan_mf6(benchmark, srcfiles, jobs):
+    ordered = benchmark(order_srcfiles, srcfiles, jobs)
+    assert sorted(ordered) == sorted(srcfiles)
@@ -0,0 +1,129 @@
+import os
+from textwrap import dedent
+
+import pytest
+
+from pymake.utils._compiler_language_files import (
+    _get_iso_c,
+    _get_main,
+    _get_ordered_srcfiles,
+    _preprocess_file,
+)
+from pymake.utils._source_info import _get_source_info
+
+FORTRAN_SOURCE = """\
+    module ParentModule
+      use, intrinsic :: iso_c_binding, only: c_int
+      use KindModule, only: DP
+      use :: ConstantsModule
+      implicit none
+      interface
+        module subroutine run(x)
+          real(DP), intent(in) :: x
+        end subroutine run
+      end interface
+    #ifdef DEBUG
+      include 'debug.inc'
+    #endif
+    end module ParentModule
+    submodule (ParentModule) ChildSubmodule
+    contains
+      module procedure run
+      end procedure run
+    end submodule ChildSubmodule
+    """
+
+C_SOURCE = """\
+    #include <stdio.h>
+    #include "util.h"
+    int main(int argc, char **argv) {
+      return 0;
+    }
+    """
+
+
+@pytest.mark.base
+def test_source_info_fortran(function_tmpdir):
+    fpth = function_tmpdir / "parent.f90"
+    fpth.write_text(dedent(FORTRAN_SOURCE))
+    info = _get_source_info(str(fpth))
+
+    assert info.modules == ["PARENTMODULE"]
+    assert info.submodules == ["PARENTMODULE:CHILDSUBMODULE"]
+    assert info.submodule_parents == ["PARENTMODULE"]
+    assert info.uses == [
+        "ISO_C_BINDING",
+        "KINDMODULE",
+        "CONSTANTSMODULE",
+        "PARENTMODULE",
+    ]
+    assert info.includes == ["debug.inc"]
+    assert info.directives == ["#ifdef", "#endif"]
+    assert info.iso_c
+    assert info.preprocess
+    assert not info.main
+
+    assert _get_iso_c([str(fpth)])
+    assert _preprocess_file(str(fpth))
+    assert _get_main(str(fpth)) is None
+
+
+@pytest.mark.base
+def test_source_info_c(function_tmpdir):
+    fpth = function_tmpdir / "main.c"
+    fpth.write_text(dedent(C_SOURCE))
+    info = _get_source_info(str(fpth))
+
+    assert info.includes == ["stdio.h", "util.h"]
+    assert not info.preprocess
+    assert info.main
+    assert _get_main([str(fpth)]) == str(fpth)
+
+
+@pytest.mark.base
+def test_source_info_rescan(function_tmpdir):
+    fpth = function_tmpdir / "kind.f90"
+    fpth.write_text("module KindModule\nend module KindModule\n")
+    info = _get_source_info(str(fpth))
+    assert _get_source_info(str(fpth)) is info
+
+    fpth.write_text("module OtherKindModule\nend module OtherKindModule\n")
+    os.utime(fpth, ns=(info.mtime + 1000, info.mtime + 1000))
+    info = _get_source_info(str(fpth))
+    assert info.modules == ["OTHERKINDMODULE"]
+
+    assert _get_source_info(str(function_tmpdir / "missing.f90")) is None
+
+
+@pytest.mark.base
+def test_source_info_cache(function_tmpdir, monkeypatch):
+    kind = function_tmpdir / "kind.f90"
+    kind.write_text("module KindModule\nend module KindModule\n")
+    main = function_tmpdir / "main.f90"
+    main.write_text("program main\nuse KindModule\nend program main\n")
+    srcfiles = [str(main), str(kind)]
+    cachedir = function_tmpdir / "obj"
+    cachedir.mkdir()
+
+    ordered = _get_ordered_srcfiles(srcfiles, False, cachedir=str(cachedir))
+    assert ordered == [str(kind), str(main)]
+    assert (cachedir / ".pymake_source_info.json").is_file()
+
+    # source files with the same size and modification time are not read
+    # when the source file information is loaded from the cache
+    monkeypatch.setattr("pymake.utils._source_info._SOURCE_INFO", {})
+    stat = kind.stat()
+    kind.write_text("module KindModulX\nend module KindModulX\n")
+    os.utime(kind, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    ordered = _get_ordered_srcfiles(srcfiles, False, cachedir=str(cachedir))
+    assert ordered == [str(kind), str(main)]
+    assert _get_source_info(str(kind)).modules == ["KINDMODULE"]
+
+    # source files with a new modification time and the same contents are
+    # not scanned again
+    kind.write_text("module KindModule\nend module KindModule\n")
+    info = _get_source_info(str(kind))
+    mtime = info.mtime + 1000
+    os.utime(kind, ns=(mtime, mtime))
+    assert _get_source_info(str(kind)) is info
+    assert info.mtime == mtime
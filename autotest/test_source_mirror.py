@@ -0,0 +1,107 @@
+import os
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+from pymake.pymake_base import _create_openspec, _pymake_initialize
+from pymake.utils._source_mirror import _SourceMirror
+
+
+def write_tree(srcdir):
+    (srcdir / "sub").mkdir(parents=True)
+    (srcdir / "main.f90").write_text("program main\nend program main\n")
+    (srcdir / "sub" / "util.f90").write_text("module util\nend module util\n")
+    (srcdir / "sub" / "openspec.inc").write_text("c -- original\n")
+    (srcdir / "skip.f90").write_text("module skip\nend module skip\n")
+
+
+def initialize(ws, linkmode="copy", extrafiles=None):
+    return _pymake_initialize(
+        "src",
+        "app",
+        None,
+        extrafiles,
+        ["skip.f90"],
+        True,
+        "obj_temp",
+        "mod_temp",
+        "src_temp",
+        False,
+        linkmode=linkmode,
+    )
+
+
+@pytest.mark.base
+def test_source_mirror(function_tmpdir, monkeypatch):
+    srcdir = function_tmpdir / "src"
+    write_tree(srcdir)
+
+    with set_dir(function_tmpdir):
+        srcfiles = initialize(function_tmpdir)
+        assert sorted(srcfiles) == [
+            os.path.join("src_temp", "main.f90"),
+            os.path.join("src_temp", "sub", "util.f90"),
+        ]
+        assert not os.path.exists(os.path.join("src_temp", "skip.f90"))
+
+        # unchanged source files are not copied in a repeated build
+        copied = []
+        link_file = _SourceMirror._link_file
+
+        def counting_link(self, src, dst):
+            copied.append(os.path.basename(dst))
+            return link_file(self, src, dst)
+
+        monkeypatch.setattr(_SourceMirror, "_link_file", counting_link)
+        assert initialize(function_tmpdir) == srcfiles
+        assert copied == []
+
+        # changed, new, and deleted source files are mirrored
+        (srcdir / "main.f90").write_text("program main2\nend program main2\n")
+        (srcdir / "sub" / "new.f90").write_text("module new\nend module new\n")
+        (srcdir / "sub" / "util.f90").unlink()
+        srcfiles = initialize(function_tmpdir)
+        assert sorted(copied) == ["main.f90", "new.f90"]
+        assert sorted(srcfiles) == [
+            os.path.join("src_temp", "main.f90"),
+            os.path.join("src_temp", "sub", "new.f90"),
+        ]
+        assert not os.path.exists(os.path.join("src_temp", "sub", "util.f90"))
+        with open(os.path.join("src_temp", "main.f90")) as f:
+            assert "main2" in f.read()
+
+        # extrafiles from previous builds do not conflict with themselves
+        extra = function_tmpdir / "extra.f90"
+        extra.write_text("module extra\nend module extra\n")
+        for _ in range(2):
+            srcfiles = initialize(function_tmpdir, extrafiles=[str(extra)])
+            assert os.path.join("src_temp", "extra.f90") in srcfiles
+        (srcdir / "extra.f90").write_text("module extra\nend module extra\n")
+        with pytest.raises(ValueError):
+            initialize(function_tmpdir, extrafiles=[str(extra)])
+
+
+@pytest.mark.base
+def test_source_mirror_hardlink(function_tmpdir):
+    srcdir = function_tmpdir / "src"
+    write_tree(srcdir)
+
+    with set_dir(function_tmpdir):
+        srcfiles = initialize(function_tmpdir, linkmode="hardlink")
+        src = srcdir / "sub" / "util.f90"
+        dst = function_tmpdir / "src_temp" / "sub" / "util.f90"
+        assert os.path.samefile(src, dst)
+
+        # replacing include files in the mirror does not change the
+        # original source files
+        _create_openspec(False, srcfiles, False)
+        assert (srcdir / "sub" / "openspec.inc").read_text() == "c -- original\n"
+        openspec = function_tmpdir / "src_temp" / "sub" / "openspec.inc"
+        assert "STREAM" in openspec.read_text()
+
+        # the original include file is restored in the next build
+        initialize(function_tmpdir, linkmode="hardlink")
+        assert openspec.read_text() == "c -- original\n"
+
+    with pytest.raises(ValueError):
+        _SourceMirror(str(function_tmpdir), linkmode="symlink")
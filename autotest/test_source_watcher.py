@@ -0,0 +1,156 @@
+import shutil
+import subprocess
+from pathlib import Path
+from platform import system
+from textwrap import dedent
+
+import pytest
+from modflow_devtools.misc import set_dir
+
+import pymake
+from pymake.utils._source_watcher import _SourceWatcher, _watch_build
+
+SOURCES = {
+    "kind.f90": """\
+        module KindModule
+          implicit none
+          integer, parameter :: DP = kind(1.0d0)
+        end module KindModule
+        """,
+    "util.f90": """\
+        module UtilModule
+          use KindModule, only: DP
+          implicit none
+        contains
+          function twice(x) result(y)
+            real(DP), intent(in) :: x
+            real(DP) :: y
+            y = 2.0_DP * x
+          end function twice
+        end module UtilModule
+        """,
+    "main.f90": """\
+        program main
+          use KindModule, only: DP
+          use UtilModule, only: twice
+          implicit none
+          write(*,*) twice(2.0_DP)
+        end program main
+        """,
+}
+
+requires_gfortran = pytest.mark.skipif(
+    shutil.which("gfortran") is None, reason="gfortran is not available"
+)
+
+
+@pytest.mark.base
+def test_source_watcher(function_tmpdir):
+    srcdir = Path(function_tmpdir) / "src"
+    (srcdir / "sub").mkdir(parents=True)
+    (srcdir / "obj").mkdir()
+    (srcdir / "a.f90").write_text("a\n")
+    (srcdir / "sub" / "b.f90").write_text("b\n")
+    extra = Path(function_tmpdir) / "extra.f90"
+    extra.write_text("extra\n")
+    extrafiles = Path(function_tmpdir) / "extrafiles.txt"
+    extrafiles.write_text("extra.f90\n")
+
+    watcher = _SourceWatcher(
+        [str(srcdir)],
+        extrafiles=str(extrafiles),
+        exclude_paths=[str(srcdir / "obj")],
+        interval=0.01,
+        settle=0.01,
+    )
+    assert watcher.changes() == []
+
+    # files rewritten with the same contents are not changed
+    (srcdir / "a.f90").write_text("a\n")
+    assert watcher.changes() == []
+
+    # excluded directories and editor files are not watched
+    (srcdir / "obj" / "a.o").write_text("object\n")
+    (srcdir / ".a.f90.swp").write_text("swap\n")
+    (srcdir / "a.f90~").write_text("backup\n")
+    assert watcher.wait_for_changes(timeout=0.05) == []
+
+    # added, changed, and removed files are reported
+    (srcdir / "sub" / "b.f90").write_text("b changed\n")
+    (srcdir / "c.f90").write_text("c\n")
+    extra.write_text("extra changed\n")
+    (srcdir / "a.f90").unlink()
+    changed = [Path(fpth).name for fpth in watcher.wait_for_changes(timeout=1.0)]
+    assert sorted(changed) == ["a.f90", "b.f90", "c.f90", "extra.f90"]
+    assert watcher.changes() == []
+
+
+@pytest.mark.base
+def test_watch_build_exception(function_tmpdir, capsys):
+    class Watcher:
+        def wait_for_changes(self, timeout=None):
+            return [str(function_tmpdir / "a.f90")]
+
+    # a build that raises an exception is a failed build and watching
+    # continues
+    builds = []
+
+    def build():
+        builds.append(len(builds))
+        if len(builds) == 1:
+            raise RuntimeError("build error")
+        return 0
+
+    with set_dir(function_tmpdir):
+        assert _watch_build(build, Watcher(), max_builds=2) == 0
+    assert len(builds) == 2
+
+    out = capsys.readouterr().out
+    assert "RuntimeError('build error')" in out
+    assert "build 1 failed" in out
+    assert "build 2 succeeded" in out
+
+    # the return code is non-zero if the last build raised an exception
+    builds.clear()
+    assert _watch_build(build, Watcher(), max_builds=1) == 1
+
+
+@pytest.mark.base
+@requires_gfortran
+def test_watch_build(function_tmpdir, monkeypatch, capsys):
+    srcdir = Path(function_tmpdir) / "src"
+    srcdir.mkdir()
+    for name, source in SOURCES.items():
+        (srcdir / name).write_text(dedent(source))
+
+    # change the body of a module procedure after the first build and stop
+    # watching after the second build
+    calls = []
+    wait_for_changes = _SourceWatcher.wait_for_changes
+
+    def edit_source(self, timeout=None):
+        calls.append(len(calls))
+        if len(calls) > 1:
+            raise KeyboardInterrupt
+        fpth = srcdir / "util.f90"
+        fpth.write_text(fpth.read_text().replace("2.0_DP * x", "3.0_DP * x"))
+        return wait_for_changes(self, timeout=5.0)
+
+    monkeypatch.setattr(_SourceWatcher, "wait_for_changes", edit_source)
+
+    with set_dir(function_tmpdir):
+        returncode = pymake.main("src", "app", watch=True)
+    assert returncode == 0
+    assert len(calls) == 2
+
+    out = capsys.readouterr().out
+    assert "build 1 succeeded" in out
+    assert "build 2 succeeded" in out
+    assert "1 watched file(s) changed" in out
+    assert "2 of 3 object files were current" in out
+    assert "stopped watching" in out
+
+    ext = ".exe" if system() == "Windows" else ""
+    target = Path(function_tmpdir) / f"app{ext}"
+    result = subprocess.run([str(target)], capture_output=True, text=True)
+    assert float(result.stdout.split()[0]) == 6.0
@@ -0,0 +1,51 @@
+import pytest
+
+from pymake.utils import _compiler_switches
+from pymake.utils._compiler_switches import (
+    _get_c_flags,
+    _get_fortran_flags,
+    _get_linker_flags,
+    _get_optlevel,
+    _get_toolchain_profile,
+)
+
+
+@pytest.mark.base
+@pytest.mark.parametrize("debug", [False, True])
+def test_toolchain_profile(monkeypatch, debug):
+    monkeypatch.setattr(_compiler_switches, "_TOOLCHAIN_PROFILES", {})
+    fflags = ["-fall-intrinsics"]
+    osname = "linux"
+
+    profile = _get_toolchain_profile(
+        "mf6", "gfortran", "gcc", debug, fflags=fflags, osname=osname
+    )
+    assert fflags == ["-fall-intrinsics"]
+
+    # the profile matches the switches from the individual functions
+    assert profile.optlevel == _get_optlevel(
+        "mf6", "gfortran", "gcc", debug, fflags, [], osname=osname
+    )
+    assert list(profile.fflags) == _get_fortran_flags(
+        "mf6", "gfortran", list(fflags), debug, osname=osname
+    )
+    assert list(profile.cflags) == _get_c_flags(
+        "mf6", "gcc", [], debug, None, osname=osname
+    )
+    linker, syslibs = _get_linker_flags("mf6", "gfortran", "gcc", [], [], osname=osname)
+    assert profile.linker == linker
+    assert list(profile.syslibs) == syslibs
+
+    # the same profile is returned for the same toolchain
+    assert (
+        _get_toolchain_profile(
+            "mf6.exe", "gfortran", "gcc", debug, fflags=fflags, osname=osname
+        )
+        is profile
+    )
+    assert (
+        _get_toolchain_profile(
+            "mf6", "gfortran", "gcc", debug, double=True, osname=osname
+        )
+        is not profile
+    )
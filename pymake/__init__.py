@@ -23,6 +23,7 @@ from .pymake_build_apps import build_apps
 from .pymake_parser import parser
 from .utils._compiler_switches import linker_update_environment
 from .utils._meson_build import meson_build, meson_install, meson_setup
+from .utils.dependency_graph import DependencyGraph
 from .utils.download import (
     download_and_unzip,
     get_repo_assets,
@@ -49,6 +50,7 @@ __all__ = [
     "repo_latest_version",
     "get_repo_assets",
     "zip_all",
+    "DependencyGraph",
     # plot
     "make_plots",
     "to_pydot",
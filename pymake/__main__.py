@@ -29,4 +29,11 @@ main(
     appdir=args.appdir,
     verbose=args.verbose,
     inplace=args.inplace,
+    jobs=args.jobs,
+    cache=args.cache,
+    linkmode=args.linkmode,
+    profile=args.profile,
+    compile_commands=args.compile_commands,
+    keep_going=args.keep_going,
+    watch=args.watch,
 )
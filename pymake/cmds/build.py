@@ -28,6 +28,13 @@ DICT_KEYS = (
     "keep",
     "dryrun",
     "meson",
+    "jobs",
+    "cache",
+    "linkmode",
+    "profile",
+    "compile_commands",
+    "keep_going",
+    "watch",
 )
 
 # command arguments (sys.argv) to pop from ARGS
@@ -40,6 +47,13 @@ COM_ARG_KEYS = (
     "zip",
     "keep",
     "dryrun",
+    "jobs",
+    "cache",
+    "linkmode",
+    "profile",
+    "compile_commands",
+    "keep_going",
+    "watch",
 )
 
 # ARGS to keep and pass to build_apps()
@@ -72,6 +86,29 @@ Examples:
 
   Download and compile all programs in the ./temp subdirectory:
     $ {prog} : --appdir temp
+
+  Download and compile MODFLOW 6 using 8 parallel compile jobs:
+    $ {prog} mf6 --jobs 8
+
+  Download and compile MODFLOW 6 using the shared object cache:
+    $ {prog} mf6 --cache
+
+  Download and compile MODFLOW 6 and write a build profile:
+    $ {prog} mf6 --profile mf6_profile.json
+
+  Download and compile MODFLOW 6, rebuild it when a source file changes,
+  and write the compile commands used for the temporary source files:
+    $ {prog} mf6 --watch --compile-commands compile_commands.json
+
+  Download and compile MODFLOW 6 and report every compile failure:
+    $ {prog} mf6 --jobs 8 --keep-going
+
+  Download and compile MODFLOW 6 and rebuild it when a source file changes:
+    $ {prog} mf6 --jobs 8 --watch
+
+  Download and compile MODFLOW 6, MODFLOW-2005, and MODFLOW-NWT at the same
+  time using up to 8 compile jobs for all of the programs:
+    $ {prog} mf6,mf2005,mfnwt --parallel 3 --jobs 8
     """
 
     parser_obj = argparse.ArgumentParser(
@@ -98,6 +135,17 @@ Examples:
             "choices": None,
             "action": None,
         },
+        "parallel": {
+            "tag": ("--parallel",),
+            "help": "Maximum number of programs to build at the same time. "
+            "The compile jobs of all of the programs share a budget of the "
+            "larger of JOBS and PARALLEL. The number of available processors "
+            "is used if PARALLEL is less than 1. (default is 1)",
+            "default": 1,
+            "choices": None,
+            "action": None,
+            "type": int,
+        },
     }
 
     # add standard command line arguments to parser dictionary for make-program
@@ -116,20 +164,22 @@ Examples:
     # filter parser arguments into args and command line arguments
     # com_arg_var = {}
     arg_key_pop = []
-    com_arg_pop = []
+    com_arg_pop = set()
     for key, arg in args.items():
         if key in COM_ARG_KEYS:
             # com_arg_var[key] = arg
             arg_key_pop.append(key)
         else:
-            for carg in sys.argv:
+            for idx, carg in enumerate(sys.argv):
                 if key in carg:
-                    com_arg_pop.append(carg)
-                    if arg in sys.argv:
-                        com_arg_pop.append(arg)
+                    com_arg_pop.add(idx)
+                    # the value of an option, such as --parallel 3, follows
+                    # the option
+                    if idx + 1 < len(sys.argv) and sys.argv[idx + 1] == str(arg):
+                        com_arg_pop.add(idx + 1)
 
     # add --targets value to com_arg_pop
-    com_arg_pop.append(args["targets"])
+    com_arg_pop.add(sys.argv.index(args["targets"]))
 
     # delete arguments that are used by Pymake() class in build_apps
     for key in arg_key_pop:
@@ -137,8 +187,8 @@ Examples:
             del args[key]
 
     # remove args from command line arguments
-    for key in com_arg_pop:
-        sys.argv.remove(key)
+    for idx in sorted(com_arg_pop, reverse=True):
+        del sys.argv[idx]
 
     # run build_apps
     try:
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Query the source file dependency graph of an application.
+
+This script originates from pymake: https://github.com/modflowpy/pymake
+It requires Python 3.6 or later, and has no dependencies.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from pymake.pymake_parser import _parser_setup
+from pymake.utils.dependency_graph import DependencyGraph
+
+__all__ = ["main"]
+__license__ = "CC0"
+
+
+def _write(value, as_json):
+    """Write a query result to the terminal.
+
+    Parameters
+    ----------
+    value : list or dict
+        query result
+    as_json : bool
+        boolean indicating if the query result is written as json
+
+    Returns
+    -------
+    None
+
+    """
+    if as_json:
+        print(json.dumps(value, indent=2))
+    elif isinstance(value, dict):
+        for key, items in value.items():
+            print(f"{key}:")
+            for name, item in items.items():
+                print(f"    {name}: {', '.join(item)}")
+    else:
+        for item in value:
+            if isinstance(item, list):
+                item = " -> ".join(item)
+            print(item)
+    return
+
+
+def _write_parallelism(report, top):
+    """Write a build parallelism report to the terminal.
+
+    Parameters
+    ----------
+    report : dict
+        build parallelism report returned by DependencyGraph.parallelism
+    top : int
+        number of critical path source files written
+
+    Returns
+    -------
+    None
+
+    """
+    if report["timed"] is None:
+        units = ""
+    elif report["timed"] > 0:
+        units = " s"
+        print(
+            f"compile times from a previous build are available for "
+            f"{report['timed']} of {report['files']} source files"
+        )
+    else:
+        units = " bytes"
+        print("compile times are estimated from the size of the source files")
+
+    print(f"source files:         {report['files']:>10d}")
+    print(f"depth (levels):       {report['depth']:>10d}")
+    print(f"maximum width:        {max(report['widths'], default=0):>10d}")
+    print(f"total work:           {report['total_work']:>14.3f}{units}")
+    print(f"critical path length: {report['critical_path_length']:>14.3f}{units}")
+    print(f"maximum speedup:      {report['max_speedup']:>14.3f}")
+
+    print("\nwidth of each level:")
+    for idx, width in enumerate(report["widths"]):
+        print(f"  {idx + 1:>5d} {width:>6d}")
+
+    print("\nestimated speedup:")
+    print(f"  {'jobs':>5s} {'speedup':>9s} {'efficiency':>11s}")
+    for jobs, speedup in report["speedups"].items():
+        print(f"  {jobs:>5d} {speedup:>9.3f} {speedup / jobs:>11.3f}")
+
+    critical_path = report["critical_path"]
+    print(f"\ncritical path ({len(critical_path)} source files):")
+    for srcfile in critical_path[:top]:
+        print(f"  {srcfile}")
+    if len(critical_path) > top:
+        print(f"  ... {len(critical_path) - top} more source files")
+
+    print("\nmodules that most serialize the build:")
+    if len(report["serializing_modules"]) < 1:
+        print("  none")
+    for item in report["serializing_modules"]:
+        print(
+            f"  {item['module']} ({item['file']}, used by {item['consumers']} "
+            f"source files) reduces the critical path by "
+            f"{item['reduction']:.3f}{units}"
+        )
+    return
+
+
+def main() -> None:
+    """Command line interface
+
+    Returns
+    -------
+    None
+
+    """
+    import argparse
+
+    # Show meaningful examples at bottom of help
+    prog = Path(sys.argv[0]).stem
+    examples = f"""\
+Examples:
+
+  List the source files impacted by a change to a source file:
+    $ {prog} impacted src --subdirs --files src/Utilities/kind.f90
+
+  List the source files impacted by a change to a module:
+    $ {prog} impacted src --subdirs --modules KindModule
+
+  List the modules provided and consumed by a source file:
+    $ {prog} modules src --subdirs --files src/Utilities/kind.f90
+
+  Report circular dependencies in the source files:
+    $ {prog} cycles src --subdirs
+
+  Analyze the parallelism available when compiling MODFLOW 6 using compile
+  times from a previous build and 1 to 16 compile jobs:
+    $ {prog} parallelism src --subdirs --objdir obj_mf6 --max-jobs 16
+
+  Write the dependency graph of all of the source files to a DOT file:
+    $ {prog} export src --subdirs --output mf6_dependencies.dot
+    """
+
+    parser_obj = argparse.ArgumentParser(
+        description=__doc__.split("\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=examples,
+    )
+    subparsers = parser_obj.add_subparsers(dest="command", required=True)
+
+    # command line arguments used by every query
+    parser_dict = {
+        "srcdir": {
+            "tag": ("srcdir",),
+            "help": "Path source directory.",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "subdirs": {
+            "tag": ("-sd", "--subdirs"),
+            "help": "Include source files in srcdir subdirectories.",
+            "default": False,
+            "choices": None,
+            "action": "store_true",
+        },
+        "commonsrc": {
+            "tag": ("-cs", "--commonsrc"),
+            "help": "Additional directory with common source files.",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "extrafiles": {
+            "tag": ("-ef", "--extrafiles"),
+            "help": "List of extra source files to include.",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "excludefiles": {
+            "tag": ("-exf", "--excludefiles"),
+            "help": "List of source files to exclude.",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "json": {
+            "tag": ("--json",),
+            "help": "Write the query result as json.",
+            "default": False,
+            "choices": None,
+            "action": "store_true",
+        },
+    }
+    files_dict = {
+        "files": {
+            "tag": ("-f", "--files"),
+            "help": "Source or include file paths.",
+            "default": None,
+            "choices": None,
+            "action": "extend",
+            "nargs": "+",
+        },
+    }
+    modules_dict = {
+        "modules": {
+            "tag": ("-m", "--modules"),
+            "help": "Module names. Module names are not case sensitive.",
+            "default": None,
+            "choices": None,
+            "action": "extend",
+            "nargs": "+",
+        },
+    }
+
+    parallelism_dict = {
+        "objdir": {
+            "tag": ("--objdir",),
+            "help": "Object directory of a previous build with compile times. "
+            "Compile times are estimated from the size of the source files "
+            "if objdir is not specified.",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "max_jobs": {
+            "tag": ("-j", "--max-jobs"),
+            "help": "Maximum number of compile jobs the speedup is estimated "
+            "for. Default is the number of available processors.",
+            "default": None,
+            "choices": None,
+            "action": None,
+            "type": int,
+        },
+        "top": {
+            "tag": ("--top",),
+            "help": "Number of serializing modules and critical path source "
+            "files to list. Default is 5.",
+            "default": 5,
+            "choices": None,
+            "action": None,
+            "type": int,
+        },
+    }
+
+    export_dict = {
+        "output": {
+            "tag": ("-o", "--output"),
+            "help": "Path of the DOT (.dot or .gv) or JSON (.json) file the "
+            "dependency graph is written to. Default is dependencies.dot.",
+            "default": "dependencies.dot",
+            "choices": None,
+            "action": None,
+        },
+    }
+
+    # setup the parser for each query
+    commands = {
+        "impacted": (
+            "List the source files impacted by a change to source files, "
+            "include files, or modules in compile order.",
+            (files_dict, modules_dict),
+        ),
+        "modules": (
+            "List the modules provided and consumed by source files.",
+            (files_dict,),
+        ),
+        "cycles": (
+            "List the circular dependencies in the source files. The exit "
+            "code is 1 if circular dependencies are found.",
+            (),
+        ),
+        "parallelism": (
+            "Analyze the parallelism available when compiling the source "
+            "files, including the depth and width of the dependency graph, "
+            "the critical path, the estimated speedup for 1 to max-jobs "
+            "compile jobs, and the modules that most serialize the build.",
+            (parallelism_dict,),
+        ),
+        "export": (
+            "Write the dependency graph of all of the source files to a DOT "
+            "or JSON file.",
+            (export_dict,),
+        ),
+    }
+    for command, (help_text, dicts) in commands.items():
+        subparser = subparsers.add_parser(command, help=help_text)
+        for value in parser_dict.values():
+            _parser_setup(subparser, value)
+        for command_dict in dicts:
+            for value in command_dict.values():
+                _parser_setup(subparser, value)
+    args = parser_obj.parse_args()
+
+    graph = DependencyGraph.from_directory(
+        args.srcdir,
+        include_subdirs=args.subdirs,
+        srcdir2=args.commonsrc,
+        extrafiles=args.extrafiles,
+        excludefiles=args.excludefiles,
+    )
+
+    if args.command == "impacted":
+        if not args.files and not args.modules:
+            parser_obj.error("impacted requires --files and/or --modules")
+        _write(graph.impacted(files=args.files, modules=args.modules), args.json)
+    elif args.command == "modules":
+        srcfiles = args.files if args.files else graph.srcfiles
+        result = {}
+        for srcfile in srcfiles:
+            try:
+                result[srcfile] = {
+                    "provides": graph.provides(srcfile),
+                    "consumes": graph.consumes(srcfile),
+                }
+            except ValueError as e:
+                sys.exit(str(e))
+        _write(result, args.json)
+    elif args.command == "cycles":
+        cycles = graph.cycles()
+        _write(cycles, args.json)
+        if len(cycles) > 0:
+            sys.exit(1)
+    elif args.command == "parallelism":
+        try:
+            report = graph.parallelism(
+                objdir=args.objdir, max_jobs=args.max_jobs, top=args.top
+            )
+        except ValueError as e:
+            sys.exit(str(e))
+        if args.json:
+            _write(report, True)
+        else:
+            _write_parallelism(report, args.top)
+    elif args.command == "export":
+        try:
+            graph.write(args.output)
+        except ValueError as e:
+            sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,13 @@ def main() -> None:
             networkx=args.networkx,
             meson=args.meson,
             mesondir=args.mesondir,
+            jobs=args.jobs,
+            cache=args.cache,
+            linkmode=args.linkmode,
+            profile=args.profile,
+            compile_commands=args.compile_commands,
+            keep_going=args.keep_going,
+            watch=args.watch,
         )
     except (EOFError, KeyboardInterrupt):
         sys.exit(f" cancelling '{sys.argv[0]}'")
@@ -12,19 +12,32 @@
 
     pymake.visualize.make_plots(srcpth, deppth, include_subdir=True)
 
-
+The subgraph plotted for each source file is derived from a single memoized
+traversal of the dependency graph that is shared by all of the source files.
+Plots are rendered in parallel using a pool of processes and plots of
+subgraphs that have not changed since the plots were last created are not
+rendered again. The dependency graph for all of the source files can also be
+written to a DOT or JSON file.
 
 """
 
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import pydotplus.graphviz as pydot
 
-from ..utils._compiler_language_files import (
-    _get_ordered_srcfiles,
-    _get_srcfiles,
-)
-from ..utils._dag import _get_f_nodelist
+from ..utils._compiler_language_files import _get_srcfiles
+from ..utils._dag import DirectedAcyclicGraph, _get_f_nodelist
+from ..utils._source_info import _load_source_info, _save_source_info
+from ..utils.dependency_graph import DependencyGraph
+
+# file in the output directory with the hash of the subgraph in each plot
+_PLOT_HASH_FILE = ".pymake_plots.json"
+
+# plot formats that can be created
+_PLOT_EXTENSIONS = (".png", ".pdf", ".dot")
 
 
 def to_pydot(dag, filename="mygraph.png"):
@@ -60,67 +73,118 @@ def to_pydot(dag, filename="mygraph.png"):
     return
 
 
-def _add_pydot_nodes(graph, node_dict, n, ilev, level):
-    """
+def _get_subgraphs(nodelist, level):
+    """Get the source files and dependencies plotted for each source file.
+    The source files within level - 1 dependencies of each source file are
+    determined using a traversal that is memoized for each node and
+    remaining depth, so shared dependencies are only traversed once.
 
     Parameters
     ----------
-    graph
-    node_dict
-    n
-    ilev
-    level
+    nodelist : list
+        list of DAG nodes
+    level : int
+        dependency level (1 is the minimum)
 
     Returns
     -------
+    subgraphs : dict
+        dictionary with the node as the key and a tuple with the sorted
+        source file names and sorted dependencies (tuples of source file
+        names) in the subgraph as the value
 
     """
-    if ilev == level:
-        return
-
-    if n in node_dict:
-        return
+    nodes_memo = {}
+    edges_memo = {}
+
+    def _nodes(node, depth):
+        key = (node, depth)
+        if key not in nodes_memo:
+            names = {os.path.basename(node.name)}
+            if depth > 0:
+                for m in node.dependencies:
+                    names |= _nodes(m, depth - 1)
+            nodes_memo[key] = frozenset(names)
+        return nodes_memo[key]
+
+    def _edges(node, depth):
+        key = (node, depth)
+        if key not in edges_memo:
+            edges = set()
+            if depth > 0:
+                name = os.path.basename(node.name)
+                for m in node.dependencies:
+                    edges.add((name, os.path.basename(m.name)))
+                    edges |= _edges(m, depth - 1)
+            edges_memo[key] = frozenset(edges)
+        return edges_memo[key]
+
+    depth = max(int(level), 1) - 1
+    subgraphs = {}
+    for node in nodelist:
+        subgraphs[node] = (
+            sorted(_nodes(node, depth)),
+            sorted(_edges(node, depth)),
+        )
+    return subgraphs
+
+
+def _get_subgraph_hash(nodes, edges, extension):
+    """Get a hash of a subgraph plot so unchanged plots are not rendered
+    again.
 
-    ttl = os.path.basename(n.name)
-    pydotnode = pydot.Node(ttl, style="filled", fillcolor="red", label=ttl)
-    node_dict[n] = pydotnode
-    graph.add_node(pydotnode)
-    if len(n.dependencies) > 0:
-        for m in n.dependencies:
-            _add_pydot_nodes(graph, node_dict, m, ilev + 1, level)
-    return
+    Parameters
+    ----------
+    nodes : list
+        sorted list of source file names
+    edges : list
+        sorted list of dependencies
+    extension : str
+        plot extension
 
+    Returns
+    -------
+    subgraph_hash : str
+        hexadecimal sha256 hash of the subgraph
 
-def _add_pydot_edges(graph, node_dict, edge_set, n, ilev, level):
     """
+    text = json.dumps([nodes, edges, extension])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _render_subgraph(filename, nodes, edges, extension):
+    """Render the plot of a subgraph. This function is run in a worker
+    process when plots are rendered in parallel.
 
     Parameters
     ----------
-    graph
-    node_dict
-    edge_set
-    n
-    ilev
-    level
+    filename : str
+        path of the plot
+    nodes : list
+        list of source file names
+    edges : list
+        list of dependencies
+    extension : str
+        plot extension
 
     Returns
     -------
+    filename : str
+        path of the plot
 
     """
-    if ilev == level:
-        return
-
-    if len(n.dependencies) > 0:
-        for m in n.dependencies:
-            if m not in node_dict:
-                continue
-            tpl = (n.name, m.name)
-            if tpl not in edge_set:
-                edge_set.add(tpl)
-                edge = pydot.Edge(node_dict[n], node_dict[m])
-                graph.add_edge(edge)
-                _add_pydot_edges(graph, node_dict, edge_set, m, ilev + 1, level)
-    return
+    graph = pydot.Dot(graph_type="digraph")
+    for name in nodes:
+        graph.add_node(pydot.Node(name, style="filled", fillcolor="red", label=name))
+    for name, dependency in edges:
+        graph.add_edge(pydot.Edge(name, dependency))
+    if extension == ".png":
+        graph.write_png(filename)
+    elif extension == ".pdf":
+        graph.write_pdf(filename)
+    elif extension == ".dot":
+        graph.write_dot(filename)
+    return filename
 
 
 def make_plots(
@@ -131,6 +195,8 @@ def make_plots(
     extension=".png",
     verbose=False,
     networkx=False,
+    jobs=None,
+    graph_file=None,
 ):
     """Create plots of module dependencies.
 
@@ -155,15 +221,38 @@ def make_plots(
         source files are compiled in. The NetworkX package tends to result in
         a unique DAG more often than the standard algorithm used in pymake.
         (default is False)
+    jobs : int
+        maximum number of plots rendered at the same time. Plots are rendered
+        in the current process if jobs is 1. The number of available
+        processors is used if jobs is None or less than 1. (default is None)
+    graph_file : str
+        path of a DOT (.dot or .gv) or JSON (.json) file the dependency graph
+        of all of the source files is written to. The dependency graph is
+        not written if graph_file is None. (default is None)
 
     Returns
     -------
+    filenames : list
+        list of plots that were rendered. Plots of subgraphs that have not
+        changed since the plots were last created are not rendered again.
 
     """
-    srcfiles = _get_ordered_srcfiles(
-        _get_srcfiles(srcdir, include_subdir), networkx=networkx
-    )
+    if not os.path.isdir(outdir):
+        raise Exception("output directory does not exist")
+    if extension not in _PLOT_EXTENSIONS:
+        raise Exception(f"unknown file extension: {extension}")
+
+    # source file information is saved in the output directory so unchanged
+    # source files are not scanned again. The source files are only scanned
+    # once to build the nodelist, which is sorted in compile order.
+    srcfiles = _get_srcfiles(srcdir, include_subdir)
+    _load_source_info(outdir)
     nodelist = _get_f_nodelist(srcfiles)
+    _save_source_info(outdir, srcfiles)
+    nodes = {n.name: n for n in nodelist}
+    dag = DirectedAcyclicGraph(nodelist, networkx=networkx)
+    nodelist = [nodes[n.name] for n in dag.toposort()]
+
     for idx, n in enumerate(nodelist):
         if verbose:
             print(f"{idx + 1:<3d}: {os.path.basename(n.name)}")
@@ -171,33 +260,52 @@ def make_plots(
                 msg = f"     {jdx + 1:<3d}: {os.path.basename(m.name)}"
                 print(msg)
 
-    if not os.path.isdir(outdir):
-        raise Exception("output directory does not exist")
-
-    for n in nodelist:
-        filename = os.path.join(outdir, os.path.basename(n.name) + extension)
+    # write the dependency graph for all of the source files
+    if graph_file is not None:
+        DependencyGraph(srcfiles).write(graph_file)
+        if verbose:
+            print(f"Writing dependency graph to {graph_file}")
+
+    # load the hashes of the subgraphs in existing plots
+    hash_fpth = os.path.join(outdir, _PLOT_HASH_FILE)
+    plot_hashes = {}
+    if os.path.isfile(hash_fpth):
+        try:
+            with open(hash_fpth) as f:
+                plot_hashes = json.load(f)
+        except (OSError, ValueError):
+            plot_hashes = {}
+
+    # determine the plots that need to be rendered
+    tasks = []
+    new_hashes = {}
+    for n, (names, edges) in _get_subgraphs(nodelist, level).items():
+        name = os.path.basename(n.name) + extension
+        filename = os.path.join(outdir, name)
+        subgraph_hash = _get_subgraph_hash(names, edges, extension)
+        new_hashes[name] = subgraph_hash
+        if plot_hashes.get(name) == subgraph_hash and os.path.isfile(filename):
+            if verbose:
+                print(f"Skipping unchanged {filename}")
+            continue
         if verbose:
             print("Creating " + filename)
-        graph = pydot.Dot(graph_type="digraph")
-        node_dict = {}
-        ilev = 0
-        _add_pydot_nodes(graph, node_dict, n, ilev, level)
-        edge_set = set()
-        ilev = 1
-        _add_pydot_edges(graph, node_dict, edge_set, n, ilev, level)
-        if extension == ".png":
-            graph.write_png(filename)
-        elif extension == ".pdf":
-            graph.write_pdf(filename)
-        elif extension == ".dot":
-            graph.write_dot(filename)
-        else:
-            raise Exception(f"unknown file extension: {extension}")
-
-    return
-
-
-if __name__ == "__main__":
-    srcdir = "src"
-    outdir = "img"
-    make_plots(srcdir, outdir)
+        tasks.append((filename, names, edges, extension))
+
+    # render the plots
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, max(len(tasks), 1))
+    if jobs == 1:
+        filenames = [_render_subgraph(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_render_subgraph, *task) for task in tasks]
+            filenames = [future.result() for future in futures]
+
+    # save the subgraph hashes once all of the plots have been rendered
+    plot_hashes.update(new_hashes)
+    with open(hash_fpth, "w") as f:
+        json.dump(plot_hashes, f, indent=1, sort_keys=True)
+
+    return filenames
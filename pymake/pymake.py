@@ -54,24 +54,22 @@ MODFLOW 6 was built.
 
 import argparse
 import os
-import shutil
 import sys
-import time
 from pathlib import Path
 from zipfile import ZipFile
 
 from .config import __description__
 from .pymake_base import main
 from .pymake_parser import _get_standard_arg_dict, _parser_setup
-from .utils._compiler_switches import (
-    _get_c_flags,
-    _get_fortran_flags,
-    _get_linker_flags,
-    _get_optlevel,
-    _get_osname,
+from .utils._build_profile import (
+    _activate_build_profile,
+    _deactivate_build_profile,
+    _get_active_build_profile,
+    _profile_step,
 )
+from .utils._compiler_switches import _get_toolchain_profile
 from .utils._usgs_src_update import _build_replace
-from .utils.download import download_and_unzip, zip_all
+from .utils.download import _remove_download_dir, download_and_unzip, zip_all
 from .utils.usgsprograms import usgs_program_data
 
 
@@ -120,6 +118,13 @@ class Pymake:
         self.networkx = None
         self.meson = None
         self.mesondir = None
+        self.jobs = None
+        self.cache = None
+        self.linkmode = None
+        self.profile = None
+        self.compile_commands = None
+        self.keep_going = None
+        self.watch = None
 
         # set class variables with default values from arg_dict
         for key, value in _get_standard_arg_dict().items():
@@ -170,6 +175,13 @@ class Pymake:
         if self.download:
             self._download_cleanup()
 
+        # write the build profile and stop recording build steps
+        if self.profile is not None:
+            build_profile = _get_active_build_profile()
+            if build_profile is not None:
+                build_profile.write_trace()
+                _deactivate_build_profile()
+
     def _print_settings(self):
         """Print settings defined by command line arguments
 
@@ -405,6 +417,10 @@ class Pymake:
 
         """
         if not self.download:
+            # record the download in the build profile
+            if self.profile is not None:
+                _activate_build_profile(self.profile)
+
             # write message
             msg = f"downloading...'{self.url}'"
             print(msg)
@@ -435,33 +451,7 @@ class Pymake:
                 # reset self.download
                 self.download = None
 
-                if os.path.exists(self.download_dir):
-                    ntries = 10
-                    for itries in range(ntries):
-                        # wait to delete on windows
-                        if _get_osname() == "win32":
-                            time.sleep(3)
-
-                        # remove the directory
-                        try:
-                            shutil.rmtree(self.download_dir)
-                            if self.verbose:
-                                print(
-                                    "removing download "
-                                    f"directory...'{self.download_dir}'"
-                                )
-                            break
-                        except:
-                            if self.verbose:
-                                msg = (
-                                    f"    removal attempt {itries + 1:>2d} "
-                                    f"of {ntries:>2d}"
-                                )
-                                print(msg)
-
-                    # wait prior to returning on windows
-                    if _get_osname() == "win32":
-                        time.sleep(6)
+                _remove_download_dir(self.download_dir, verbose=self.verbose)
 
         return
 
@@ -702,57 +692,33 @@ class Pymake:
         # set sharedobject for known targets
         self._set_sharedobject()
 
-        # set compiler flags
+        # set compiler flags using the toolchain profile for the target
+        profile = _get_toolchain_profile(
+            self.target,
+            self.fc,
+            self.cc,
+            self.debug,
+            double=self.double,
+            sharedobject=self.sharedobject,
+        )
         if self.fc != "none":
             if self.fflags is None:
-                optlevel = (
-                    _get_optlevel(self.target, self.fc, self.cc, self.debug, [], [])
-                    + " "
-                )
-
-                self.fflags = optlevel + " ".join(
-                    _get_fortran_flags(
-                        self.target,
-                        self.fc,
-                        [],
-                        self.debug,
-                        double=self.double,
-                        sharedobject=self.sharedobject,
-                    )
-                )
+                self.fflags = profile.optlevel + " " + " ".join(profile.fflags)
         if self.cc != "none":
             if self.cflags is None:
-                optlevel = (
-                    _get_optlevel(self.target, self.fc, self.cc, self.debug, [], [])
-                    + " "
-                )
-
-                self.cflags = optlevel + " ".join(
-                    _get_c_flags(
-                        self.target,
-                        self.cc,
-                        [],
-                        self.debug,
-                        sharedobject=self.sharedobject,
-                    )
-                )
+                self.cflags = profile.optlevel + " " + " ".join(profile.cflags)
         if self.syslibs is None:
-            self.syslibs = " ".join(
-                _get_linker_flags(
-                    self.target,
-                    self.fc,
-                    self.cc,
-                    [],
-                    [],
-                    sharedobject=self.sharedobject,
-                )[1]
-            )
+            self.syslibs = " ".join(profile.syslibs)
 
         self.target = self.update_target(self.target, modify_target=modify_exe_name)
 
         build_target = self.set_build_target_bool()
 
         if build_target:
+            # record build steps in the build profile
+            if self.profile is not None:
+                _activate_build_profile(self.profile)
+
             # print Pymake() settings
             if self.verbose:
                 self._print_settings()
@@ -769,13 +735,14 @@ class Pymake:
                     print(msg)
 
                 # execute select replace function
-                replace_function(
-                    self.srcdir,
-                    self.fc,
-                    self.cc,
-                    self.arch,
-                    self.double,
-                )
+                with _profile_step(self.target, "patch"):
+                    replace_function(
+                        self.srcdir,
+                        self.fc,
+                        self.cc,
+                        self.arch,
+                        self.double,
+                    )
 
             # write message
             print(f"compiling...{self.target}")
@@ -808,6 +775,13 @@ class Pymake:
                 networkx=self.networkx,
                 meson=self.meson,
                 mesondir=self.mesondir,
+                jobs=self.jobs,
+                cache=self.cache,
+                linkmode=self.linkmode,
+                profile=self.profile,
+                compile_commands=self.compile_commands,
+                keep_going=self.keep_going,
+                watch=self.watch,
             )
 
         # issue error if target was not built
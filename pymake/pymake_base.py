@@ -29,6 +29,13 @@ from a script in combination with :code:`pymake.parser()`.
         appdir=args.appdir,
         verbose=args.verbose,
         inplace=args.inplace,
+        jobs=args.jobs,
+        cache=args.cache,
+        linkmode=args.linkmode,
+        profile=args.profile,
+        compile_commands=args.compile_commands,
+        keep_going=args.keep_going,
+        watch=args.watch,
     )
 
 
@@ -49,6 +56,23 @@ from pathlib import Path
 from textwrap import dedent
 
 from .config import __version__
+from .utils._build_database import _BuildDatabase
+from .utils._build_profile import (
+    _activate_build_profile,
+    _deactivate_build_profile,
+    _get_active_build_profile,
+    _get_output_size,
+    _profile_step,
+)
+from .utils._compile_commands import _write_compile_commands
+from .utils._compile_scheduler import (
+    _CompileJob,
+    _load_compile_times,
+    _report_compile_failures,
+    _run_compile_jobs,
+    _save_compile_times,
+    _set_compile_priorities,
+)
 from .utils._compiler_language_files import (
     _get_c_files,
     _get_fortran_files,
@@ -57,21 +81,17 @@ from .utils._compiler_language_files import (
     _preprocess_file,
 )
 from .utils._compiler_switches import (
-    _get_c_flags,
-    _get_fortran_flags,
-    _get_linker_flags,
-    _get_optlevel,
     _get_os_macro,
     _get_osname,
+    _get_toolchain_profile,
 )
+from .utils._dag import _get_f_nodedict
 from .utils._file_utils import _get_extra_exclude_files
 from .utils._meson_build import _meson_build
-from .utils._Popen_wrapper import (
-    _process_Popen_command,
-    _process_Popen_communicate,
-    _process_Popen_initialize,
-    _process_Popen_stdout,
-)
+from .utils._object_cache import _ObjectCache
+from .utils._process_runner import _run_process
+from .utils._source_mirror import _SourceMirror
+from .utils._source_watcher import _SourceWatcher, _watch_build
 
 
 def main(
@@ -101,6 +121,13 @@ def main(
     networkx=False,
     meson=False,
     mesondir=".",
+    jobs=1,
+    cache=False,
+    linkmode="copy",
+    profile=None,
+    compile_commands=None,
+    keep_going=False,
+    watch=False,
 ):
     """Main pymake function.
 
@@ -119,7 +146,9 @@ def main(
         after successful build
     expedite : bool
         boolean indicating if only out of date source files will be compiled.
-        Clean must not have been used on previous build.
+        Object files are out of date if the source file, compile command,
+        compiler version, or module files used by the source file have
+        changed. Clean must not have been used on previous build.
     dryrun : bool
         boolean indicating if source files should be compiled.  Files will be
         deleted, if makeclean is True.
@@ -173,13 +202,125 @@ def main(
         meson build system. (default is False)
     mesondir : str
         Main meson.build file path
+    jobs : int
+        maximum number of source files to compile at the same time. Source
+        files are compiled once the source files that create the modules
+        they use have been compiled. The number of available processors is
+        used if jobs is None or less than 1. (default is 1)
+    cache : bool
+        boolean indicating if object and module files should be restored from
+        and stored in the shared object cache in the user cache directory.
+        The cache directory and maximum cache size can be set using the
+        PYMAKE_CACHE_DIR and PYMAKE_CACHE_SIZE environment variables.
+        (default is False)
+    linkmode : str
+        method used to add new and changed source files to the temporary
+        source directory if inplace is False. Source files are copied if
+        linkmode is 'copy', hard linked if linkmode is 'hardlink', and
+        cloned using copy-on-write reflinks if linkmode is 'reflink'. Source
+        files are copied if the file system does not support hard links or
+        reflinks. (default is 'copy')
+    profile : str
+        path of a Chrome trace JSON file the start time, end time, duration,
+        return code, and output size of each build step are written to. The
+        trace file can be viewed using chrome://tracing or
+        https://ui.perfetto.dev and a summary of the slowest build steps is
+        written to the terminal. Build steps are not recorded if profile is
+        None. (default is None)
+    compile_commands : str
+        path of a JSON compilation database (compile_commands.json) the
+        planned compile command for each source file is written to. The
+        compilation database is written even if dryrun is True and entries
+        for other targets in an existing compilation database are retained.
+        compile_commands.json is written to compile_commands if it is a
+        directory. A compilation database is not written if
+        compile_commands is None or makeclean is True, since the compile
+        commands use the temporary source, object, and module directories
+        that are removed if makeclean is True. (default is None)
+    keep_going : bool
+        boolean indicating if source files that do not depend on a source
+        file that failed to compile will continue to be compiled after a
+        compile failure. Every compile failure and the source files that were
+        not compiled because of them are reported at the end of the build.
+        (default is False)
+    watch : bool
+        boolean indicating if the target will be rebuilt every time a file in
+        srcdir, srcdir2, or extrafiles is added, changed, or removed until the
+        build is interrupted using Ctrl+C. Rebuilds are expedited and the
+        temporary files are not removed, so only the source files affected by
+        a change are compiled before the target is linked again.
+        (default is False)
 
     Returns
     -------
     returncode : int
-        return code
+        return code of the build or, if watch is True, the last build
 
     """
+    # build the target and rebuild it every time a source file changes
+    if watch and srcdir is not None and target is not None:
+        if makeclean or not expedite:
+            print(
+                "Watching source files for changes, resetting expedite to True "
+                "and makeclean to False"
+            )
+        kwargs = {
+            "srcdir": srcdir,
+            "target": target,
+            "fc": fc,
+            "cc": cc,
+            "makeclean": False,
+            "expedite": True,
+            "dryrun": dryrun,
+            "double": double,
+            "debug": debug,
+            "include_subdirs": include_subdirs,
+            "fflags": fflags,
+            "cflags": cflags,
+            "syslibs": syslibs,
+            "arch": arch,
+            "makefile": makefile,
+            "makefiledir": makefiledir,
+            "srcdir2": srcdir2,
+            "extrafiles": extrafiles,
+            "excludefiles": excludefiles,
+            "sharedobject": sharedobject,
+            "appdir": appdir,
+            "verbose": verbose,
+            "inplace": inplace,
+            "networkx": networkx,
+            "meson": meson,
+            "mesondir": mesondir,
+            "jobs": jobs,
+            "cache": cache,
+            "linkmode": linkmode,
+            "profile": profile,
+            "compile_commands": compile_commands,
+            "keep_going": keep_going,
+            "watch": False,
+        }
+
+        # temporary directories and the target are not watched
+        objdir_temp, moddir_temp, srcdir_temp = get_temporary_directories(
+            appdir=appdir, target=Path(target).stem
+        )
+        exclude_paths = [objdir_temp, moddir_temp, os.path.join(mesondir, "_build")]
+        if not inplace and not meson:
+            exclude_paths.append(srcdir_temp)
+        if appdir is not None:
+            exclude_paths.append(os.path.join(appdir, target))
+        else:
+            exclude_paths.append(target)
+        files = []
+        if isinstance(excludefiles, str):
+            files.append(excludefiles)
+        watcher = _SourceWatcher(
+            [srcdir, srcdir2],
+            files=files,
+            extrafiles=extrafiles,
+            exclude_paths=exclude_paths,
+        )
+        return _watch_build(lambda: main(**kwargs), watcher)
 
     if meson:
         if not inplace:
@@ -248,22 +389,36 @@ def main(
             print(f"creating target path - {pth}\n")
             os.makedirs(pth)
 
+        # start recording build steps in the build profile
+        build_profile = None
+        if profile is not None:
+            active_profile = _get_active_build_profile()
+            build_profile = _activate_build_profile(profile)
+            first_step = len(build_profile.events)
+            build_start = build_profile.get_time()
+
         # initialize
-        srcfiles = _pymake_initialize(
-            srcdir,
-            target,
-            srcdir2,
-            extrafiles,
-            excludefiles,
-            include_subdirs,
-            objdir_temp,
-            moddir_temp,
-            srcdir_temp,
-            meson,
-        )
+        with _profile_step(os.path.basename(srcdir_temp), "initialize"):
+            srcfiles = _pymake_initialize(
+                srcdir,
+                target,
+                srcdir2,
+                extrafiles,
+                excludefiles,
+                include_subdirs,
+                objdir_temp,
+                moddir_temp,
+                srcdir_temp,
+                meson,
+                linkmode=linkmode,
+            )
 
-        # get ordered list of files to compile
-        srcfiles = _get_ordered_srcfiles(srcfiles, networkx)
+        # get ordered list of files to compile. Source file information is
+        # saved in the object directory so unchanged source files are not
+        # scanned again in expedited builds.
+        with _profile_step(os.path.basename(srcdir_temp), "scan") as step:
+            srcfiles = _get_ordered_srcfiles(srcfiles, networkx, cachedir=objdir_temp)
+            step["files"] = len(srcfiles)
 
         # set intelwin flag to True in compiling on windows with
         # Intel compilers
@@ -289,6 +444,12 @@ def main(
 
         # compile the executable
         if meson:
+            if compile_commands is not None:
+                print(
+                    "a compilation database is not written by pymake for "
+                    "meson builds, meson writes compile_commands.json to "
+                    "the meson build directory"
+                )
             returncode = _meson_build(
                 target,
                 srcdir,
@@ -307,6 +468,14 @@ def main(
                 verbose,
             )
         else:
+            if compile_commands is not None and makeclean:
+                print(
+                    "a compilation database is not written if makeclean is "
+                    "True because the temporary source, object, and module "
+                    "directories used by the compile commands are removed "
+                    "after the build"
+                )
+                compile_commands = None
             returncode = _pymake_compile(
                 srcfiles,
                 target,
@@ -323,6 +492,10 @@ def main(
                 intelwin,
                 sharedobject,
                 verbose,
+                jobs=jobs,
+                cache=cache,
+                compile_commands=compile_commands,
+                keep_going=keep_going,
             )
 
         # create makefile
@@ -358,6 +531,24 @@ def main(
                 mesondir,
                 verbose,
             )
+
+        # write the build profile and a summary of the slowest build steps
+        if build_profile is not None:
+            build_profile.add(
+                os.path.basename(target),
+                "build",
+                build_start,
+                build_profile.get_time(),
+                returncode=returncode,
+                output_size=_get_output_size(target),
+            )
+            build_profile.write_trace()
+            build_profile.summary(first=first_step)
+
+            # stop recording build steps if the build profile was started
+            # for this build
+            if build_profile is not active_profile:
+                _deactivate_build_profile()
     else:
         msg = (
             f"Nothing to do, the srcdir ({srcdir}) and/or target ({target}) "
@@ -379,9 +570,12 @@ def _pymake_initialize(
     moddir_temp,
     srcdir_temp,
     meson,
+    linkmode="copy",
 ):
-    """Remove temp source directory and target, and then copy source into
-    source temp directory.
+    """Remove the target and mirror the source files into the temporary
+    source directory. Only new and changed source files are copied into the
+    temporary source directory and source files that are no longer part of
+    the build are removed.
 
     Parameters
     ----------
@@ -408,6 +602,14 @@ def _pymake_initialize(
         path for directory that will contain the source files. If
         srcdir_temp is the same as srcdir then the original source files
         will be used.
+    meson : bool
+        boolean indicating that the executable should be built using the
+        meson build system.
+    linkmode : str
+        method used to add new and changed source files to srcdir_temp.
+        Source files are copied if linkmode is 'copy', hard linked if
+        linkmode is 'hardlink', and cloned using copy-on-write reflinks if
+        linkmode is 'reflink'. (default is 'copy')
 
     Returns
     -------
@@ -430,19 +632,17 @@ def _pymake_initialize(
         for idx, exclude_file in enumerate(excludefiles):
             excludefiles[idx] = os.path.basename(exclude_file)
 
-    # remove srcdir_temp and copy in srcdir
+    # mirror srcdir in srcdir_temp
+    mirror = None
     if not inplace:
-        if os.path.isdir(srcdir_temp):
-            shutil.rmtree(srcdir_temp)
-        if excludefiles:
-            shutil.copytree(
-                srcdir, srcdir_temp, ignore=shutil.ignore_patterns(*excludefiles)
-            )
-        else:
-            shutil.copytree(srcdir, srcdir_temp)
+        mirror = _SourceMirror(srcdir_temp, linkmode=linkmode)
+        mirror.add_tree(srcdir, srcdir_temp, exclude=excludefiles)
 
-    # get a list of source files in srcdir_temp to include
+    # get a list of source files in srcdir_temp to include. Files left in
+    # srcdir_temp by previous builds are skipped.
     srcfiles = _get_srcfiles(srcdir_temp, include_subdirs)
+    if mirror is not None:
+        srcfiles = [fpth for fpth in srcfiles if mirror.is_mirrored(fpth)]
 
     # copy files from a specified common source directory if
     # commonsrc is not None
@@ -452,14 +652,14 @@ def _pymake_initialize(
             dst = os.path.join(
                 srcdir_temp, os.path.basename(os.path.normpath(commonsrc))
             )
-            if excludefiles:
-                shutil.copytree(src, dst, ignore=shutil.ignore_patterns(*excludefiles))
-            else:
-                shutil.copytree(src, dst)
+            mirror.add_tree(src, dst, exclude=excludefiles)
         else:
             dst = os.path.relpath(os.path.abspath(os.path.abspath(commonsrc)))
 
-        srcfiles += _get_srcfiles(dst, include_subdirs)
+        files = _get_srcfiles(dst, include_subdirs)
+        if mirror is not None:
+            files = [fpth for fpth in files if mirror.is_mirrored(fpth)]
+        srcfiles += files
 
     # if extrafiles is not None, then it is a text file with a list of
     # additional source files that need to be copied into srctemp and
@@ -483,17 +683,21 @@ def _pymake_initialize(
             dst = os.path.normpath(os.path.relpath(fpth, os.getcwd()))
         else:
             dst = os.path.join(srcdir_temp, os.path.basename(fpth))
-            if os.path.isfile(dst):
+            if mirror.is_mirrored(dst):
                 raise ValueError(
                     "Error with extrafile.  Name conflicts with "
                     f"an existing source file: {dst}"
                 )
-        if not inplace:
-            shutil.copy(fpth, dst)
+            mirror.add_file(fpth, dst)
 
         # add extrafiles to srcfiles
         srcfiles.append(dst)
 
+    # remove files from previous builds that are no longer in the source
+    # directories
+    if mirror is not None:
+        mirror.remove_stale()
+
     # remove exclude files from srcfiles list
     if excludefiles:
         remove_list = []
@@ -699,6 +903,9 @@ def _create_openspec(intelwin, srcfiles, verbose):
             if os.path.isfile(fpth):
                 if verbose:
                     print(f'replacing..."{fpth}"')
+                # remove the file first so source files hard linked into
+                # the temporary source directory are not modified
+                os.remove(fpth)
                 f = open(fpth, "w")
                 if intelwin:
                     data_access = "SEQUENTIAL"
@@ -719,32 +926,6 @@ def _create_openspec(intelwin, srcfiles, verbose):
                 f.close()
 
 
-def _check_out_of_date(srcfile, objfile):
-    """Check if existing object files are current with the existing source
-    files.
-
-    Parameters
-    ----------
-    srcfile : str
-        source file path
-    objfile : str
-        object file path
-
-    Returns
-    -------
-    stale : bool
-        boolean indicating if the object file is current
-
-    """
-    stale = True
-    if os.path.exists(objfile):
-        t1 = os.path.getmtime(objfile)
-        t2 = os.path.getmtime(srcfile)
-        if t1 > t2:
-            stale = False
-    return stale
-
-
 def _pymake_compile(
     srcfiles,
     target,
@@ -761,6 +942,10 @@ def _pymake_compile(
     intelwin,
     sharedobject,
     verbose,
+    jobs=1,
+    cache=False,
+    compile_commands=None,
+    keep_going=False,
 ):
     """Standard compile method.
 
@@ -776,7 +961,9 @@ def _pymake_compile(
         c or cpp compiler
     expedite : bool
         boolean indicating if only out of date source files will be compiled.
-        Clean must not have been used on previous build.
+        Object files are out of date if the source file, compile command,
+        compiler version, or module files used by the source file have
+        changed. Clean must not have been used on previous build.
     dryrun : bool
         boolean indicating if source files should be compiled.  Files will be
         deleted, if makeclean is True.
@@ -800,6 +987,19 @@ def _pymake_compile(
         boolean indicating a shared object will be built
     verbose : bool
         boolean indicating if output will be printed to the terminal
+    jobs : int
+        maximum number of source files to compile at the same time
+        (default is 1)
+    cache : bool
+        boolean indicating if the shared object cache will be used
+        (default is False)
+    compile_commands : str
+        path of a JSON compilation database the planned compile commands are
+        written to (default is None)
+    keep_going : bool
+        boolean indicating if source files that do not depend on a failed
+        source file will be compiled after a compile failure
+        (default is False)
 
     Returns
     -------
@@ -824,47 +1024,35 @@ def _pymake_compile(
     # initialize returncode
     returncode = 0
 
-    # initialize ilink
-    ilink = 0
+    # initialize the compile jobs and the link command
+    compile_jobs = []
+    linkcmd = None
 
     # get temporary object and module directories
     objdir_temp, moddir_temp, _ = get_temporary_directories(
         os.path.dirname(target), target=Path(target).stem
     )
 
-    # set optimization levels
-    optlevel = _get_optlevel(target, fc, cc, debug, fflags, cflags)
-
-    # get fortran and c compiler switches
-    tfflags = _get_fortran_flags(
+    # get the optimization level, fortran and c compiler switches, and
+    # linker flags and syslibs from the toolchain profile
+    profile = _get_toolchain_profile(
         target,
         fc,
-        fflags,
-        debug,
-        double,
-        sharedobject=sharedobject,
-        verbose=verbose,
-    )
-    tcflags = _get_c_flags(
-        target,
         cc,
-        cflags,
         debug,
-        srcfiles,
-        sharedobject=sharedobject,
-        verbose=verbose,
-    )
-
-    # get linker flags and syslibs
-    lc, tlflags = _get_linker_flags(
-        target,
-        fc,
-        cc,
-        syslibs,
-        srcfiles,
+        double=double,
         sharedobject=sharedobject,
+        fflags=fflags,
+        cflags=cflags,
+        syslibs=syslibs,
+        srcfiles=srcfiles,
         verbose=verbose,
     )
+    optlevel = profile.optlevel
+    tfflags = list(profile.fflags)
+    tcflags = list(profile.cflags)
+    lc = profile.linker
+    tlflags = list(profile.syslibs)
 
     # clean exe prior to build so that test for exe below can return a
     # non-zero error code
@@ -905,6 +1093,7 @@ def _pymake_compile(
                     print(f"could not remove '{batchfile}'")
 
         # Create target using a batch file on Windows
+        batchcmd = None
         try:
             _create_win_batch(
                 batchfile,
@@ -924,7 +1113,7 @@ def _pymake_compile(
             )
 
             # build the command list for the Windows batch file
-            cmdlists = [
+            batchcmd = [
                 batchfile,
             ]
         except:
@@ -945,10 +1134,17 @@ def _pymake_compile(
                 if ext.lower() != ".so":
                     target = program_path + ".so"
 
-        # initialize the commands and object files list
-        cmdlists = []
+        # initialize the object files list
         objfiles = []
 
+        # get the source files each fortran source file depends on and the
+        # modules used by each fortran source file
+        ffiles = _get_fortran_files(srcfiles)
+        if ffiles is None:
+            nodedict = {}
+        else:
+            nodedict = _get_f_nodedict(ffiles)
+
         # assume that header files may be in other folders, so make a list
         searchdir = []
         for f in srcfiles:
@@ -1008,68 +1204,144 @@ def _pymake_compile(
             # Save the name of the object file for linker
             objfiles.append(objfile)
 
-            # If expedited, then check if object file is out of date, if it
-            # exists. No need to compile if object file is newer.
-            compilefile = True
-            if expedite:
-                if not _check_out_of_date(srcfile, objfile):
-                    compilefile = False
-
-            if compilefile:
-                cmdlists.append(cmdlist)
+            # add the compile job with the source files it depends on and
+            # the modules it uses that are created by other source files
+            node = nodedict.get(srcfile)
+            if node is None:
+                dependencies = None
+                modules_used = None
+                modules_provided = None
+            else:
+                dependencies = [m.name for m in node.dependencies]
+                modules_used = [m for m in node.uses if m not in node.modules]
+                modules_provided = node.modules
+            compile_jobs.append(
+                _CompileJob(
+                    srcfile,
+                    cmdlist,
+                    dependencies=dependencies,
+                    objfile=objfile,
+                    modules_used=modules_used,
+                    modules_provided=modules_provided,
+                )
+            )
 
-        # Build the link command and then link to create the executable
-        ilink = len(cmdlists)
-        if ilink > 0:
-            cmdlist = [lc, optlevel]
-            cmdlist.append("-o")
-            cmdlist.append(target)
+        # Build the link command to create the executable
+        if len(compile_jobs) > 0:
+            linkcmd = [lc, optlevel]
+            linkcmd.append("-o")
+            linkcmd.append(target)
             for objfile in objfiles:
-                cmdlist.append(objfile)
+                linkcmd.append(objfile)
 
             # linker switches
             for switch in tlflags:
-                cmdlist.append(switch)
+                linkcmd.append(switch)
 
-            # add linker command to the commands list
-            cmdlists.append(cmdlist)
+    # write the planned compile commands to the compilation database
+    if compile_commands is not None:
+        if intelwin:
+            print(
+                "a compilation database is not written for builds using "
+                "Intel compilers on Windows"
+            )
+        else:
+            _write_compile_commands(
+                compile_commands, compile_jobs, objdir_temp, verbose=verbose
+            )
 
-    # execute each command in cmdlists
+    # execute the compile and link commands
     if not dryrun:
         target_str = os.path.basename(target)
-        for idx, cmdlist in enumerate(cmdlists):
-            if idx == 0:
-                if intelwin:
-                    msg = (
-                        f"\nCompiling '{target_str}' "
-                        "for Windows using Intel compilers..."
-                    )
-                else:
-                    msg = f"\nCompiling object files for '{target_str}'"
-                print(msg)
-            if idx > 0 and idx == ilink:
-                msg = f"\nLinking object files to make '{target_str}'..."
+        if intelwin:
+            if batchcmd is not None:
+                msg = f"\nCompiling '{target_str}' for Windows using Intel compilers..."
                 print(msg)
 
-            # write the command to the terminal
-            _process_Popen_command(False, cmdlist)
-
-            # run the command using Popen
-            proc = _process_Popen_initialize(cmdlist, intelwin)
-
-            # write batch file execution to terminal
-            if intelwin:
-                _process_Popen_stdout(proc)
-            # establish communicator to report errors
-            else:
-                _process_Popen_communicate(proc)
-
-            # evaluate return code
-            returncode = proc.returncode
-            if returncode != 0:
-                msg = f"compilation failed on '{' '.join(cmdlist)}'"
-                print(msg)
-                break
+                # run the batch file and write execution to terminal
+                with _profile_step(target_str, "compile") as step:
+                    result = _run_process(batchcmd, echo=True, merge_stderr=True)
+                    step["returncode"] = result.returncode
+                    step["output_size"] = _get_output_size(target)
+
+                # evaluate return code
+                returncode = result.returncode
+                if returncode != 0:
+                    msg = f"compilation failed on '{' '.join(batchcmd)}'"
+                    print(msg)
+        else:
+            # compile the source files using the DAG to schedule the jobs.
+            # If expedited, object files that are current in the build
+            # database are not compiled.
+            if len(compile_jobs) > 0:
+                print(f"\nCompiling object files for '{target_str}'")
+                build_db = _BuildDatabase(objdir_temp, moddir_temp)
+                if expedite:
+                    is_current = build_db.is_current
+                else:
+                    is_current = None
+                if cache:
+                    object_cache = _ObjectCache(moddir_temp)
+                    restore = object_cache.restore
+                    store = object_cache.store
+                else:
+                    object_cache = None
+                    restore = None
+                    store = None
+                compile_times = _load_compile_times(objdir_temp)
+                _set_compile_priorities(compile_jobs, compile_times)
+                returncode = _run_compile_jobs(
+                    compile_jobs,
+                    jobs=jobs,
+                    is_current=is_current,
+                    on_success=build_db.update,
+                    restore=restore,
+                    store=store,
+                    keep_going=keep_going,
+                )
+                build_db.save()
+                _save_compile_times(objdir_temp, compile_jobs, compile_times)
+                if expedite:
+                    ncurrent = sum(1 for job in compile_jobs if job.skipped)
+                    print(
+                        f"{ncurrent} of {len(compile_jobs)} object files "
+                        "were current and were not compiled"
+                    )
+                    unchanged = [
+                        job.name
+                        for job in compile_jobs
+                        if job.modules_provided and job.interface_changed is False
+                    ]
+                    if len(unchanged) > 0:
+                        print(
+                            f"module interfaces were not changed by {len(unchanged)} "
+                            "compiled source files"
+                        )
+                if object_cache is not None:
+                    object_cache.trim()
+                    object_cache.report()
+
+                # report every compile failure and the source files that
+                # were not compiled because of them
+                if returncode != 0:
+                    _report_compile_failures(compile_jobs)
+
+            # link the object files to create the executable
+            if returncode == 0 and linkcmd is not None:
+                print(f"\nLinking object files to make '{target_str}'...")
+
+                # run the command and report errors
+                with _profile_step(target_str, "link") as step:
+                    result = _run_process(linkcmd, echo=True)
+                    step["returncode"] = result.returncode
+                    step["output_size"] = _get_output_size(target)
+                    step["peak_rss"] = result.peak_rss
+
+                # evaluate return code
+                returncode = result.returncode
+                if returncode != 0:
+                    msg = f"compilation failed on '{' '.join(linkcmd)}'"
+                    print(msg)
 
     # print blank line separator after all commands in cmdlist are executed
     print("")
@@ -1526,7 +1798,18 @@ def _create_makefile(
         f.write(line)
 
     # optimization level
-    optlevel = _get_optlevel(target, fc, cc, debug, fflags, cflags)
+    optlevel = _get_toolchain_profile(
+        target,
+        fc,
+        cc,
+        debug,
+        double=double,
+        sharedobject=sharedobject,
+        fflags=fflags,
+        cflags=cflags,
+        syslibs=syslibs,
+        srcfiles=srcfiles,
+    ).optlevel
     line = "# set the optimization level (OPTLEVEL) if not defined\n"
     line += f"OPTLEVEL ?= {optlevel.replace('/', '-')}\n\n"
     f.write(line)
@@ -1543,15 +1826,17 @@ def _create_makefile(
         line = "# set the fortran flags\n"
         line += "ifeq ($(detected_OS), Windows)\n"
         line += "\tifeq ($(FC), gfortran)\n"
-        tfflags = _get_fortran_flags(
-            target,
-            "gfortran",
-            [],
-            debug,
-            double,
-            osname="win32",
-            sharedobject=sharedobject,
-            verbose=verbose,
+        tfflags = list(
+            _get_toolchain_profile(
+                target,
+                "gfortran",
+                None,
+                debug,
+                double=double,
+                sharedobject=sharedobject,
+                osname="win32",
+                verbose=verbose,
+            ).fflags
         )
         for idx, flag in enumerate(tfflags):
             if "-D_" in flag:
@@ -1562,15 +1847,17 @@ def _create_makefile(
         line += "\tendif\n"
         line += "else\n"
         line += "\tifeq ($(FC), gfortran)\n"
-        tfflags = _get_fortran_flags(
-            target,
-            "gfortran",
-            [],
-            debug,
-            double,
-            osname="linux",
-            sharedobject=sharedobject,
-            verbose=verbose,
+        tfflags = list(
+            _get_toolchain_profile(
+                target,
+                "gfortran",
+                None,
+                debug,
+                double=double,
+                sharedobject=sharedobject,
+                osname="linux",
+                verbose=verbose,
+            ).fflags
         )
         for idx, flag in enumerate(tfflags):
             if "-D__" in flag:
@@ -1580,15 +1867,17 @@ def _create_makefile(
         line += f"\t\tFFLAGS ?= {' '.join(tfflags)}\n"
         line += "\tendif\n"
         line += "\tifeq ($(FC), $(filter $(FC), ifort mpiifort))\n"
-        tfflags = _get_fortran_flags(
-            target,
-            "ifort",
-            [],
-            debug,
-            double,
-            osname="linux",
-            sharedobject=sharedobject,
-            verbose=verbose,
+        tfflags = list(
+            _get_toolchain_profile(
+                target,
+                "ifort",
+                None,
+                debug,
+                double=double,
+                sharedobject=sharedobject,
+                osname="linux",
+                verbose=verbose,
+            ).fflags
         )
         for idx, flag in enumerate(tfflags):
             if "-D__" in flag:
@@ -1606,69 +1895,74 @@ def _create_makefile(
         line = "# set the c/c++ flags\n"
         line += "ifeq ($(detected_OS), Windows)\n"
         line += "\tifeq ($(CC), $(filter $(CC), gcc g++))\n"
-        tcflags = _get_c_flags(
+        tcflags = _get_toolchain_profile(
             target,
+            None,
             "gcc",
-            fflags,
             debug,
-            srcfiles,
-            osname="win32",
             sharedobject=sharedobject,
+            cflags=fflags,
+            srcfiles=srcfiles,
+            osname="win32",
             verbose=verbose,
-        )
+        ).cflags
         line += f"\t\tCFLAGS ?= {' '.join(tcflags)}\n"
         line += "\tendif\n"
         line += "\tifeq ($(CC), $(filter $(CC), clang clang++))\n"
-        tcflags = _get_c_flags(
+        tcflags = _get_toolchain_profile(
             target,
+            None,
             "clang",
-            fflags,
             debug,
-            srcfiles,
-            osname="win32",
             sharedobject=sharedobject,
+            cflags=fflags,
+            srcfiles=srcfiles,
+            osname="win32",
             verbose=verbose,
-        )
+        ).cflags
         line += f"\t\tCFLAGS ?= {' '.join(tcflags)}\n"
         line += "\tendif\n"
         line += "else\n"
         line += "\tifeq ($(CC), $(filter $(CC), gcc g++))\n"
-        tcflags = _get_c_flags(
+        tcflags = _get_toolchain_profile(
             target,
+            None,
             "gcc",
-            fflags,
             debug,
-            srcfiles,
-            osname="linux",
             sharedobject=sharedobject,
+            cflags=fflags,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).cflags
         line += f"\t\tCFLAGS ?= {' '.join(tcflags)}\n"
         line += "\tendif\n"
         line += "\tifeq ($(CC), $(filter $(CC), clang clang++))\n"
-        tcflags = _get_c_flags(
+        tcflags = _get_toolchain_profile(
             target,
+            None,
             "clang",
-            fflags,
             debug,
-            srcfiles,
-            osname="linux",
             sharedobject=sharedobject,
+            cflags=fflags,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).cflags
         line += f"\t\tCFLAGS ?= {' '.join(tcflags)}\n"
         line += "\tendif\n"
         line += "\tifeq ($(CC), $(filter $(CC), icc mpiicc icpc))\n"
-        tcflags = _get_c_flags(
+        tcflags = _get_toolchain_profile(
             target,
+            None,
             "icc",
-            fflags,
             debug,
-            srcfiles,
-            osname="linux",
             sharedobject=sharedobject,
+            cflags=fflags,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).cflags
         line += f"\t\tCFLAGS ?= {' '.join(tcflags)}\n"
         line += "\tendif\n"
         line += "endif\n\n"
@@ -1680,44 +1974,44 @@ def _create_makefile(
     line += "ifeq ($(detected_OS), Windows)\n"
     # c/c++ compiler used for linking
     if fext is None:
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             None,
             "gcc",
-            [],
-            srcfiles,
-            osname="win32",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="win32",
             verbose=verbose,
-        )
+        ).syslibs
         line += "\tifeq ($(CC), $(filter $(CC), gcc g++))\n"
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             None,
             "clang",
-            [],
-            srcfiles,
-            osname="win32",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="win32",
             verbose=verbose,
-        )
+        ).syslibs
         line += "\tifeq ($(CC), $(filter $(CC), clang clang++))\n"
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
     # fortran compiler used for linking
     else:
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             "gfortran",
             "gcc",
-            [],
-            srcfiles,
-            osname="win32",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="win32",
             verbose=verbose,
-        )
+        ).syslibs
         line += "\tifeq ($(FC), $(filter $(FC), gfortran))\n"
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
@@ -1725,29 +2019,29 @@ def _create_makefile(
     line += "else\n"
     # c/c++ compiler used for linking
     if fext is None:
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             None,
             "gcc",
-            [],
-            srcfiles,
-            osname="linux",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).syslibs
         line += "\tifeq ($(CC), $(filter $(CC), gcc g++))\n"
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             None,
             "clang",
-            [],
-            srcfiles,
-            osname="linux",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).syslibs
         line += "\tifeq ($(CC), $(filter $(CC), clang clang++))\n"
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
@@ -1755,30 +2049,30 @@ def _create_makefile(
     else:
         # gfortran compiler
         line += "\tifeq ($(FC), gfortran)\n"
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             "gfortran",
             "gcc",
-            [],
-            srcfiles,
-            osname="linux",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).syslibs
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
         # ifort compiler
         line += "\tifeq ($(FC), $(filter $(FC), ifort mpiifort))\n"
-        _, tsyslibs = _get_linker_flags(
+        tsyslibs = _get_toolchain_profile(
             target,
             "ifort",
             "icc",
-            [],
-            srcfiles,
-            osname="linux",
+            debug,
             sharedobject=sharedobject,
+            srcfiles=srcfiles,
+            osname="linux",
             verbose=verbose,
-        )
+        ).syslibs
         line += f"\t\tLDFLAGS ?= {' '.join(tsyslibs)}\n"
         line += "\tendif\n"
 
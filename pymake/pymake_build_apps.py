@@ -21,17 +21,37 @@ be built by specifying:
 
 Applications are built in the order they are listed in the list. All valid
 USGS applications are built if no list is passed to
-:code:`pymake.build_apps()`.
+:code:`pymake.build_apps()`. The archives needed by all of the applications
+are downloaded before they are needed, each unique archive is downloaded once,
+and each extracted archive is kept until the last application built from it
+has been built. Independent applications can be built at the same
+time by specifying the maximum number of applications built at the same time.
+The compile jobs of all of the applications share a single job budget. For
+example, MODFLOW 6, MODFLOW-2005, and MODFLOW-NWT could be built at the same
+time using up to 8 compile jobs by specifying:
+
+.. code-block:: python
+
+    import pymake
+    pm = pymake.Pymake()
+    pm.jobs = 8
+    pymake.build_apps(["mf6", "mf2005", "mfnwt"], pymake_object=pm, parallel=3)
 
 """
 
+import copy
 import os
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from .pymake import Pymake
 from .pymake_base import get_temporary_directories
+from .utils._build_profile import _activate_build_profile
+from .utils._compile_scheduler import _get_number_of_jobs
+from .utils._download_planner import _DownloadPlanner
+from .utils._process_runner import _activate_job_budget, _deactivate_job_budget
 from .utils.usgsprograms import usgs_program_data
 
 
@@ -45,6 +65,7 @@ def build_apps(
     meson=False,
     mesondir=".",
     clean=True,
+    parallel=1,
 ):
     """Build all of the current targets or a subset of targets.
 
@@ -67,7 +88,18 @@ def build_apps(
     mesondir : str
         Main meson.build file path
     clean : bool
-        boolean determining of final download should be removed
+        boolean determining if each downloaded archive should be removed
+        after the last target built from it has been built
+    parallel : int
+        maximum number of targets built at the same time. Targets are
+        grouped by download url and each archive is downloaded once, at the
+        same time as other archives, into download_dir, where it is shared
+        by the targets that need it. Targets that share an archive are built
+        one at a time. The compile jobs of all of the targets share a budget
+        of the larger of jobs and parallel. Every target that fails is
+        reported once all of the targets have finished. The number of
+        available processors is used if parallel is None or less than 1.
+        (default is 1)
 
     Returns
     -------
@@ -90,8 +122,6 @@ def build_apps(
         if isinstance(targets, str):
             targets = targets.split(",")
 
-    code_dict = {}
-
     if pymake_object is None:
         pmobj = Pymake()
     else:
@@ -136,88 +166,246 @@ def build_apps(
     if verbose is not None:
         pmobj.verbose = verbose
 
-    for idt, target in enumerate(targets):
-        start_downcomp = datetime.now()
-
-        code_dict[target] = usgs_program_data.get_target(target)
+    # a single target can be rebuilt when its source files change
+    if pmobj.watch and len(targets) > 1:
+        raise ValueError(
+            "watch can only be used to build a single target "
+            f"({len(targets)} targets specified)"
+        )
 
-        # write system information
-        if idt == 0:
-            if pmobj.verbose:
-                print(
-                    f"{target} will be built "
-                    f'for the "{sys.platform}" operating system\n'
+    # set the download directory
+    if download_dir is None:
+        download_dir = "temp"
+
+    # set the number of targets built at the same time. Targets built using
+    # meson are built one at a time because meson is run in the meson
+    # directory.
+    parallel = min(_get_number_of_jobs(parallel), len(targets))
+    if parallel > 1 and pmobj.meson:
+        print("Targets built using meson are built one at a time")
+        parallel = 1
+
+    # write system information
+    if pmobj.verbose and len(targets) > 0:
+        print(f'{targets[0]} will be built for the "{sys.platform}" operating system\n')
+
+    # save initial compiler settings
+    initial = {
+        "fc": pmobj.fc,
+        "cc": pmobj.cc,
+        "fflags": pmobj.fflags,
+        "cflags": pmobj.cflags,
+        "syslibs": pmobj.syslibs,
+    }
+
+    # record the download and build of each target in the build profile
+    build_profile = None
+    if pmobj.profile is not None:
+        build_profile = _activate_build_profile(pmobj.profile)
+        first_step = len(build_profile.events)
+
+    # download every unique archive needed by the targets once. Archives are
+    # downloaded in the background while targets are built and each
+    # extracted archive is kept until the last target that needs it is built.
+    planner = _DownloadPlanner(
+        [target for target in targets if _needs_download(pmobj, target, double)],
+        download_dir,
+        clean=clean,
+        verbose=pmobj.verbose,
+    )
+    with planner:
+        if parallel > 1:
+            _build_targets_concurrently(
+                pmobj,
+                targets,
+                parallel,
+                initial,
+                download_dir,
+                double,
+                build_profile,
+                planner,
+            )
+        else:
+            for idt, target in enumerate(targets):
+                _build_target(
+                    pmobj,
+                    target,
+                    idt,
+                    initial,
+                    download_dir,
+                    double,
+                    build_profile,
+                    planner,
                 )
 
-        # save initial compiler settings
-        if idt == 0:
-            fc0 = pmobj.fc
-            cc0 = pmobj.cc
-            fflags0 = pmobj.fflags
-            cflags0 = pmobj.cflags
-            syslibs0 = pmobj.syslibs
-        # reset fortran, c/c++, and syslib flags
-        else:
-            pmobj.fflags = fflags0
-            pmobj.cflags = cflags0
-            pmobj.syslibs = syslibs0
-
-        # reset compilers
-        if target in ("gridgen",):
-            pmobj.fc = "none"
-            if pmobj.cc in ("gcc",):
-                pmobj.cc = "g++"
-            elif pmobj.cc in ("clang",):
-                pmobj.cc = "clang++"
-        elif target in ("triangle",):
-            pmobj.fc = "none"
-        elif target in ("mf6", "libmf6"):
-            pmobj.cc = "none"
-        else:
-            pmobj.fc = fc0
-            pmobj.cc = cc0
+    end_time = datetime.now()
+    elapsed = end_time - start_time
+    if pmobj.verbose:
+        print(f"elapsed time (hh:mm:ss.ms): {elapsed}\n")
 
-        # set sharedobject
-        if target in ("libmf6",):
-            pmobj.sharedobject = True
-        else:
-            pmobj.sharedobject = False
+    # write the build profile for all of the targets
+    if build_profile is not None:
+        build_profile.write_trace()
+        if len(targets) > 1:
+            build_profile.summary(first=first_step)
 
-        # reset srcdir2 - TODO make more robust
-        if target not in ("libmf6",):
-            pmobj.srcdir2 = None
+    # compress targets
+    if pmobj.returncode == 0:
+        pmobj.compress_targets()
 
-        # reset extrafiles for instances with more than one target
-        if idt > 0:
-            pmobj.extrafiles = None
+    # execute final Pymake object operations
+    if clean:
+        pmobj.finalize()
 
-        # set double precision flag and whether the executable name
-        # can be modified
-        if target in ("swtv4",):
-            update_target_name = False
-        else:
-            update_target_name = True
-
-        # set download information
-        if download_dir is None:
-            download_dir = "temp"
-        download_verify = True
-        timeout = 30
-
-        # set target and srcdir
-        pmobj.target = target.replace("dev", "")
-        pmobj.srcdir = os.path.join(
-            download_dir, code_dict[target].dirname, code_dict[target].srcdir
-        )
+    return pmobj.returncode
+
+
+def _needs_download(pmobj, target, double):
+    """Determine if the archive for a target needs to be downloaded. The
+    archive is not needed if the target exists for every precision and
+    existing targets are kept.
+
+    Parameters
+    ----------
+    pmobj : Pymake()
+        Pymake object used to build the target
+    target : str
+        target to build
+    double : bool
+        force double precision
+
+    Returns
+    -------
+    download : bool
+        boolean indicating if the archive for the target is needed
 
-        # determine if single, double, or both should be built
+    """
+    if not pmobj.keep:
+        return True
+    target_obj = copy.copy(pmobj)
+    target_obj.target = target.replace("dev", "")
+    target_obj.sharedobject = target in ("libmf6",)
+    update_target_name = target not in ("swtv4",)
+    if double:
+        prog_precision = ["double"]
+    else:
         prog_precision = usgs_program_data.get_precision(target)
+    for precision_str in prog_precision:
+        target_obj.double = precision_str == "double"
+        if target_obj.set_build_target_bool(
+            target=target_obj.update_target(target, modify_target=update_target_name)
+        ):
+            return True
+    return False
+
+
+def _build_target(
+    pmobj,
+    target,
+    idt,
+    initial,
+    download_dir,
+    double,
+    build_profile,
+    planner=None,
+):
+    """Download and build every precision of a target.
 
-        # just build the first precision in precision list if
-        # reset prog_precision if double
-        if double:
-            prog_precision = ["double"]
+    Parameters
+    ----------
+    pmobj : Pymake()
+        Pymake object used to download and build the target
+    target : str
+        target to build
+    idt : int
+        index of the target in the list of targets
+    initial : dict
+        initial fortran and c/c++ compilers, compiler flags, and syslibs
+    download_dir : str
+        download directory path
+    double : bool
+        force double precision
+    build_profile : _BuildProfile
+        build profile the download and build of the target is added to.
+        The target is not recorded if build_profile is None.
+    planner : _DownloadPlanner
+        download planner that downloads and removes the archive for the
+        target. The archive is downloaded and removed by pmobj if planner is
+        None or the target is not in the planner. (default is None)
 
+    Returns
+    -------
+    returncode : int
+        integer value indicating successful completion (0) or failure (>0)
+
+    """
+    start_downcomp = datetime.now()
+    if build_profile is not None:
+        target_start = build_profile.get_time()
+
+    prog_dict = usgs_program_data.get_target(target)
+
+    # reset fortran, c/c++, and syslib flags
+    pmobj.fflags = initial["fflags"]
+    pmobj.cflags = initial["cflags"]
+    pmobj.syslibs = initial["syslibs"]
+
+    # reset compilers
+    if target in ("gridgen",):
+        pmobj.fc = "none"
+        if pmobj.cc in ("gcc",):
+            pmobj.cc = "g++"
+        elif pmobj.cc in ("clang",):
+            pmobj.cc = "clang++"
+    elif target in ("triangle",):
+        pmobj.fc = "none"
+    elif target in ("mf6", "libmf6"):
+        pmobj.cc = "none"
+    else:
+        pmobj.fc = initial["fc"]
+        pmobj.cc = initial["cc"]
+
+    # set sharedobject
+    if target in ("libmf6",):
+        pmobj.sharedobject = True
+    else:
+        pmobj.sharedobject = False
+
+    # reset srcdir2 - TODO make more robust
+    if target not in ("libmf6",):
+        pmobj.srcdir2 = None
+
+    # reset extrafiles for instances with more than one target
+    if idt > 0:
+        pmobj.extrafiles = None
+
+    # set double precision flag and whether the executable name
+    # can be modified
+    if target in ("swtv4",):
+        update_target_name = False
+    else:
+        update_target_name = True
+
+    # set download information
+    download_verify = True
+    timeout = 30
+
+    # set target and srcdir
+    pmobj.target = target.replace("dev", "")
+    pmobj.srcdir = os.path.join(download_dir, prog_dict.dirname, prog_dict.srcdir)
+
+    # determine if single, double, or both should be built
+    prog_precision = usgs_program_data.get_precision(target)
+
+    # just build the first precision in precision list if
+    # reset prog_precision if double
+    if double:
+        prog_precision = ["double"]
+
+    # the archive for the target is downloaded and removed by the planner
+    planned = planner is not None and target in planner.urls
+
+    try:
         for precision_str in prog_precision:
             # set double flag
             if precision_str == "double":
@@ -240,28 +428,152 @@ def build_apps(
 
             # build the code
             if build_target:
+                if planned:
+                    planner.wait(target)
+                    pmobj.download = None
                 pmobj.build(modify_exe_name=update_target_name)
             # add target to build_targets list, if necessary
             else:
                 pmobj.update_build_targets()
+    finally:
+        if planned:
+            planner.release(target)
 
-        # calculate download and compile time
-        end_downcomp = datetime.now()
-        elapsed = end_downcomp - start_downcomp
-        if pmobj.verbose:
-            print("elapsed download and compile time (hh:mm:ss.ms): " + f"{elapsed}\n")
-
-    end_time = datetime.now()
-    elapsed = end_time - start_time
+    # calculate download and compile time
+    end_downcomp = datetime.now()
+    elapsed = end_downcomp - start_downcomp
     if pmobj.verbose:
-        print(f"elapsed time (hh:mm:ss.ms): {elapsed}\n")
+        print("elapsed download and compile time (hh:mm:ss.ms): " + f"{elapsed}\n")
+    if build_profile is not None:
+        build_profile.add(
+            target,
+            "target",
+            target_start,
+            build_profile.get_time(),
+            returncode=pmobj.returncode,
+        )
 
-    # compress targets
-    if pmobj.returncode == 0:
-        pmobj.compress_targets()
+    return pmobj.returncode
 
-    # execute final Pymake object operations
-    if clean:
-        pmobj.finalize()
 
-    return pmobj.returncode
+def _build_targets_concurrently(
+    pmobj,
+    targets,
+    parallel,
+    initial,
+    download_dir,
+    double,
+    build_profile,
+    planner,
+):
+    """Download and build targets at the same time. Each target is built
+    using a copy of the Pymake object. Targets built from the same archive
+    are built one after another because source files in the extracted
+    archive are modified for some targets. The compile jobs of all of the
+    targets share a single job budget. Targets that do not fail continue to
+    be built after a target fails and every failed target is reported once
+    all of the targets have finished.
+
+    Parameters
+    ----------
+    pmobj : Pymake()
+        Pymake object copied for each target. The targets built are added
+        to the build_targets list of pmobj.
+    targets : list
+        targets to build
+    parallel : int
+        maximum number of targets built at the same time
+    initial : dict
+        initial fortran and c/c++ compilers, compiler flags, and syslibs
+    download_dir : str
+        download directory path
+    double : bool
+        force double precision
+    build_profile : _BuildProfile
+        build profile the download and build of each target is added to
+    planner : _DownloadPlanner
+        download planner that downloads and removes the archives
+
+    Returns
+    -------
+    None
+
+    """
+    # group the targets by archive
+    groups = {}
+    for idt, target in enumerate(targets):
+        url = usgs_program_data.get_target(target).url
+        groups.setdefault(url, []).append((idt, target))
+    parallel = min(parallel, len(groups))
+
+    # compile jobs for all of the targets share the larger of jobs and the
+    # number of targets built at the same time
+    budget = _activate_job_budget(max(_get_number_of_jobs(pmobj.jobs), parallel))
+    print(
+        f"building {len(targets)} targets with up to {parallel} targets and "
+        f"{budget.jobs} jobs at the same time"
+    )
+
+    def _build_group(group):
+        results = {}
+        for idt, target in group:
+            target_obj = copy.deepcopy(pmobj)
+            target_obj.url = None
+            target_obj.download = None
+            target_obj.build_targets = []
+            try:
+                _build_target(
+                    target_obj,
+                    target,
+                    idt,
+                    initial,
+                    download_dir,
+                    double,
+                    build_profile,
+                    planner,
+                )
+            except Exception as e:
+                results[target] = e
+                continue
+            results[target] = target_obj
+        return results
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(
+            max_workers=parallel, thread_name_prefix="pymake-target"
+        ) as executor:
+            futures = [
+                executor.submit(_build_group, group) for group in groups.values()
+            ]
+            try:
+                for future in futures:
+                    results.update(future.result())
+            except BaseException:
+                # targets that have not started are not built if the build
+                # is interrupted
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        _deactivate_job_budget()
+
+    # add the targets that were built in the order they were specified and
+    # report every target that could not be built
+    failures = {}
+    for target in targets:
+        result = results[target]
+        if isinstance(result, Exception):
+            failures[target] = result
+            continue
+        for fpth in result.build_targets:
+            if fpth not in pmobj.build_targets:
+                pmobj.build_targets.append(fpth)
+    if len(failures) > 0:
+        pmobj.returncode = 1
+        print(f"\n{len(failures)} of {len(targets)} targets failed to build:")
+        for target, e in failures.items():
+            print(f"    {target}: {e}")
+        raise FileNotFoundError(f"could not build {', '.join(failures)}")
+
+    return
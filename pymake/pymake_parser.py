@@ -103,9 +103,11 @@ def _get_standard_arg_dict():
         },
         "expedite": {
             "tag": ("-e", "--expedite"),
-            "help": """Only compile out of date source files.
-                         Clean must not have been used on previous build.
-                         (default is False)""",
+            "help": """Only compile out of date source files. Source
+                         files are out of date if the source file, compile
+                         command, compiler version, or modules used by the
+                         source file have changed. Clean must not have been
+                         used on previous build. (default is False)""",
             "default": False,
             "choices": None,
             "action": "store_true",
@@ -269,6 +271,92 @@ def _get_standard_arg_dict():
             "choices": None,
             "action": "store_true",
         },
+        "jobs": {
+            "tag": ("-j", "--jobs"),
+            "help": """Maximum number of source files to compile at the
+                     same time. The number of available processors is used
+                     if JOBS is less than 1. (default is 1)""",
+            "default": 1,
+            "choices": None,
+            "action": None,
+            "type": int,
+        },
+        "cache": {
+            "tag": ("--cache",),
+            "help": """Restore object and module files from a shared object
+                     cache in the user cache directory instead of compiling
+                     unchanged source files. The cache directory and maximum
+                     cache size can be set using the PYMAKE_CACHE_DIR and
+                     PYMAKE_CACHE_SIZE environment variables.
+                     (default is False)""",
+            "default": False,
+            "choices": None,
+            "action": "store_true",
+        },
+        "linkmode": {
+            "tag": ("--linkmode",),
+            "help": """Method used to add new and changed source files to the
+                     temporary source directory. Source files are copied
+                     (copy), hard linked (hardlink), or cloned using
+                     copy-on-write reflinks (reflink). Source files are copied
+                     if the file system does not support hard links or
+                     reflinks. (default is copy)""",
+            "default": "copy",
+            "choices": ["copy", "hardlink", "reflink"],
+            "action": None,
+        },
+        "profile": {
+            "tag": ("--profile",),
+            "help": """Path of a Chrome trace JSON file the start time, end
+                     time, duration, return code, and output size of each
+                     compile, link, download, extract, and source patch step
+                     are written to. A summary of the slowest steps is
+                     written to the terminal. The trace file can be viewed
+                     using chrome://tracing or https://ui.perfetto.dev.
+                     (default is None)""",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "compile_commands": {
+            "tag": ("--compile-commands",),
+            "help": """Path of a JSON compilation database
+                     (compile_commands.json) the planned compile command for
+                     each source file is written to. The compilation database
+                     is also written for dry runs. Entries for other targets
+                     in an existing compilation database are retained. The
+                     compilation database is not written if temporary files
+                     are cleaned (--makeclean) because the compile commands
+                     use the temporary source, object, and module
+                     directories.
+                     (default is None)""",
+            "default": None,
+            "choices": None,
+            "action": None,
+        },
+        "keep_going": {
+            "tag": ("--keep-going",),
+            "help": """Continue compiling source files that do not depend on
+                     a source file that failed to compile. Every compile
+                     failure and the source files that were not compiled
+                     because of them are reported at the end of the build.
+                     (default is False)""",
+            "default": False,
+            "choices": None,
+            "action": "store_true",
+        },
+        "watch": {
+            "tag": ("--watch",),
+            "help": """Rebuild the target every time a file in the source
+                     directories or extrafiles is added, changed, or removed
+                     until interrupted using Ctrl+C. Rebuilds are expedited
+                     and temporary files are kept so only the source files
+                     affected by a change are compiled before the target is
+                     linked again. (default is False)""",
+            "default": False,
+            "choices": None,
+            "action": "store_true",
+        },
     }
 
 
@@ -294,12 +382,20 @@ def _parser_setup(parser_obj, value, reset_default=False):
         default = None
     else:
         default = value["default"]
+
+    # optional number of values for each argument
+    kwargs = {}
+    if "nargs" in value:
+        kwargs["nargs"] = value["nargs"]
+
     if value["action"] is None:
         parser_obj.add_argument(
             *value["tag"],
             help=value["help"],
             default=default,
             choices=value["choices"],
+            type=value.get("type"),
+            **kwargs,
         )
     else:
         parser_obj.add_argument(
@@ -307,6 +403,7 @@ def _parser_setup(parser_obj, value, reset_default=False):
             help=value["help"],
             default=default,
             action=value["action"],
+            **kwargs,
         )
     return parser_obj
 
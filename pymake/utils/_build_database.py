@@ -0,0 +1,308 @@
+"""Private class for the build database used to determine if existing object
+files are current. The build database is stored in the temporary object file
+directory and has a record for each object file with a key created from the
+contents of the source file and the files it includes, the full compile
+command, the compiler version, and the interface hashes of the module files
+used by the source file. The interface hashes of the module files created by
+each source file are also stored so that changes to module interfaces can be
+reported.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+from ._compiler_switches import _get_compiler_version
+from ._file_utils import _get_file_hash
+from ._source_info import _get_source_info
+
+_BUILD_DATABASE_FILE = ".pymake_build_db.json"
+_BUILD_DATABASE_VERSION = 3
+_GZIP_MAGIC = b"\x1f\x8b"
+_GFORTRAN_HEADER = b"GFORTRAN module version"
+
+
+def _get_module_hash(fpth):
+    """Get the interface hash of a module file. Compressed gfortran module
+    files are decompressed and the header line, which includes the name of
+    the source file used to create the module, is removed before the hash is
+    calculated. Module files created by other compilers are hashed as is.
+
+    Parameters
+    ----------
+    fpth : str
+        module (*.mod) or submodule (*.smod) file path
+
+    Returns
+    -------
+    hash : str
+        hexadecimal sha256 hash of the module file interface
+
+    """
+    with open(fpth, "rb") as f:
+        data = f.read()
+    if data.startswith(_GZIP_MAGIC):
+        try:
+            data = gzip.decompress(data)
+        except (OSError, EOFError, zlib.error):
+            pass
+    if data.startswith(_GFORTRAN_HEADER):
+        idx = data.find(b"\n")
+        if idx < 0:
+            data = b""
+        else:
+            data = data[idx + 1 :]
+    return hashlib.sha256(data).hexdigest()
+
+
+def _get_module_files(moddir, module_name):
+    """Return the module files created for a module name.
+
+    Parameters
+    ----------
+    moddir : str
+        path to the directory with the module files
+    module_name : str
+        module name. The parent module and submodule are separated by
+        a colon for submodules.
+
+    Returns
+    -------
+    fpths : list
+        list of existing module (*.mod) and submodule (*.smod) files
+
+    """
+    name = module_name.lower().replace(":", "@")
+    fpths = []
+    for ext in (".mod", ".smod"):
+        fpth = os.path.join(moddir, name + ext)
+        if os.path.isfile(fpth):
+            fpths.append(fpth)
+    return fpths
+
+
+class _BuildDatabase:
+    """Build database for object files in a temporary object directory.
+
+    Parameters
+    ----------
+    objdir : str
+        path to the directory with the object files
+    moddir : str
+        path to the directory with the module files
+
+    """
+
+    def __init__(self, objdir, moddir):
+        self.objdir = objdir
+        self.moddir = moddir
+        self.fpth = os.path.join(objdir, _BUILD_DATABASE_FILE)
+        self.records = {}
+        self.module_hashes = {}
+        self._load()
+        return
+
+    def _load(self):
+        """Load the build database if it exists and is valid."""
+        if os.path.isfile(self.fpth):
+            try:
+                with open(self.fpth) as f:
+                    data = json.load(f)
+                if data.get("version") == _BUILD_DATABASE_VERSION:
+                    self.records = data.get("objects", {})
+            except (OSError, ValueError, AttributeError):
+                self.records = {}
+        return
+
+    def save(self):
+        """Save the build database to the temporary object directory."""
+        if os.path.isdir(self.objdir):
+            data = {
+                "version": _BUILD_DATABASE_VERSION,
+                "objects": self.records,
+            }
+            with open(self.fpth, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+        return
+
+    def get_module_hashes(self, job):
+        """Get the hashes of the module files used by a compile job.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        module_hashes : dict
+            dictionary with the module file name as the key and the
+            interface hash of the module file as the value
+
+        """
+        module_hashes = {}
+        for module_name in sorted(job.modules_used):
+            module_hashes.update(self._get_interface_hashes(module_name))
+        return module_hashes
+
+    def _get_interface_hashes(self, module_name, refresh=False):
+        """Get the interface hashes of the module files for a module name.
+        Interface hashes are only calculated once unless they are refreshed
+        after the source file that creates the module is compiled.
+
+        Parameters
+        ----------
+        module_name : str
+            module name
+        refresh : bool
+            boolean indicating if the interface hashes should be recalculated
+            (default is False)
+
+        Returns
+        -------
+        module_hashes : dict
+            dictionary with the module file name as the key and the
+            interface hash of the module file as the value
+
+        """
+        module_hashes = {}
+        for fpth in _get_module_files(self.moddir, module_name):
+            if refresh or fpth not in self.module_hashes:
+                self.module_hashes[fpth] = _get_module_hash(fpth)
+            module_hashes[os.path.basename(fpth)] = self.module_hashes[fpth]
+        return module_hashes
+
+    def get_include_hashes(self, job):
+        """Get the hashes of the files included by the source file of a
+        compile job. C/C++ header files and fortran INCLUDE files are found
+        in the directory of the including file or the include (-I) paths.
+        Files included by included files are also added. Included files that
+        cannot be found, such as system header files, are skipped.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        include_hashes : dict
+            dictionary with the included file path as the key and the
+            sha256 hash of the included file as the value
+
+        """
+        includedirs = [arg[2:] for arg in job.cmdlist if arg.startswith("-I")]
+        include_hashes = {}
+        srcfile = os.path.normpath(job.name)
+        seen = {srcfile}
+        stack = [srcfile]
+        while stack:
+            fpth = stack.pop()
+            info = _get_source_info(fpth)
+            if info is None:
+                continue
+            if fpth != srcfile:
+                include_hashes[fpth] = info.hash
+            searchdirs = [os.path.dirname(fpth)] + includedirs
+            for name in info.includes:
+                for searchdir in searchdirs:
+                    include = os.path.normpath(os.path.join(searchdir, name))
+                    if os.path.isfile(include):
+                        if include not in seen:
+                            seen.add(include)
+                            stack.append(include)
+                        break
+        return include_hashes
+
+    def get_key(self, job):
+        """Create the key for a compile job.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        key : str
+            hexadecimal sha256 hash of the source file contents, included
+            file contents, compile command, compiler version, and module
+            interface hashes
+
+        """
+        data = {
+            "source": _get_file_hash(job.name),
+            "includes": self.get_include_hashes(job),
+            "command": job.cmdlist,
+            "compiler": _get_compiler_version(job.cmdlist[0]),
+            "modules": self.get_module_hashes(job),
+        }
+        data = json.dumps(data, sort_keys=True).encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def is_current(self, job):
+        """Determine if the object file for a compile job is current. The
+        object file and the module files created by the compile job must
+        exist. The key for the compile job is set so it can be saved if the
+        compile job is run.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        current : bool
+            boolean indicating if the object file is current
+
+        """
+        job.key = self.get_key(job)
+        record = self.records.get(os.path.normpath(job.objfile))
+        if record is None or not os.path.isfile(job.objfile):
+            return False
+
+        # the module files created by the compile job must exist
+        for module_name in job.modules_provided:
+            if not _get_module_files(self.moddir, module_name):
+                return False
+        for name in record.get("interfaces", {}):
+            if not os.path.isfile(os.path.join(self.moddir, name)):
+                return False
+        return record.get("key") == job.key
+
+    def update(self, job):
+        """Update the record for a successful compile job. The interface
+        hashes of the module files created by the compile job are compared to
+        the previous build so that unchanged module interfaces can be
+        reported.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        None
+
+        """
+        if job.key is None:
+            job.key = self.get_key(job)
+        objfile = os.path.normpath(job.objfile)
+
+        # update the interface hashes of the modules created by the job
+        interfaces = {}
+        for module_name in sorted(job.modules_provided):
+            interfaces.update(self._get_interface_hashes(module_name, True))
+        previous = self.records.get(objfile, {}).get("interfaces")
+        job.interface_changed = previous != interfaces
+
+        self.records[objfile] = {
+            "source": os.path.normpath(job.name),
+            "key": job.key,
+            "interfaces": interfaces,
+        }
+        return
@@ -0,0 +1,359 @@
+"""Private class and functions for profiling pymake builds. The start time,
+end time, duration, return code, and output size of compile, link, meson,
+download, extract, and source patch steps are recorded while a build profile
+is active. Build profiles are written as Chrome trace event JSON files, which
+can be viewed using chrome://tracing or https://ui.perfetto.dev, and a summary
+of the slowest steps is written to the terminal.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from ..config import __version__
+
+# build profile that steps are currently recorded in
+_ACTIVE_PROFILE = None
+
+# categories that can run concurrently and are written to separate lanes
+_CONCURRENT_CATEGORIES = ("compile",)
+
+# categories that include other steps and are not listed as slow steps
+_ENCLOSING_CATEGORIES = ("target", "build")
+
+
+class _BuildProfile:
+    """Record the steps of one or more builds.
+
+    Parameters
+    ----------
+    fpth : str
+        path of the Chrome trace JSON file the build profile is written to
+
+    """
+
+    def __init__(self, fpth):
+        self.fpth = fpth
+        self.events = []
+        self.start_time = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        return
+
+    def get_time(self):
+        """Return the time since the build profile was created.
+
+        Returns
+        -------
+        value : float
+            time, in seconds, since the build profile was created
+
+        """
+        return time.perf_counter() - self._start
+
+    def add(
+        self,
+        name,
+        category,
+        start,
+        end,
+        returncode=None,
+        output_size=None,
+        args=None,
+    ):
+        """Add a step to the build profile.
+
+        Parameters
+        ----------
+        name : str
+            step name, for example the source file path for compile steps
+        category : str
+            step category (target, build, initialize, scan, compile, link,
+            meson, download, extract, or patch)
+        start : float
+            start time of the step returned by get_time
+        end : float
+            end time of the step returned by get_time
+        returncode : int
+            return code of the step (default is None)
+        output_size : int
+            size, in bytes, of the file or files created by the step
+            (default is None)
+        args : dict
+            additional information about the step (default is None)
+
+        Returns
+        -------
+        None
+
+        """
+        event = {
+            "name": name,
+            "category": category,
+            "start": start,
+            "end": end,
+            "duration": end - start,
+            "returncode": returncode,
+            "output_size": output_size,
+            "args": {} if args is None else dict(args),
+        }
+        with self._lock:
+            self.events.append(event)
+        return
+
+    def to_trace(self):
+        """Convert the build profile to Chrome trace events. Steps in
+        categories that run concurrently are assigned to the first lane
+        (thread id) that is not in use.
+
+        Returns
+        -------
+        trace : dict
+            Chrome trace event data
+
+        """
+        pid = os.getpid()
+        lanes = []
+        trace_events = []
+        events = sorted(self.events, key=lambda event: event["start"])
+        for event in events:
+            tid = 0
+            if event["category"] in _CONCURRENT_CATEGORIES:
+                for idx, lane_end in enumerate(lanes):
+                    if lane_end <= event["start"]:
+                        break
+                else:
+                    idx = len(lanes)
+                    lanes.append(0.0)
+                lanes[idx] = event["end"]
+                tid = idx + 1
+            args = dict(event["args"])
+            for key in ("returncode", "output_size"):
+                if event[key] is not None:
+                    args[key] = event[key]
+            trace_events.append(
+                {
+                    "name": event["name"],
+                    "cat": event["category"],
+                    "ph": "X",
+                    "ts": round(event["start"] * 1e6, 3),
+                    "dur": round(event["duration"] * 1e6, 3),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        # name the lanes
+        thread_names = {0: "pymake"}
+        for idx in range(len(lanes)):
+            thread_names[idx + 1] = f"compile job {idx + 1}"
+        for tid, thread_name in thread_names.items():
+            trace_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+
+        return {
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "pymake_version": __version__,
+                "start_time": self.start_time.isoformat(),
+            },
+        }
+
+    def write_trace(self, fpth=None):
+        """Write the build profile to a Chrome trace JSON file.
+
+        Parameters
+        ----------
+        fpth : str
+            path of the Chrome trace JSON file. self.fpth is used if fpth is
+            None. (default is None)
+
+        Returns
+        -------
+        None
+
+        """
+        if fpth is None:
+            fpth = self.fpth
+        dirname = os.path.dirname(os.path.abspath(fpth))
+        os.makedirs(dirname, exist_ok=True)
+        with open(fpth, "w") as f:
+            json.dump(self.to_trace(), f, indent=1)
+        return
+
+    def summary(self, top=10, first=0):
+        """Write a summary of the build profile to the terminal. The total
+        time of each category and the slowest steps are written.
+
+        Parameters
+        ----------
+        top : int
+            number of steps to write (default is 10)
+        first : int
+            index of the first step included in the summary, which can be
+            used to summarize the steps added after an earlier summary
+            (default is 0)
+
+        Returns
+        -------
+        None
+
+        """
+        events = self.events[first:]
+        if len(events) < 1:
+            return
+        print(f"\nbuild profile written to '{self.fpth}'")
+
+        # total time of each category
+        totals = {}
+        for event in events:
+            count, total = totals.get(event["category"], (0, 0.0))
+            totals[event["category"]] = (count + 1, total + event["duration"])
+        print("  time by step category:")
+        for category, (count, total) in sorted(
+            totals.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            print(f"    {category:<10s} {total:10.3f} s in {count:>5d} step(s)")
+
+        # slowest steps, targets and builds include the other steps
+        steps = [
+            event for event in events if event["category"] not in _ENCLOSING_CATEGORIES
+        ]
+        steps.sort(key=lambda event: event["duration"], reverse=True)
+        if len(steps) > 0:
+            print(f"  slowest {min(top, len(steps))} step(s):")
+            for idx, event in enumerate(steps[:top]):
+                print(
+                    f"    {idx + 1:>3d}. {event['duration']:10.3f} s  "
+                    f"{event['category']:<10s} {event['name']}"
+                )
+        return
+
+
+def _activate_build_profile(fpth):
+    """Activate the build profile for a Chrome trace JSON file. The active
+    build profile is returned if it is being written to the same file.
+
+    Parameters
+    ----------
+    fpth : str
+        path of the Chrome trace JSON file
+
+    Returns
+    -------
+    profile : _BuildProfile
+        active build profile
+
+    """
+    global _ACTIVE_PROFILE
+    profile = _ACTIVE_PROFILE
+    if profile is None or os.path.abspath(profile.fpth) != os.path.abspath(fpth):
+        profile = _BuildProfile(fpth)
+        _ACTIVE_PROFILE = profile
+    return profile
+
+
+def _get_active_build_profile():
+    """Return the active build profile.
+
+    Returns
+    -------
+    profile : _BuildProfile
+        active build profile. None is returned if a build profile is not
+        active.
+
+    """
+    return _ACTIVE_PROFILE
+
+
+def _deactivate_build_profile():
+    """Stop recording steps in the active build profile.
+
+    Returns
+    -------
+    None
+
+    """
+    global _ACTIVE_PROFILE
+    _ACTIVE_PROFILE = None
+    return
+
+
+def _get_output_size(fpth):
+    """Return the size of a file or None if the file does not exist.
+
+    Parameters
+    ----------
+    fpth : str
+        file path
+
+    Returns
+    -------
+    size : int
+        file size in bytes
+
+    """
+    try:
+        return os.path.getsize(fpth)
+    except (OSError, TypeError):
+        return None
+
+
+@contextmanager
+def _profile_step(name, category, **args):
+    """Record a step in the active build profile. The returncode and
+    output_size keys in the yielded dictionary are recorded with the step and
+    any other keys are added to the step arguments. Nothing is recorded if a
+    build profile is not active.
+
+    Parameters
+    ----------
+    name : str
+        step name
+    category : str
+        step category
+    args : dict
+        additional information about the step
+
+    Yields
+    ------
+    step : dict
+        dictionary that can be updated with information about the step
+
+    """
+    step = dict(args)
+    profile = _ACTIVE_PROFILE
+    if profile is None:
+        yield step
+        return
+    start = profile.get_time()
+    try:
+        yield step
+    except BaseException as e:
+        step["error"] = type(e).__name__
+        raise
+    finally:
+        end = profile.get_time()
+        returncode = step.pop("returncode", None)
+        output_size = step.pop("output_size", None)
+        profile.add(
+            name,
+            category,
+            start,
+            end,
+            returncode=returncode,
+            output_size=output_size,
+            args=step,
+        )
@@ -0,0 +1,152 @@
+"""Private functions for writing a JSON compilation database
+(compile_commands.json) from the compile commands planned by pymake. The
+compilation database can be used by language servers, static analyzers, and
+build cache tools to reuse the exact compile commands used by pymake. Entries
+for the object files of a target are replaced when the target is planned again
+and entries for other targets are retained, so a single compilation database
+can describe several targets. The file is only rewritten if an entry has been
+added, changed, or removed.
+"""
+
+import json
+import os
+
+_COMPILE_COMMANDS_FILE = "compile_commands.json"
+
+
+def _get_compile_command(job, directory):
+    """Create a compilation database entry for a compile job.
+
+    Parameters
+    ----------
+    job : _CompileJob
+        compile job with the source file path, compiler command list, and
+        object file path
+    directory : str
+        absolute path of the directory the compiler is run in
+
+    Returns
+    -------
+    entry : dict
+        compilation database entry
+
+    """
+    entry = {
+        "directory": directory,
+        "arguments": list(job.cmdlist),
+        "file": os.path.normpath(os.path.join(directory, job.name)),
+    }
+    if job.objfile is not None:
+        entry["output"] = os.path.normpath(os.path.join(directory, job.objfile))
+    return entry
+
+
+def _load_compile_commands(fpth):
+    """Load the entries in an existing compilation database.
+
+    Parameters
+    ----------
+    fpth : str
+        path of the compilation database
+
+    Returns
+    -------
+    entries : list
+        list of compilation database entries. An empty list is returned if
+        the compilation database does not exist or cannot be read.
+
+    """
+    entries = []
+    if os.path.isfile(fpth):
+        try:
+            with open(fpth) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+    if not isinstance(entries, list):
+        entries = []
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def _write_compile_commands(fpth, compile_jobs, objdir, directory=None, verbose=False):
+    """Add the compile commands for a target to a compilation database.
+    Existing entries for object files in objdir are replaced with the entries
+    for compile_jobs and entries for other object directories are retained.
+
+    Parameters
+    ----------
+    fpth : str
+        path of the compilation database. compile_commands.json is written
+        to fpth if fpth is a directory.
+    compile_jobs : list
+        list of _CompileJob objects for the target
+    objdir : str
+        path of the directory with the object files for the target
+    directory : str
+        path of the directory the compiler is run in. The current working
+        directory is used if directory is None. (default is None)
+    verbose : bool
+        boolean indicating if the number of added, updated, and removed
+        entries is written to the terminal (default is False)
+
+    Returns
+    -------
+    changed : bool
+        boolean indicating if the compilation database was rewritten
+
+    """
+    if os.path.isdir(fpth):
+        fpth = os.path.join(fpth, _COMPILE_COMMANDS_FILE)
+    if directory is None:
+        directory = os.getcwd()
+    directory = os.path.abspath(directory)
+    objdir = os.path.normpath(os.path.join(directory, objdir))
+
+    # entries for the target are identified by the object file path
+    new_entries = {}
+    for job in compile_jobs:
+        entry = _get_compile_command(job, directory)
+        new_entries[entry.get("output", entry["file"])] = entry
+
+    # replace existing entries for the target and retain other entries
+    entries = []
+    added = set(new_entries)
+    updated = 0
+    removed = 0
+    for entry in _load_compile_commands(fpth):
+        output = entry.get("output")
+        if output is None or os.path.dirname(output) != objdir:
+            entries.append(entry)
+            continue
+        new_entry = new_entries.get(output)
+        if new_entry is None or output not in added:
+            removed += 1
+            continue
+        added.discard(output)
+        if new_entry != entry:
+            updated += 1
+        entries.append(new_entry)
+    for key, entry in new_entries.items():
+        if key in added:
+            entries.append(entry)
+
+    if len(added) + updated + removed < 1 and os.path.isfile(fpth):
+        if verbose:
+            print(f"compilation database '{fpth}' is current")
+        return False
+
+    # write the compilation database to a temporary file and replace the
+    # existing file so tools never read a partial file
+    dirname = os.path.dirname(os.path.abspath(fpth))
+    os.makedirs(dirname, exist_ok=True)
+    tpth = f"{fpth}.tmp"
+    with open(tpth, "w") as f:
+        json.dump(entries, f, indent=2)
+        f.write("\n")
+    os.replace(tpth, fpth)
+    if verbose:
+        print(
+            f"compilation database '{fpth}' updated: {len(added)} added, "
+            f"{updated} updated, {removed} removed"
+        )
+    return True
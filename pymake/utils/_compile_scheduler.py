@@ -0,0 +1,593 @@
+"""Private functions and classes for compiling source files in parallel. Compile
+jobs are scheduled using the module dependencies in the directed acyclic graph
+(DAG) so that a source file is only compiled after all of the source files
+that create the modules it uses have been compiled. Ready compile jobs are
+started in order of decreasing critical path length so the longest chain of
+dependent source files is started as early as possible. In keep going mode,
+source files that do not depend on a failed source file continue to be
+compiled and every compile failure is reported at the end of the build.
+"""
+
+import asyncio
+import heapq
+import json
+import os
+
+from ._build_profile import _get_output_size, _profile_step
+from ._dag import DirectedAcyclicGraph, Node
+from ._process_runner import _ProcessRunner, _run_coroutine
+
+_COMPILE_TIMES_FILE = ".pymake_compile_times.json"
+
+
+class _CompileJob:
+    """Compile command for a single source file.
+
+    Parameters
+    ----------
+    name : str
+        source file path
+    cmdlist : list
+        compiler command list
+    dependencies : list
+        list of source file paths that must be compiled before this
+        source file (default is None)
+    objfile : str
+        object file path (default is None)
+    modules_used : list
+        list of module names used by the source file (default is None)
+    modules_provided : list
+        list of module names created by the source file (default is None)
+    timeout : float
+        number of seconds the compiler can run before it is killed. The
+        compiler can run until it finishes if timeout is None.
+        (default is None)
+
+    """
+
+    def __init__(
+        self,
+        name,
+        cmdlist,
+        dependencies=None,
+        objfile=None,
+        modules_used=None,
+        modules_provided=None,
+        timeout=None,
+    ):
+        self.name = name
+        self.cmdlist = cmdlist
+        if dependencies is None:
+            dependencies = []
+        self.dependencies = dependencies
+        self.objfile = objfile
+        if modules_used is None:
+            modules_used = []
+        self.modules_used = modules_used
+        if modules_provided is None:
+            modules_provided = []
+        self.modules_provided = modules_provided
+        self.timeout = timeout
+        self.key = None
+        self.cache_key = None
+        self.skipped = False
+        self.cached = False
+        self.interface_changed = None
+        self.priority = 0.0
+        self.returncode = None
+        self.stdout = None
+        self.stderr = None
+        self.elapsed = None
+        self.peak_rss = None
+        self.blocked_by = []
+        return
+
+
+def _get_number_of_jobs(jobs):
+    """Return the number of compile jobs that can be run at the same time.
+
+    Parameters
+    ----------
+    jobs : int
+        requested number of jobs. The number of available processors is
+        used if jobs is None or less than 1.
+
+    Returns
+    -------
+    jobs : int
+        number of jobs
+
+    """
+    if jobs is None:
+        jobs = 0
+    jobs = int(jobs)
+    if jobs < 1:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+
+def _load_compile_times(objdir):
+    """Load compile times from previous builds.
+
+    Parameters
+    ----------
+    objdir : str
+        path to the directory with the object files
+
+    Returns
+    -------
+    compile_times : dict
+        dictionary with the source file path as the key and the compile
+        time, in seconds, as the value
+
+    """
+    fpth = os.path.join(objdir, _COMPILE_TIMES_FILE)
+    compile_times = {}
+    if os.path.isfile(fpth):
+        try:
+            with open(fpth) as f:
+                compile_times = json.load(f)
+        except (OSError, ValueError):
+            compile_times = {}
+    return compile_times
+
+
+def _save_compile_times(objdir, compile_jobs, compile_times=None):
+    """Save the compile times of successful compile jobs so they can be used
+    to set compile job priorities in later builds.
+
+    Parameters
+    ----------
+    objdir : str
+        path to the directory with the object files
+    compile_jobs : list
+        list of _CompileJob objects
+    compile_times : dict
+        compile times from previous builds that will be updated
+        (default is None)
+
+    Returns
+    -------
+    None
+
+    """
+    if compile_times is None:
+        compile_times = _load_compile_times(objdir)
+    for job in compile_jobs:
+        if job.returncode == 0 and job.elapsed is not None:
+            compile_times[os.path.normpath(job.name)] = round(job.elapsed, 4)
+    if os.path.isdir(objdir):
+        with open(os.path.join(objdir, _COMPILE_TIMES_FILE), "w") as f:
+            json.dump(compile_times, f, indent=1, sort_keys=True)
+    return
+
+
+def _get_compile_weights(srcfiles, compile_times=None):
+    """Get the estimated compile time of each source file. The compile time
+    in a previous build is used if it is available. Otherwise, the compile
+    time is estimated from the size of the source file and the compile rate
+    of the source files with compile times or, if no compile times are
+    available, the size of the source file in bytes is used.
+
+    Parameters
+    ----------
+    srcfiles : list
+        list of source file paths
+    compile_times : dict
+        dictionary with compile times from previous builds
+        (default is None)
+
+    Returns
+    -------
+    weights : dict
+        dictionary with the source file path as the key and the estimated
+        compile time as the value
+    timed : int
+        number of source files with a compile time from a previous build
+
+    """
+    if compile_times is None:
+        compile_times = {}
+
+    # get source file sizes and compile times from previous builds
+    sizes = {}
+    times = {}
+    for srcfile in srcfiles:
+        try:
+            sizes[srcfile] = float(max(os.path.getsize(srcfile), 1))
+        except OSError:
+            sizes[srcfile] = 1.0
+        value = compile_times.get(os.path.normpath(srcfile))
+        if value is not None:
+            times[srcfile] = float(value)
+
+    # convert source file sizes to estimated compile times
+    known_size = sum(sizes[srcfile] for srcfile in times)
+    if known_size > 0.0:
+        rate = sum(times.values()) / known_size
+    else:
+        rate = 1.0
+
+    weights = {
+        srcfile: times.get(srcfile, sizes[srcfile] * rate) for srcfile in srcfiles
+    }
+    return weights, len(times)
+
+
+def _set_compile_priorities(compile_jobs, compile_times=None):
+    """Set the priority of each compile job to the length of the longest
+    chain of compile jobs that depend on it. Each compile job is weighted
+    by its compile time in a previous build or, if it is not available, an
+    estimate based on the size of the source file.
+
+    Parameters
+    ----------
+    compile_jobs : list
+        list of _CompileJob objects
+    compile_times : dict
+        dictionary with compile times from previous builds
+        (default is None)
+
+    Returns
+    -------
+    None
+
+    """
+    weights, _ = _get_compile_weights([job.name for job in compile_jobs], compile_times)
+
+    # build the DAG with weighted nodes
+    nodes = {}
+    for job in compile_jobs:
+        nodes[job.name] = Node(job.name, weight=weights[job.name])
+    for job in compile_jobs:
+        node = nodes[job.name]
+        for dependency in job.dependencies:
+            if dependency in nodes and dependency != job.name:
+                node.add_dependency(nodes[dependency])
+
+    dag = DirectedAcyclicGraph(list(nodes.values()))
+    lengths = dag.critical_path_lengths()
+    for job in compile_jobs:
+        job.priority = lengths[job.name]
+
+    return
+
+
+async def _run_compile_job(job, runner, restore=None, store=None, prefix=None):
+    """Run a compile job using the process runner.
+
+    Parameters
+    ----------
+    job : _CompileJob
+        compile job to run
+    runner : _ProcessRunner
+        process runner used to run the compiler
+    restore : callable
+        function called in a worker thread with the compile job before it
+        is compiled. The compile job is not compiled if the function returns
+        True. (default is None)
+    store : callable
+        function called in a worker thread with the compile job after it has
+        been compiled successfully (default is None)
+    prefix : str
+        prefix added to each line of compiler output written to the terminal
+        (default is None)
+
+    Returns
+    -------
+    job : _CompileJob
+        compile job with the return code, stdout, and stderr set
+
+    """
+    # the compile step starts once a slot is available so the time spent
+    # waiting for other compile jobs, which can belong to other targets that
+    # share the job budget, is not included in the step. Restoring a job
+    # from the object cache runs the preprocessor so it also uses the slot.
+    async with runner.slot():
+        with _profile_step(job.name, "compile") as step:
+            if restore is not None and await asyncio.to_thread(restore, job):
+                job.cached = True
+                job.returncode = 0
+                step["cached"] = True
+                step["output_size"] = _get_output_size(job.objfile)
+                return job
+
+            result = await runner.run(
+                job.cmdlist,
+                prefix=prefix,
+                echo=True,
+                timeout=job.timeout,
+                acquire=False,
+            )
+            job.returncode = result.returncode
+            job.stdout = result.stdout
+            job.stderr = result.stderr
+            job.elapsed = result.elapsed
+            job.peak_rss = result.peak_rss
+            if job.returncode == 0 and store is not None:
+                await asyncio.to_thread(store, job)
+            step["returncode"] = job.returncode
+            step["output_size"] = _get_output_size(job.objfile)
+            step["peak_rss"] = job.peak_rss
+    return job
+
+
+async def _run_compile_jobs_async(
+    compile_jobs,
+    jobs,
+    is_current=None,
+    on_success=None,
+    restore=None,
+    store=None,
+    keep_going=False,
+):
+    """Run compile jobs in the running event loop. See _run_compile_jobs."""
+    runner = _ProcessRunner(jobs)
+
+    # build the dependency counts and the list of dependent jobs. Dependencies
+    # that are not being compiled are assumed to be up to date.
+    order = {}
+    waiting = {}
+    dependents = {}
+    for idx, job in enumerate(compile_jobs):
+        order[job.name] = idx
+        dependents[job.name] = []
+    for job in compile_jobs:
+        dependencies = set(dep for dep in job.dependencies if dep in order)
+        dependencies.discard(job.name)
+        waiting[job.name] = len(dependencies)
+        for dep in dependencies:
+            dependents[dep].append(job)
+
+    # ready jobs are started by priority and then in compile order
+    ready = []
+
+    def _push(job):
+        heapq.heappush(ready, (-job.priority, order[job.name], job))
+
+    def _release(job):
+        for dependent in dependents[job.name]:
+            waiting[dependent.name] -= 1
+            if waiting[dependent.name] == 0:
+                _push(dependent)
+
+    for job in compile_jobs:
+        if waiting[job.name] == 0:
+            _push(job)
+
+    # compiler output is prefixed with the source file name if more than
+    # one source file can be compiled at the same time
+    def _get_prefix(job):
+        if jobs > 1:
+            return f"[{os.path.basename(job.name)}] "
+        return None
+
+    returncode = 0
+    running = set()
+    try:
+        while ready or running:
+            # start as many ready jobs as the runner allows. New jobs are
+            # not started after a failure unless keep_going is True.
+            while ready and len(running) < jobs and (keep_going or returncode == 0):
+                _, _, job = heapq.heappop(ready)
+
+                # skip jobs that are up to date
+                if is_current is not None and is_current(job):
+                    job.returncode = 0
+                    job.skipped = True
+                    _release(job)
+                    continue
+
+                running.add(
+                    asyncio.ensure_future(
+                        _run_compile_job(job, runner, restore, store, _get_prefix(job))
+                    )
+                )
+
+            if not running:
+                break
+
+            # wait for at least one job to finish
+            done, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                job = task.result()
+                if job.returncode != 0:
+                    msg = f"compilation failed on '{' '.join(job.cmdlist)}'"
+                    print(msg)
+                    if returncode == 0:
+                        returncode = job.returncode
+                    continue
+
+                if on_success is not None:
+                    on_success(job)
+
+                # release jobs that depend on the finished job
+                _release(job)
+    finally:
+        # cancel running compile jobs if the build is interrupted
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        runner.close()
+
+    _set_blocked_by(compile_jobs)
+
+    return returncode
+
+
+def _set_blocked_by(compile_jobs):
+    """Set the failed compile jobs that prevented each compile job that was
+    not run from being compiled.
+
+    Parameters
+    ----------
+    compile_jobs : list
+        list of _CompileJob objects in compile order
+
+    Returns
+    -------
+    None
+
+    """
+    jobs = {job.name: job for job in compile_jobs}
+    for job in compile_jobs:
+        job.blocked_by = []
+        if job.returncode is not None:
+            continue
+        blocked_by = set()
+        for dependency in job.dependencies:
+            dependency_job = jobs.get(dependency)
+            if dependency_job is None or dependency_job is job:
+                continue
+            if dependency_job.returncode not in (None, 0):
+                blocked_by.add(dependency_job.name)
+            else:
+                blocked_by.update(dependency_job.blocked_by)
+        job.blocked_by = sorted(blocked_by)
+    return
+
+
+def _get_compile_failures(compile_jobs):
+    """Get the compile jobs that failed and the compile jobs that were not
+    compiled because a source file they depend on failed to compile.
+
+    Parameters
+    ----------
+    compile_jobs : list
+        list of _CompileJob objects that have been run
+
+    Returns
+    -------
+    failures : list
+        list of dictionaries with the source file path (file), return code
+        (returncode), compiler command (command), and compiler stderr
+        (stderr) of each failed compile job
+    blocked : list
+        list of dictionaries with the source file path (file) and the failed
+        source files it depends on (blocked_by) of each compile job that
+        was not compiled
+
+    """
+    failures = []
+    blocked = []
+    for job in compile_jobs:
+        if job.returncode not in (None, 0):
+            failures.append(
+                {
+                    "file": job.name,
+                    "returncode": job.returncode,
+                    "command": " ".join(job.cmdlist),
+                    "stderr": job.stderr,
+                }
+            )
+        elif job.blocked_by:
+            blocked.append({"file": job.name, "blocked_by": list(job.blocked_by)})
+    return failures, blocked
+
+
+def _report_compile_failures(compile_jobs):
+    """Write the compile failures and the source files that were not
+    compiled because of them to the terminal.
+
+    Parameters
+    ----------
+    compile_jobs : list
+        list of _CompileJob objects that have been run
+
+    Returns
+    -------
+    failures : list
+        list of failed compile jobs returned by _get_compile_failures
+    blocked : list
+        list of blocked compile jobs returned by _get_compile_failures
+
+    """
+    failures, blocked = _get_compile_failures(compile_jobs)
+    if len(failures) < 1:
+        return failures, blocked
+
+    print(f"\n{len(failures)} of {len(compile_jobs)} source files failed to compile")
+    for idx, failure in enumerate(failures):
+        print(
+            f"\n{idx + 1:>3d}. {failure['file']} (return code {failure['returncode']})"
+        )
+        print(f"     {failure['command']}")
+        stderr = failure["stderr"]
+        if stderr:
+            for line in stderr.rstrip().splitlines():
+                print(f"     {line}")
+    if len(blocked) > 0:
+        print(
+            f"\n{len(blocked)} source files were not compiled because a source "
+            "file they depend on failed to compile"
+        )
+        for item in blocked:
+            print(f"     {item['file']} (depends on {', '.join(item['blocked_by'])})")
+    return failures, blocked
+
+
+def _run_compile_jobs(
+    compile_jobs,
+    jobs=1,
+    is_current=None,
+    on_success=None,
+    restore=None,
+    store=None,
+    keep_going=False,
+):
+    """Run compile jobs concurrently using the asyncio process runner. A
+    compile job is started once all of the compile jobs it depends on have
+    finished. Ready compile jobs with the highest priority are started first.
+    Compiler output is streamed to the terminal and, if more than one job can
+    run at the same time, each line is prefixed with the source file name.
+
+    Parameters
+    ----------
+    compile_jobs : list
+        list of _CompileJob objects in compile order
+    jobs : int
+        maximum number of compile jobs to run at the same time. The number of
+        available processors is used if jobs is None or less than 1.
+        (default is 1)
+    is_current : callable
+        function called with a compile job once it is ready to run. The
+        compile job is skipped if the function returns True. (default is
+        None)
+    on_success : callable
+        function called with a compile job after it has been compiled
+        successfully or restored (default is None)
+    restore : callable
+        function called in a worker thread with a compile job before it is
+        compiled. The compile job is not compiled if the function returns
+        True. (default is None)
+    store : callable
+        function called in a worker thread with a compile job after it
+        has been compiled successfully (default is None)
+    keep_going : bool
+        boolean indicating if compile jobs that do not depend on a failed
+        compile job are started after a compile job fails. Compile jobs
+        that depend on a failed compile job are never started.
+        (default is False)
+
+    Returns
+    -------
+    returncode : int
+        return code of the first failed compile job or 0 if all of the
+        compile jobs were successful
+
+    """
+    jobs = _get_number_of_jobs(jobs)
+    return _run_coroutine(
+        _run_compile_jobs_async(
+            compile_jobs,
+            jobs,
+            is_current=is_current,
+            on_success=on_success,
+            restore=restore,
+            store=store,
+            keep_going=keep_going,
+        )
+    )
@@ -3,6 +3,7 @@
 import os
 
 from ._dag import _order_c_source_files, _order_f_source_files
+from ._source_info import _get_source_info, _load_source_info, _save_source_info
 
 
 def _get_fortran_files(srcfiles, extensions=False):
@@ -95,33 +96,13 @@ def _get_iso_c(srcfiles):
     """
     iso_c = False
     for srcfile in srcfiles:
-        if os.path.exists(srcfile):
-            # open the file
-            f = open(srcfile, "rb")
-
-            # read the file
-            lines = f.read()
-
-            # decode the file
-            lines = lines.decode("ascii", "replace").splitlines()
-
-            # develop a list of modules in the file
-            for line in lines:
-                linelist = line.strip().split()
-                if len(linelist) == 0:
-                    continue
-                if linelist[0].upper() == "USE":
-                    modulename = linelist[1].split(",")[0].upper()
-                    if "ISO_C_BINDING" == modulename:
-                        iso_c = True
-                        break
-
-            # terminate file content search if iso_c is True
-            if iso_c:
-                break
-        else:
+        info = _get_source_info(srcfile)
+        if info is None:
             msg = "get_iso_c: could not " + f"open {os.path.basename(srcfile)}"
             raise FileNotFoundError(msg)
+        if info.iso_c:
+            iso_c = True
+            break
 
     return iso_c
 
@@ -149,53 +130,31 @@ def _preprocess_file(srcfiles, meson=False):
 
     preprocess = False
     for srcfile in srcfiles:
-        if os.path.exists(srcfile):
-            # open the file
-            f = open(srcfile, "rb")
-
-            # read the file
-            lines = f.read()
-
-            # decode the file
-            lines = lines.decode("ascii", "replace").splitlines()
-
-            # develop a list of modules in the file
-            for line in lines:
-                linelist = line.strip().split()
-                if len(linelist) == 0:
-                    continue
-                if linelist[0].lower() in (
-                    "#define",
-                    "#undef",
-                    "#ifdef",
-                    "#ifndef",
-                    "#if",
-                    "#error",
-                ):
-                    if meson:
-                        file_extension = os.path.splitext(srcfile)[1]
-                        if file_extension not in (
-                            ".F",
-                            ".F90",
-                        ):
-                            preprocess = True
-                    else:
-                        preprocess = True
-                    break
-
-            # terminate file content search if preprocess is True
-            if preprocess:
-                break
-
-        else:
+        info = _get_source_info(srcfile)
+        if info is None:
             msg = "_preprocess_file: could not " + f"open {os.path.basename(srcfile)}"
             raise FileNotFoundError(msg)
+        if info.preprocess:
+            if meson:
+                file_extension = os.path.splitext(srcfile)[1]
+                if file_extension not in (
+                    ".F",
+                    ".F90",
+                ):
+                    preprocess = True
+            else:
+                preprocess = True
+
+        # terminate file content search if preprocess is True
+        if preprocess:
+            break
 
     return preprocess
 
 
 def _get_main(srcfiles):
-    """Determine if the file should be preprocessed.
+    """Determine the source file with the fortran program or c/c++ main
+    function.
 
     Parameters
     ----------
@@ -204,8 +163,9 @@ def _get_main(srcfiles):
 
     Returns
     -------
-    preprocess : bool
-        flag indicating if the file should be preprocessed
+    main_file : str
+        path of the source file with the main program. None is returned if
+        a main program is not found.
 
     """
     if isinstance(srcfiles, str):
@@ -213,45 +173,13 @@ def _get_main(srcfiles):
 
     main_file = None
     for srcfile in srcfiles:
-        if os.path.exists(srcfile):
-            # open the file
-            f = open(srcfile, "rb")
-
-            # read the file
-            lines = f.read()
-
-            # decode the file
-            lines = lines.decode("ascii", "replace").splitlines()
-
-            # develop a list of modules in the file
-            for line in lines:
-                linetrim = line.strip().lower()
-                if len(linetrim) == 0:
-                    continue
-                for comment in (
-                    "!",
-                    "c",
-                    "/*",
-                    "*/",
-                    "//",
-                ):
-                    if linetrim.startswith(comment):
-                        continue
-                for main in (
-                    "int main(",
-                    "program ",
-                ):
-                    if linetrim.startswith(main):
-                        main_file = srcfile
-                        break
-
-            # terminate file content search if preprocess is True
-            if main_file is not None:
-                break
-
-        else:
+        info = _get_source_info(srcfile)
+        if info is None:
             msg = "_get_main: could not " + f"open {os.path.basename(srcfile)}"
             raise FileNotFoundError(msg)
+        if info.main:
+            main_file = srcfile
+            break
 
     return main_file
 
@@ -296,7 +224,7 @@ def _get_srcfiles(srcdir, include_subdir):
     return sorted(srcfiles)
 
 
-def _get_ordered_srcfiles(all_srcfiles, networkx):
+def _get_ordered_srcfiles(all_srcfiles, networkx, cachedir=None):
     """Create a list of ordered source files (both fortran and c). Ordering is
     build using a directed acyclic graph to determine module dependencies.
 
@@ -307,6 +235,10 @@ def _get_ordered_srcfiles(all_srcfiles, networkx):
     networkx : bool
         boolean indicating if the NetworkX python package should be used
         to determine the DAG.
+    cachedir : str
+        path to an existing directory used to save source file information
+        so source files are not scanned again in later builds unless they
+        have changed (default is None)
 
     Returns
     -------
@@ -327,7 +259,11 @@ def _get_ordered_srcfiles(all_srcfiles, networkx):
         elif file.lower().endswith(".c") or file.lower().endswith(".cpp"):
             cfiles.append(file)
 
-    # order the source files using the directed acyclic graph in _dag.py
+    if cachedir is not None and not os.path.isdir(cachedir):
+        cachedir = None
+    if cachedir is not None:
+        _load_source_info(cachedir)
+
     ordered_srcfiles = []
     if ffiles:
         ordered_srcfiles += _order_f_source_files(ffiles, networkx)
@@ -335,4 +271,7 @@ def _get_ordered_srcfiles(all_srcfiles, networkx):
     if cfiles:
         ordered_srcfiles += _order_c_source_files(cfiles, networkx)
 
+    if cachedir is not None:
+        _save_source_info(cachedir, ffiles + cfiles)
+
     return ordered_srcfiles
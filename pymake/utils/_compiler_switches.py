@@ -4,20 +4,22 @@ flags and appropriate linker flags for defined targets.
 
 # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-branches,too-complex
 
+import json
 import os
+import re
+import shutil
+import subprocess
 import sys
-from subprocess import check_output
+import tempfile
+from typing import NamedTuple
 
 from ._compiler_language_files import (
     _get_c_files,
     _get_fortran_files,
     _get_iso_c,
 )
-from ._Popen_wrapper import (
-    _process_Popen_command,
-    _process_Popen_communicate,
-    _process_Popen_initialize,
-)
+from ._file_utils import _get_user_cache_dir
+from ._process_runner import _run_process
 
 
 def linker_update_environment(cc="gcc", fc="gfortran", verbose=False):
@@ -42,9 +44,128 @@ def linker_update_environment(cc="gcc", fc="gfortran", verbose=False):
         environ.update({"LDFLAGS": syslibs})
 
 
+# compiler switches reported by compiler help keyed by the resolved
+# compiler path and compiler version
+_COMPILER_SWITCHES = {}
+_COMPILER_PROBE_FILE = "compiler_probes.json"
+_COMPILER_PROBE_VERSION = 1
+_SWITCH_PATTERN = re.compile(r"-[^\s\[\]<>=,;:'\"()]+")
+
+
+def _get_compiler_key(compiler):
+    """Get the key used to cache compiler probes.
+
+    Parameters
+    ----------
+    compiler : str
+        compiler name or path
+
+    Returns
+    -------
+    key : str
+        resolved compiler path and first line of the compiler version output
+
+    """
+    fpth = shutil.which(compiler) or compiler
+    return f"{os.path.realpath(fpth)} | {_get_compiler_version(compiler)}"
+
+
+def _load_compiler_probes():
+    """Load compiler probes saved in the pymake user cache directory.
+
+    Returns
+    -------
+    probes : dict
+        dictionary with the compiler key as the key and the compiler
+        switches as the value
+
+    """
+    fpth = os.path.join(_get_user_cache_dir(), _COMPILER_PROBE_FILE)
+    probes = {}
+    if os.path.isfile(fpth):
+        try:
+            with open(fpth) as f:
+                data = json.load(f)
+            if data.get("version") == _COMPILER_PROBE_VERSION:
+                probes = data["compilers"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            probes = {}
+    return probes
+
+
+def _save_compiler_probe(key, switches):
+    """Save the switches for a compiler in the pymake user cache directory.
+
+    Parameters
+    ----------
+    key : str
+        compiler key
+    switches : str
+        compiler switches separated by newlines
+
+    Returns
+    -------
+    None
+
+    """
+    cachedir = _get_user_cache_dir()
+    try:
+        os.makedirs(cachedir, exist_ok=True)
+        probes = _load_compiler_probes()
+        probes[key] = switches
+        data = {"version": _COMPILER_PROBE_VERSION, "compilers": probes}
+        fd, tmppth = tempfile.mkstemp(dir=cachedir, prefix=".tmp", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmppth, os.path.join(cachedir, _COMPILER_PROBE_FILE))
+    except OSError:
+        pass
+    return
+
+
+def _get_compiler_switches(compiler, verbose=False):
+    """Get the switches reported by the compiler help. The compiler help is
+    only run once for each compiler binary and version and the switches are
+    saved in memory and in the pymake user cache directory.
+
+    Parameters
+    ----------
+    compiler : str
+        compiler name or path
+    verbose : bool
+        boolean for verbose output to terminal
+
+    Returns
+    -------
+    switches : str
+        compiler switches separated by newlines. None is returned if the
+        compiler help could not be run.
+
+    """
+    key = _get_compiler_key(compiler)
+    if key in _COMPILER_SWITCHES:
+        return _COMPILER_SWITCHES[key]
+
+    switches = _load_compiler_probes().get(key)
+    if switches is None:
+        # determine the gfortran command line flags available
+        cmdlist = [compiler, "--help", "-v"]
+
+        # Try to get gfortran help.  Return None if any problems.
+        result = _run_process(cmdlist, verbose=verbose, echo=verbose)
+        if result.returncode != 0 and not result.stdout:
+            return None
+        switches = "\n".join(sorted(set(_SWITCH_PATTERN.findall(result.stdout))))
+        _save_compiler_probe(key, switches)
+
+    _COMPILER_SWITCHES[key] = switches
+    return switches
+
+
 def _check_gnu_switch_available(switch, compiler="gfortran", verbose=False):
     """Determine if a specified GNU compiler switch exists. Not all switches
-    will be detected, for example '-O2'  and '-fbounds-check=on'.
+    will be detected, for example '-O2'  and '-fbounds-check=on'. The
+    compiler help is only run once for each compiler binary and version.
 
     Parameters
     ----------
@@ -66,23 +187,9 @@ def _check_gnu_switch_available(switch, compiler="gfortran", verbose=False):
         msg = "compiler must be 'gfortran' or 'gcc'."
         raise ValueError(msg)
 
-    # determine the gfortran command line flags available
-    cmdlist = [compiler, "--help", "-v"]
-
-    # Try to get gfortran help.  Return False if any problems.
-    try:
-        proc = _process_Popen_initialize(cmdlist)
-        if verbose:
-            _process_Popen_command(False, cmdlist)
-
-        # establish communicator
-        _, stdout = _process_Popen_communicate(proc, verbose=verbose)
-
-        # determine if flag exists
-        avail = switch in stdout
-
-    except:
-        avail = False
+    # determine if flag exists
+    switches = _get_compiler_switches(compiler, verbose=verbose)
+    avail = switches is not None and switch in switches
 
     # write a message
     if verbose:
@@ -92,6 +199,34 @@ def _check_gnu_switch_available(switch, compiler="gfortran", verbose=False):
     return avail
 
 
+_COMPILER_VERSIONS = {}
+
+
+def _get_compiler_version(compiler):
+    """Return the version string reported by a compiler. Version strings are
+    cached so each compiler is only queried once.
+
+    Parameters
+    ----------
+    compiler : str
+        compiler name or path
+
+    Returns
+    -------
+    version : str
+        first line of the compiler version output. An empty string is
+        returned if the version cannot be determined.
+
+    """
+    if compiler not in _COMPILER_VERSIONS:
+        version = ""
+        result = _run_process([compiler, "--version"], verbose=False)
+        if result.returncode == 0 and result.stdout.strip():
+            version = result.stdout.strip().splitlines()[0]
+        _COMPILER_VERSIONS[compiler] = version
+    return _COMPILER_VERSIONS[compiler]
+
+
 def _get_osname():
     """Return the lower case OS platform name.
 
@@ -759,6 +894,163 @@ def _get_linker_flags(
     return compiler, syslibs_out
 
 
+class _ToolchainProfile(NamedTuple):
+    """Resolved compiler and linker switches for a target.
+
+    Attributes
+    ----------
+    optlevel : str
+        compiler optimization switch
+    fflags : tuple
+        fortran compiler switches
+    cflags : tuple
+        c or cpp compiler switches
+    linker : str
+        compiler used for linking
+    syslibs : tuple
+        linker switches
+
+    """
+
+    optlevel: str
+    fflags: tuple
+    cflags: tuple
+    linker: str
+    syslibs: tuple
+
+
+# toolchain profiles keyed by the target, compilers, build options, OS,
+# and user provided switches
+_TOOLCHAIN_PROFILES = {}
+
+
+def _get_toolchain_profile(
+    target,
+    fc,
+    cc,
+    debug,
+    double=False,
+    sharedobject=False,
+    fflags=None,
+    cflags=None,
+    syslibs=None,
+    srcfiles=None,
+    osname=None,
+    verbose=False,
+):
+    """Return the toolchain profile with the compiler and linker switches for
+    a target. Toolchain profiles are only resolved once for each combination
+    of target, compilers, build options, OS, and user provided switches so
+    every backend uses identical switches.
+
+    Parameters
+    ----------
+    target : str
+        executable to create
+    fc : str
+        fortran compiler
+    cc : str
+        c or cpp compiler
+    debug : bool
+        boolean indicating a debug executable will be built
+    double : bool
+        boolean indicating a compiler switch will be used to create an
+        executable with double precision real variables (default is False)
+    sharedobject : bool
+        boolean indicating a shared object will be built (default is False)
+    fflags : list
+        user provided list of fortran compiler flags (default is None)
+    cflags : list
+        user provided list of c or cpp compiler flags (default is None)
+    syslibs : list
+        user provided list of linker flags and libraries (default is None)
+    srcfiles : list
+        list of source file names. If srcfiles is None, c/c++ flags that
+        depend on the fortran source files are not added and the linker is
+        set assuming there are no source files. (default is None)
+    osname : str
+        optional lower case OS name. If not passed it will be determined
+        using sys.platform
+    verbose : bool
+        boolean for verbose output to terminal
+
+    Returns
+    -------
+    profile : _ToolchainProfile
+        toolchain profile
+
+    """
+    if osname is None:
+        osname = _get_osname()
+    fflags = list(fflags) if fflags is not None else []
+    cflags = list(cflags) if cflags is not None else []
+    syslibs = list(syslibs) if syslibs is not None else []
+
+    # summarize the source files that change the c/c++ and linker switches
+    if srcfiles is None:
+        source_key = None
+    else:
+        ffiles = _get_fortran_files(srcfiles)
+        cfiles = _get_c_files(srcfiles)
+        iso_c = None
+        if ffiles is not None and cfiles is not None:
+            iso_c = _get_iso_c(ffiles)
+        source_key = (len(srcfiles) > 0, ffiles is not None, cfiles is not None, iso_c)
+
+    key = (
+        _get_base_app_name(target),
+        fc,
+        cc,
+        bool(debug),
+        bool(double),
+        bool(sharedobject),
+        osname,
+        tuple(fflags),
+        tuple(cflags),
+        tuple(syslibs),
+        source_key,
+    )
+    if key in _TOOLCHAIN_PROFILES:
+        return _TOOLCHAIN_PROFILES[key]
+
+    optlevel = _get_optlevel(target, fc, cc, debug, fflags, cflags, osname=osname)
+    tfflags = _get_fortran_flags(
+        target,
+        fc,
+        list(fflags),
+        debug,
+        double,
+        sharedobject=sharedobject,
+        osname=osname,
+        verbose=verbose,
+    )
+    tcflags = _get_c_flags(
+        target,
+        cc,
+        list(cflags),
+        debug,
+        srcfiles,
+        sharedobject=sharedobject,
+        osname=osname,
+        verbose=verbose,
+    )
+    linker, tsyslibs = _get_linker_flags(
+        target,
+        fc,
+        cc,
+        list(syslibs),
+        srcfiles if srcfiles is not None else [],
+        sharedobject=sharedobject,
+        osname=osname,
+        verbose=verbose,
+    )
+    profile = _ToolchainProfile(
+        optlevel, tuple(tfflags), tuple(tcflags), linker, tuple(tsyslibs)
+    )
+    _TOOLCHAIN_PROFILES[key] = profile
+    return profile
+
+
 def _set_fflags(target, fc="gfortran", argv=True, osname=None, verbose=False):
     """Set appropriate fortran compiler flags based on target.
 
@@ -1085,7 +1377,12 @@ def _darwin_syslibs(cc, fc, verbose=False):
             "g++",
         ) or fc in ("gfortran",):
             cmd = ["pkgutil", "--pkg-info=com.apple.pkg.CLTools_Executables"]
-            out_lines = check_output(cmd).decode("utf-8").splitlines()
+            result = _run_process(cmd, verbose=False)
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    result.returncode, cmd, result.stdout, result.stderr
+                )
+            out_lines = result.stdout.splitlines()
             version = None
             tag = "version: "
             for line in out_lines:
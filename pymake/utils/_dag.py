@@ -1,6 +1,6 @@
 """Set of classes for building a directed acyclic graph (DAG). A DAG can be
 used to determine the order of dependencies in source code and determine
-compiling order.  Topological sort pseudocode based on:
+compiling order.  Topological sort uses Kahn's algorithm based on:
 https://en.wikipedia.org/wiki/Topological_sorting
 """
 
@@ -11,23 +11,71 @@ __maintainer__ = "Christian D. Langevin"
 __email__ = "langevin@usgs.gov"
 __status__ = "Production"
 
+import heapq
 import os
-import re
+
+from ._source_info import _scan_source_files
 
 
 class Node:
-    def __init__(self, name):
+    def __init__(self, name, weight=1.0):
         self.name = name
+        self.weight = weight
         self.dependencies = []
+        self.dependency_set = set()
+        self.modules = []
+        self.uses = []
         return
 
     def add_dependency(self, dependency):
         """Add dependency if not already in list."""
-        if dependency not in self.dependencies:
+        if dependency not in self.dependency_set:
+            self.dependency_set.add(dependency)
             self.dependencies.append(dependency)
         return
 
 
+def _find_cycle(nodes):
+    """Find a cycle in a set of nodes that could not be sorted.
+
+    Parameters
+    ----------
+    nodes : list
+        list of nodes that could not be sorted. Each node must depend on at
+        least one other node in the list.
+
+    Returns
+    -------
+    cycle : list
+        list of node names in the cycle with the first node repeated at
+        the end of the list. An empty list is returned if a cycle is not
+        found.
+
+    """
+    remaining = set(nodes)
+    visited = set()
+    for root in nodes:
+        if root in visited:
+            continue
+        path = []
+        position = {}
+        node = root
+        # follow dependencies in the remaining nodes until a node on the
+        # current path is reached
+        while node is not None and node not in visited:
+            visited.add(node)
+            position[node] = len(path)
+            path.append(node)
+            node = next(
+                (m for m in node.dependencies if m in remaining and m is not node),
+                None,
+            )
+            if node in position:
+                cycle = path[position[node] :] + [node]
+                return [m.name for m in cycle]
+    return []
+
+
 class DirectedAcyclicGraph:
     def __init__(self, nodelist, networkx=False):
         self.nodelist = nodelist
@@ -78,35 +126,102 @@ class DirectedAcyclicGraph:
                     node.add_dependency(dependency)
                 sort_list.append(node)
 
-        # use the original pymake DAG algorithm
+        # use Kahn's algorithm without modifying the dependencies of the nodes.
+        # Ready nodes are sorted in nodelist order so the order is unique.
         else:
-            # build a list of nodes with no dependencies
-            tset = set([])
-            for node in self.nodelist:
-                if len(node.dependencies) == 0:
-                    tset.add(node)
-            if len(tset) == 0:
-                for node in self.nodelist:
-                    print(node.name, [nn.name for nn in node.dependencies])
-                raise Exception("All nodes have dependencies")
+            order = {}
+            for idx, node in enumerate(self.nodelist):
+                order.setdefault(node, idx)
+
+            # build the number of dependencies and the list of dependent
+            # nodes for each node. Dependencies that are not in the
+            # nodelist are ignored.
+            indegree = {}
+            dependents = {node: [] for node in order}
+            for node in order:
+                dependencies = set(
+                    m for m in node.dependencies if m in order and m is not node
+                )
+                indegree[node] = len(dependencies)
+                for m in dependencies:
+                    dependents[m].append(node)
 
             # build up the list
-            while len(tset) > 0:
-                node = tset.pop()
+            ready = [order[node] for node in order if indegree[node] == 0]
+            heapq.heapify(ready)
+            while ready:
+                node = self.nodelist[heapq.heappop(ready)]
                 sort_list.append(node)
-                for mnode in self.nodelist:
-                    if node in mnode.dependencies:
-                        mnode.dependencies.remove(node)
-                        if len(mnode.dependencies) == 0:
-                            tset.add(mnode)
+                for mnode in dependents[node]:
+                    indegree[mnode] -= 1
+                    if indegree[mnode] == 0:
+                        heapq.heappush(ready, order[mnode])
 
             # check to make sure no remaining dependencies
-            for node in sort_list:
-                if len(node.dependencies) > 0:
-                    raise Exception("Graph has at least one cycle")
+            if len(sort_list) < len(order):
+                remaining = [node for node in order if indegree[node] > 0]
+                cycle = " -> ".join(_find_cycle(remaining))
+                raise ValueError(
+                    "Circular dependencies are present. Cannot determine "
+                    f"source file compilation order: {cycle}"
+                )
 
         return sort_list
 
+    def critical_path_lengths(self):
+        """Determine the length of the longest weighted path from each node
+        through the nodes that depend on it. The length includes the weight
+        of the node and is the minimum amount of work remaining once the node
+        is ready to be processed.
+
+        Returns
+        -------
+        lengths : dict
+            dictionary with the node name as the key and the critical path
+            length as the value
+
+        """
+        # build the list of nodes that depend on each node
+        dependents = {node: [] for node in self.nodelist}
+        for node in self.nodelist:
+            for dependency in node.dependencies:
+                if dependency in dependents:
+                    dependents[dependency].append(node)
+
+        # evaluate the nodes depth first so that the lengths of all of the
+        # dependent nodes are available when a node is evaluated
+        lengths = {}
+        for root in self.nodelist:
+            if root in lengths:
+                continue
+            active = {root}
+            stack = [(root, iter(dependents[root]))]
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    active.discard(node)
+                    length = 0.0
+                    for dependent in dependents[node]:
+                        length = max(length, lengths[dependent])
+                    lengths[node] = node.weight + length
+                elif child in active:
+                    # the cycle is the part of the stack that starts with the
+                    # dependent node, listed in dependency order
+                    names = [item[0].name for item in stack]
+                    names = names[names.index(child.name) :] + [child.name]
+                    cycle = " -> ".join(reversed(names))
+                    raise ValueError(
+                        "Circular dependencies are present. Cannot determine "
+                        f"critical path lengths: {cycle}"
+                    )
+                elif child not in lengths:
+                    active.add(child)
+                    stack.append((child, iter(dependents[child])))
+
+        return {node.name: length for node, length in lengths.items()}
+
 
 def _get_f_nodelist(srcfiles):
     """Get fortran DAG nodelist.
@@ -126,47 +241,26 @@ def _get_f_nodelist(srcfiles):
     # create a dictionary that has a list of modules used within each source
     # create a list of Nodes for later ordering
     # create a dictionary of nodes
-    submodule_pattern = r"\(([^)]+)\)"
     module_dict = {}
     sourcefile_module_dict = {}
     nodelist = []
     nodedict = {}
-    for srcfile in srcfiles:
+    for srcfile, info in zip(srcfiles, _scan_source_files(srcfiles)):
         node = Node(srcfile)
         nodelist.append(node)
         nodedict[srcfile] = node
-        try:
-            f = open(srcfile, "rb")
-        except:
+        if info is None:
             print(f"get_f_nodelist: could not open {os.path.basename(srcfile)}")
             sourcefile_module_dict[srcfile] = []
             continue
-        lines = f.read()
-        lines = lines.decode("ascii", "replace").splitlines()
-
-        # develop a list of modules in the file
-        modulelist = []  # list of modules used by this source file
-        for idx, line in enumerate(lines):
-            linelist = line.strip().split()
-            if len(linelist) == 0:
-                continue
-            if linelist[0].upper() == "MODULE":
-                modulename = linelist[1].upper()
-                module_dict[modulename] = srcfile
-            if linelist[0].upper() == "USE":
-                modulename = linelist[1].split(",")[0].upper()
-                if modulename not in modulelist:
-                    modulelist.append(modulename)
-            if line.strip().upper().startswith("SUBMODULE"):
-                modulename = re.findall(submodule_pattern, line)[0].upper()
-                if modulename not in modulelist:
-                    modulelist.append(modulename)
-
-        # update the dictionary if any entries have been found
-        sourcefile_module_dict[srcfile] = modulelist
 
-        # close the src file
-        f.close()
+        # add the modules and submodules defined in the file and the modules
+        # used by this source file
+        for modulename in info.modules + info.submodules:
+            module_dict[modulename] = srcfile
+        node.modules = info.modules + info.submodules
+        node.uses = list(info.uses)
+        sourcefile_module_dict[srcfile] = node.uses
 
     # go through and add the dependencies to each node
     for node in nodelist:
@@ -185,6 +279,26 @@ def _get_f_nodelist(srcfiles):
     return nodelist
 
 
+def _get_f_nodedict(srcfiles):
+    """Get a dictionary of fortran DAG nodes. Each node includes the source
+    files it depends on for module (*.mod) files, the modules defined in
+    the source file, and the modules used by the source file.
+
+    Parameters
+    ----------
+    srcfiles : list
+        list of source file paths
+
+    Returns
+    -------
+    nodedict : dict
+        dictionary with the source file path as the key and the DAG node
+        as the value
+
+    """
+    return {node.name: node for node in _get_f_nodelist(srcfiles)}
+
+
 def _get_dag(nodelist, networkx):
     """Create a DAG from the nodelist.
 
@@ -258,48 +372,35 @@ def _order_c_source_files(srcfiles, networkx):
     sourcefile_module_dict = {}
     nodelist = []
     nodedict = {}
-    for srcfile in srcfiles:
+    for srcfile, info in zip(srcfiles, _scan_source_files(srcfiles)):
         node = Node(srcfile)
         nodelist.append(node)
         nodedict[srcfile] = node
-        try:
-            f = open(srcfile, "rb")
-        except:
+        if info is None:
             print(
                 "order_c_source_files: could not open " + f"{os.path.basename(srcfile)}"
             )
             sourcefile_module_dict[srcfile] = []
             continue
-        lines = f.read()
-        lines = lines.decode("ascii", "replace").splitlines()
-
-        # develop a list of modules in the file
-        modulelist = []  # list of modules used by this source file
-        for idx, line in enumerate(lines):
-            linelist = line.strip().split()
-            if len(linelist) == 0:
-                continue
-            if linelist[0].upper() == "#INCLUDE":
-                modulename = linelist[1].upper()
-                for cval in ['"', "'", "<", ">"]:
-                    modulename = modulename.replace(cval, "")
 
-                # add source file for this c(pp) file if it is the same
-                # as the include file without the extension
-                bn = os.path.basename(srcfile)
-                if os.path.splitext(modulename)[0] == os.path.splitext(bn)[0].upper():
-                    module_dict[modulename] = srcfile
+        # develop a list of include files in the file
+        modulelist = []  # list of include files used by this source file
+        for modulename in info.includes:
+            modulename = modulename.upper()
 
-                # add include file name
-                if modulename not in modulelist:
-                    modulelist.append(modulename)
+            # add source file for this c(pp) file if it is the same
+            # as the include file without the extension
+            bn = os.path.basename(srcfile)
+            if os.path.splitext(modulename)[0] == os.path.splitext(bn)[0].upper():
+                module_dict[modulename] = srcfile
+
+            # add include file name
+            if modulename not in modulelist:
+                modulelist.append(modulename)
 
         # update the dictionary if any entries have been found
         sourcefile_module_dict[srcfile] = modulelist
 
-        # close the src file
-        f.close()
-
     # go through and add the dependencies to each node
     for node in nodelist:
         srcfile = node.name
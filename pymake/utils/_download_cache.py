@@ -0,0 +1,308 @@
+"""Private class for a persistent download cache. Downloaded files are stored
+in the pymake user cache directory by the sha256 hash of their contents and
+an index entry for each url records the content hash and the ETag and
+Last-Modified headers returned by the server. A cached file is only used
+after the server confirms, using a conditional request (If-None-Match and
+If-Modified-Since headers), that the file has not changed. The least
+recently used files are removed when the cache exceeds its maximum size.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from ._file_utils import _get_user_cache_dir
+from ._object_cache import _parse_cache_size
+
+_DOWNLOAD_CACHE_VERSION = 1
+_DOWNLOAD_CACHE_SIZE = 2 * 1024**3
+_URLS_DIR = "urls"
+_BLOBS_DIR = "blobs"
+
+
+def _get_download_cache(cache):
+    """Get the download cache used by download functions.
+
+    Parameters
+    ----------
+    cache : bool or str
+        boolean indicating if the download cache in the pymake user cache
+        directory is used or the path to a download cache directory. The
+        download cache is not used if cache is False or None or the
+        PYMAKE_DOWNLOAD_CACHE environment variable is 0.
+
+    Returns
+    -------
+    download_cache : _DownloadCache
+        download cache or None if the download cache is not used
+
+    """
+    if cache is None or cache is False:
+        return None
+    if os.environ.get("PYMAKE_DOWNLOAD_CACHE", "1").strip() == "0":
+        return None
+    if isinstance(cache, str | os.PathLike):
+        return _DownloadCache(cachedir=os.fspath(cache))
+    return _DownloadCache()
+
+
+class _DownloadCache:
+    """Persistent cache of downloaded files validated with conditional
+    requests.
+
+    Parameters
+    ----------
+    cachedir : str
+        path to the download cache directory. The downloads directory in the
+        pymake user cache directory is used if cachedir is None.
+        (default is None)
+    max_size : int or str
+        maximum size of the download cache in bytes or a string with a K, M,
+        G, or T suffix. The PYMAKE_DOWNLOAD_CACHE_SIZE environment variable or
+        2G is used if max_size is None. (default is None)
+
+    """
+
+    def __init__(self, cachedir=None, max_size=None):
+        if cachedir is None:
+            cachedir = os.path.join(_get_user_cache_dir(), "downloads")
+        if max_size is None:
+            max_size = os.environ.get(
+                "PYMAKE_DOWNLOAD_CACHE_SIZE", _DOWNLOAD_CACHE_SIZE
+            )
+        self.cachedir = cachedir
+        self.max_size = _parse_cache_size(max_size)
+        self._lock = threading.Lock()
+        return
+
+    @staticmethod
+    def get_key(url):
+        """Get the key of the index entry for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of the downloaded file
+
+        Returns
+        -------
+        key : str
+            sha256 hash of the url
+
+        """
+        text = f"{_DOWNLOAD_CACHE_VERSION}\n{url}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _get_entry(self, url):
+        key = self.get_key(url)
+        return os.path.join(self.cachedir, _URLS_DIR, key[:2], f"{key}.json")
+
+    def _get_blob(self, digest):
+        return os.path.join(self.cachedir, _BLOBS_DIR, digest[:2], digest)
+
+    def _load_entry(self, url):
+        """Load the index entry for a url if the cached file exists.
+
+        Parameters
+        ----------
+        url : str
+            url of the downloaded file
+
+        Returns
+        -------
+        entry : dict
+            index entry or None if the url is not cached
+
+        """
+        try:
+            with open(self._get_entry(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or not os.path.isfile(
+            self._get_blob(entry.get("sha256", ""))
+        ):
+            return None
+        return entry
+
+    def get_headers(self, url):
+        """Get the conditional request headers used to validate the cached
+        file for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of the downloaded file
+
+        Returns
+        -------
+        headers : dict
+            If-None-Match and If-Modified-Since headers. The dictionary is
+            empty if the url is not cached or the server did not return an
+            ETag or Last-Modified header when the file was downloaded.
+
+        """
+        headers = {}
+        entry = self._load_entry(url)
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def restore(self, url, fpth):
+        """Copy the cached file for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of the downloaded file
+        fpth : str
+            path the cached file is copied to
+
+        Returns
+        -------
+        restored : bool
+            boolean indicating if the cached file was copied
+
+        """
+        entry = self._load_entry(url)
+        if entry is None:
+            return False
+        blob = self._get_blob(entry["sha256"])
+        try:
+            shutil.copyfile(blob, fpth)
+            os.utime(blob)
+            os.utime(self._get_entry(url))
+        except OSError:
+            return False
+        return True
+
+    def store(self, url, fpth, headers=None):
+        """Add a downloaded file to the download cache.
+
+        Parameters
+        ----------
+        url : str
+            url of the downloaded file
+        fpth : str
+            path of the downloaded file
+        headers : dict
+            response headers returned by the server. The ETag and
+            Last-Modified headers are used to validate the cached file.
+            (default is None)
+
+        Returns
+        -------
+        digest : str
+            sha256 hash of the downloaded file or None if the file could not
+            be added to the download cache
+
+        """
+        if headers is None:
+            headers = {}
+        try:
+            sha256 = hashlib.sha256()
+            with open(fpth, "rb") as f:
+                for chunk in iter(lambda: f.read(2**20), b""):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+
+            # copy the file to a temporary file and rename it so concurrent
+            # downloads never see a partial file
+            blob = self._get_blob(digest)
+            if not os.path.isfile(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(blob), prefix=".tmp")
+                os.close(fd)
+                try:
+                    shutil.copyfile(fpth, tmp)
+                    os.replace(tmp, blob)
+                except OSError:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+            else:
+                os.utime(blob)
+
+            entry = {
+                "url": url,
+                "sha256": digest,
+                "size": os.path.getsize(blob),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+            }
+            entry_fpth = self._get_entry(url)
+            os.makedirs(os.path.dirname(entry_fpth), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry_fpth), prefix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, entry_fpth)
+        except OSError:
+            return None
+
+        self.trim()
+        return digest
+
+    def trim(self):
+        """Remove the least recently used files until the download cache is
+        smaller than the maximum size. Index entries for removed files are
+        also removed.
+
+        Returns
+        -------
+        None
+
+        """
+        blobs_dir = os.path.join(self.cachedir, _BLOBS_DIR)
+        if not os.path.isdir(blobs_dir):
+            return
+        with self._lock:
+            blobs = []
+            total = 0
+            for path, _, names in os.walk(blobs_dir):
+                for name in names:
+                    if name.startswith("."):
+                        continue
+                    fpth = os.path.join(path, name)
+                    try:
+                        stat = os.stat(fpth)
+                    except OSError:
+                        continue
+                    blobs.append((stat.st_mtime, stat.st_size, name, fpth))
+                    total += stat.st_size
+            if total <= self.max_size:
+                return
+
+            blobs.sort()
+            removed = set()
+            for _, size, name, fpth in blobs:
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(fpth)
+                except OSError:
+                    continue
+                removed.add(name)
+                total -= size
+
+            # remove the index entries for the removed files
+            urls_dir = os.path.join(self.cachedir, _URLS_DIR)
+            for path, _, names in os.walk(urls_dir):
+                for name in names:
+                    fpth = os.path.join(path, name)
+                    try:
+                        with open(fpth) as f:
+                            digest = json.load(f).get("sha256")
+                    except (OSError, ValueError):
+                        continue
+                    if digest in removed:
+                        try:
+                            os.remove(fpth)
+                        except OSError:
+                            pass
+        return
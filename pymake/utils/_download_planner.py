@@ -0,0 +1,184 @@
+"""Private class for downloading the archives needed to build a list of
+targets. The download urls of all of the targets are collected before any
+target is built and every unique archive is downloaded once, with different
+archives downloaded at the same time in background threads while targets
+are built. Targets that share an archive, such as mf6, zbud6, and libmf6,
+use the same extracted directory, which is only removed after the last
+target that needs it has finished building.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .download import _remove_download_dir, download_and_unzip
+from .usgsprograms import usgs_program_data
+
+
+class _DownloadPlanner:
+    """Download the archives needed to build a list of targets.
+
+    Parameters
+    ----------
+    targets : list
+        list of targets that will be built
+    download_dir : str
+        path the archives are downloaded and extracted to
+    verify : bool
+        boolean indicating if the url request should be verified
+        (default is True)
+    timeout : int
+        url request time out length in seconds (default is 30)
+    jobs : int
+        maximum number of archives downloaded at the same time
+        (default is 4)
+    clean : bool
+        boolean indicating if the extracted directory of an archive is
+        removed after the last target that needs it is released
+        (default is True)
+    verbose : bool
+        boolean indicating if output will be printed to the terminal
+        (default is False)
+
+    """
+
+    def __init__(
+        self,
+        targets,
+        download_dir,
+        verify=True,
+        timeout=30,
+        jobs=4,
+        clean=True,
+        verbose=False,
+    ):
+        self.download_dir = download_dir
+        self.verify = verify
+        self.timeout = timeout
+        self.jobs = jobs
+        self.clean = clean
+        self.verbose = verbose
+
+        # group the targets by download url in the order they are built
+        self.urls = {}
+        self.targets = {}
+        self.dirs = {}
+        for target in targets:
+            prog_dict = usgs_program_data.get_target(target)
+            self.urls[target] = prog_dict.url
+            self.targets.setdefault(prog_dict.url, []).append(target)
+            self.dirs[prog_dict.url] = os.path.join(download_dir, prog_dict.dirname)
+
+        self._remaining = {url: len(value) for url, value in self.targets.items()}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _download(self, url):
+        print(f"downloading...'{url}'")
+        return download_and_unzip(
+            url,
+            pth=self.download_dir,
+            verify=self.verify,
+            timeout=self.timeout,
+            verbose=self.verbose,
+        )
+
+    def start(self):
+        """Start downloading every unique archive in background threads.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._executor is not None or len(self.targets) < 1:
+            return
+        jobs = self.jobs
+        if jobs is None or jobs < 1:
+            jobs = len(self.targets)
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(jobs, len(self.targets)),
+            thread_name_prefix="pymake-download",
+        )
+        for url in self.targets:
+            self._futures[url] = self._executor.submit(self._download, url)
+        return
+
+    def wait(self, target):
+        """Wait until the archive needed by a target has been downloaded and
+        extracted.
+
+        Parameters
+        ----------
+        target : str
+            target name
+
+        Returns
+        -------
+        download_dir : str
+            path of the extracted archive
+
+        """
+        self.start()
+        url = self.urls[target]
+        # exceptions raised downloading the archive are raised for every
+        # target that needs the archive
+        self._futures[url].result()
+        return self.dirs[url]
+
+    def release(self, target):
+        """Release the archive needed by a target after the target has been
+        built. The extracted archive is removed, if clean is True, once every
+        target that needs it has been released.
+
+        Parameters
+        ----------
+        target : str
+            target name
+
+        Returns
+        -------
+        last : bool
+            boolean indicating if target was the last target that needed
+            the archive
+
+        """
+        url = self.urls[target]
+        with self._lock:
+            self._remaining[url] -= 1
+            last = self._remaining[url] == 0
+        if last and self.clean:
+            future = self._futures.get(url)
+            if (
+                future is not None
+                and future.done()
+                and not future.cancelled()
+                and future.exception() is None
+            ):
+                print(f"cleaning temporary files in...'{self.dirs[url]}'")
+                _remove_download_dir(self.dirs[url], verbose=self.verbose)
+        return last
+
+    def close(self):
+        """Cancel downloads that have not started and wait for running
+        downloads to finish.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        return
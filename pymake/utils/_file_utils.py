@@ -1,4 +1,53 @@
+import hashlib
 import os
+import sys
+
+
+def _get_file_hash(fpth, chunk_size=1048576):
+    """Get the sha256 hash of the contents of a file.
+
+    Parameters
+    ----------
+    fpth : str
+        file path
+    chunk_size : int
+        number of bytes read at a time (default is 1048576)
+
+    Returns
+    -------
+    file_hash : str
+        hexadecimal sha256 hash of the file contents
+
+    """
+    sha = hashlib.sha256()
+    with open(fpth, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _get_user_cache_dir():
+    """Get the pymake directory in the user cache directory. The directory can
+    be set using the PYMAKE_CACHE_DIR environment variable.
+
+    Returns
+    -------
+    cachedir : str
+        path to the pymake user cache directory
+
+    """
+    cachedir = os.environ.get("PYMAKE_CACHE_DIR")
+    if cachedir:
+        return os.path.abspath(os.path.expanduser(cachedir))
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "pymake")
 
 
 def _get_extra_exclude_files(external_file):
@@ -0,0 +1,162 @@
+"""Private functions for the http requests made by pymake. Requests are made
+with a requests session for each thread that share one connection pool, so
+connections to the same host are kept alive and reused by every download,
+header, and GitHub API request. Failed requests and responses with transient
+status codes are retried with exponential backoff and jitter. The backoff
+delay of the first retry and the maximum backoff delay can be set using the
+PYMAKE_HTTP_BACKOFF and PYMAKE_HTTP_BACKOFF_MAX environment variables.
+"""
+
+import os
+import random
+import threading
+import time
+from http.client import responses
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_CONNECT_TIMEOUT = 10.0
+_READ_TIMEOUT = 60.0
+_BACKOFF = 0.5
+_BACKOFF_MAX = 10.0
+_POOL_SIZE = 16
+_RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+
+# one connection pool is shared by the sessions in every thread
+_ADAPTER = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+_THREAD_DATA = threading.local()
+
+
+def _get_session():
+    """Get the requests session for the current thread.
+
+    Returns
+    -------
+    session : requests.Session
+        requests session that uses the shared connection pool
+
+    """
+    session = getattr(_THREAD_DATA, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", _ADAPTER)
+        session.mount("http://", _ADAPTER)
+        _THREAD_DATA.session = session
+    return session
+
+
+def _get_timeout(timeout=None):
+    """Get the connect and read timeouts for a request.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        read timeout in seconds or a tuple with the connect and read timeouts.
+        The connect timeout is the smaller of the read timeout and 10
+        seconds if timeout is a number. A 10 second connect timeout and a
+        60 second read timeout are used if timeout is None. (default is None)
+
+    Returns
+    -------
+    timeout : tuple
+        connect and read timeouts in seconds
+
+    """
+    if timeout is None:
+        return _CONNECT_TIMEOUT, _READ_TIMEOUT
+    if isinstance(timeout, tuple):
+        return timeout
+    return min(_CONNECT_TIMEOUT, timeout), timeout
+
+
+def _get_backoff(attempt, retry_after=None):
+    """Get the delay before a request is retried.
+
+    Parameters
+    ----------
+    attempt : int
+        zero-based index of the failed request attempt
+    retry_after : str
+        Retry-After header returned by the server. The delay is at least
+        the number of seconds in the header, limited to the maximum backoff
+        delay. (default is None)
+
+    Returns
+    -------
+    delay : float
+        delay in seconds. The exponential backoff delay is randomly reduced
+        by up to one half so clients that failed at the same time do not
+        retry at the same time.
+
+    """
+    backoff = float(os.environ.get("PYMAKE_HTTP_BACKOFF", _BACKOFF))
+    backoff_max = float(os.environ.get("PYMAKE_HTTP_BACKOFF_MAX", _BACKOFF_MAX))
+    delay = min(backoff_max, backoff * 2**attempt)
+    delay = random.uniform(delay / 2.0, delay)
+    if retry_after is not None:
+        try:
+            delay = max(delay, min(backoff_max, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+def _request(method, url, max_requests=10, timeout=None, verbose=False, **kwargs):
+    """Make a url request and retry failed requests.
+
+    Parameters
+    ----------
+    method : str
+        http method, such as GET or HEAD
+    url : str
+        url address
+    max_requests : int
+        number of url request attempts (default is 10)
+    timeout : float or tuple
+        read timeout in seconds or a tuple with the connect and read timeouts
+        (default is None)
+    verbose : bool
+        boolean indicating if output will be printed to the terminal
+        (default is False)
+    kwargs : dict
+        additional keyword arguments passed to requests.Session.request
+
+    Returns
+    -------
+    req : requests.Response
+        response for the last request attempt or None if a connection could
+        not be established
+
+    """
+    session = _get_session()
+    timeout = _get_timeout(timeout)
+    req = None
+    for idx in range(max_requests):
+        if verbose:
+            print(f"  request attempt {idx + 1} of {max_requests}")
+
+        # wait before retrying the request
+        if idx > 0:
+            retry_after = None
+            if req is not None:
+                retry_after = req.headers.get("Retry-After")
+                req.close()
+                req = None
+            delay = _get_backoff(idx - 1, retry_after=retry_after)
+            if verbose:
+                print(f"    retrying in {delay:.1f} seconds")
+            time.sleep(delay)
+
+        try:
+            req = session.request(method, url, timeout=timeout, **kwargs)
+            if verbose:
+                print(f"    status: {responses.get(req.status_code, req.status_code)}")
+        except requests.RequestException:
+            continue
+
+        # only retry responses with transient status codes
+        if req.status_code not in _RETRY_STATUS:
+            break
+
+    return req
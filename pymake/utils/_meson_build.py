@@ -2,6 +2,7 @@ import os
 from contextlib import contextmanager
 from pathlib import Path
 
+from ._build_profile import _profile_step
 from ._compiler_language_files import (
     _get_c_files,
     _get_fortran_files,
@@ -9,14 +10,12 @@ from ._compiler_language_files import (
     _preprocess_file,
 )
 from ._compiler_switches import (
-    _get_c_flags,
-    _get_fortran_flags,
-    _get_linker_flags,
-    _get_optlevel,
     _get_osname,
     _get_prepend,
+    _get_toolchain_profile,
 )
 from ._file_utils import _get_extrafiles_common_path
+from ._process_runner import _run_process
 from .usgsprograms import usgs_program_data
 
 
@@ -139,56 +138,21 @@ def meson_setup(
     returncode = 0
 
     with _set_directory(mesondir):
-        command_list = []
+        # set the compilers in the meson environment
+        env = os.environ.copy()
+        env_list = []
         if fc is not None:
-            fc_env = os.environ.get("FC")
-            if fc_env is not None:
-                if fc != fc_env:
-                    if _get_osname() == "win32":
-                        os.environ["FC"] = fc
-                    else:
-                        command_list.append(f"FC={fc}")
-            else:
-                if _get_osname() == "win32":
-                    os.environ["FC"] = fc
-                else:
-                    command_list.append(f"FC={fc}")
+            env["FC"] = fc
+            env_list.append(f"FC={fc}")
         if cc is not None:
             if cc in ("g++", "clang++"):
-                cc_env = os.environ.get("CXX")
-                if cc_env is not None:
-                    if cc_env != cc:
-                        if _get_osname() == "win32":
-                            os.environ["CCX"] = cc
-                        else:
-                            command_list.append(f"CXX={cc}")
-                else:
-                    if _get_osname() == "win32":
-                        os.environ["CCX"] = cc
-                    else:
-                        command_list.append(f"CXX={cc}")
+                env["CXX"] = cc
+                env_list.append(f"CXX={cc}")
             else:
-                cc_env = os.environ.get("CC")
-                if cc_env is not None:
-                    if cc_env != cc:
-                        if _get_osname() == "win32":
-                            os.environ["CC"] = cc
-                        else:
-                            command_list.append(f"CC={cc}")
-                else:
-                    if _get_osname() == "win32":
-                        os.environ["CC"] = cc
-                    else:
-                        command_list.append(f"CC={cc}")
-
-        command_list.append("meson")
-        command_list.append("setup")
-        command_list.append(build_dir)
-
-        if _get_osname() == "win32":
-            command_list.append("--prefix=%CD%")
-        else:
-            command_list.append("--prefix=$(pwd)")
+                env["CC"] = cc
+                env_list.append(f"CC={cc}")
+
+        command_list = ["meson", "setup", build_dir, f"--prefix={os.getcwd()}"]
 
         libdir = os.path.relpath(os.path.abspath(appdir), os.path.abspath(mesondir))
         command_list.append(f"--libdir={libdir}")
@@ -197,10 +161,12 @@ def meson_setup(
         if os.path.isdir(build_dir):
             command_list.append("--wipe")
 
-        command = " ".join(command_list)
+        command = " ".join(env_list + command_list)
         print(f"\n{command}\n")
 
-        returncode = os.system(command)
+        with _profile_step("meson setup", "meson") as step:
+            returncode = _run_process(command_list, env=env).returncode
+            step["returncode"] = returncode
 
         # evaluate return code
         if returncode != 0:
@@ -235,7 +201,9 @@ def meson_install(
         command_list = ["meson", "install", "-C", f"{build_dir}"]
         command = " ".join(command_list)
         print(f"\n{command}\n")
-        returncode = os.system(command)
+        with _profile_step("meson install", "meson") as step:
+            returncode = _run_process(command_list).returncode
+            step["returncode"] = returncode
 
         # evaluate return code
         if returncode != 0:
@@ -454,16 +422,22 @@ def _create_main_meson_build(
                     linker_language = "c"
                 elif main_ext == ".cpp":
                     linker_language = "cpp"
+    # get the compiler and linker switches from the toolchain profile
+    profile = _get_toolchain_profile(
+        target,
+        fc,
+        cc,
+        debug,
+        double=double,
+        sharedobject=sharedobject,
+        fflags=fflags,
+        cflags=cflags,
+        syslibs=syslibs,
+        srcfiles=srcfiles,
+        verbose=verbose,
+    )
     if linker_language is not None:
-        linker_flags_meson = _get_linker_flags(
-            target,
-            fc,
-            cc,
-            syslibs,
-            srcfiles,
-            sharedobject=sharedobject,
-            verbose=verbose,
-        )
+        linker_flags_meson = (profile.linker, list(profile.syslibs))
     else:
         raise ValueError("linker language not defined")
 
@@ -474,15 +448,7 @@ def _create_main_meson_build(
     if fext is not None:
         languages.append("fortran")
         fc_meson = fc
-        fflags_meson = _get_fortran_flags(
-            target,
-            fc,
-            fflags,
-            debug,
-            double=double,
-            sharedobject=sharedobject,
-            verbose=verbose,
-        )
+        fflags_meson = list(profile.fflags)
         if osname == "win32" and fc in ("ifort",):
             meson_ext_flag = False
         else:
@@ -501,18 +467,10 @@ def _create_main_meson_build(
             languages.append("cpp")
         else:
             languages.append("c")
-        cflags_meson = _get_c_flags(
-            target,
-            cc,
-            cflags,
-            debug,
-            srcfiles=srcfiles,
-            sharedobject=sharedobject,
-            verbose=verbose,
-        )
+        cflags_meson = list(profile.cflags)
 
     # optimization level
-    optlevel = _get_optlevel(target, fc, cc, debug, fflags, cflags)
+    optlevel = profile.optlevel
     optlevel_int = int(optlevel.replace("-O", "").replace("/O", ""))
 
     main_meson_file = Path(mesondir) / "meson.build"
@@ -0,0 +1,368 @@
+"""Private class for a shared object file cache. Object files and the module
+files created by each source file are stored in the pymake user cache
+directory so they can be restored instead of compiling the source file in
+other targets, precision variants, and checkouts. Cache entries are keyed by
+the preprocessed source file, the compiler identity, the compile flags, and
+the interface hashes of the module files used by the source file. The least
+recently used entries are removed when the cache exceeds its maximum size.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from ._build_database import _get_module_files, _get_module_hash
+from ._compiler_switches import _get_compiler_version
+from ._file_utils import _get_user_cache_dir
+from ._process_runner import _run_process
+
+_OBJECT_CACHE_VERSION = 1
+_OBJECT_CACHE_SIZE = 5 * 1024**3
+_OBJECT_FILE = "object.o"
+_MANIFEST_FILE = "manifest.json"
+_SIZE_UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_LINE_MARKER = re.compile(rb'^(#\s*(?:line\s+)?\d+\s+)"([^"]*)"', re.MULTILINE)
+_FORTRAN_INCLUDE = re.compile(
+    rb"^\s*include\s+['\"]([^'\"]+)['\"]", re.MULTILINE | re.IGNORECASE
+)
+
+
+def _parse_cache_size(size):
+    """Convert a cache size to bytes.
+
+    Parameters
+    ----------
+    size : int or str
+        cache size in bytes or a string with a K, M, G, or T suffix
+        (for example, 500M or 5G)
+
+    Returns
+    -------
+    size : int
+        cache size in bytes
+
+    """
+    if isinstance(size, str):
+        value = size.strip().upper().rstrip("B")
+        scale = 1
+        if value[-1:] in _SIZE_UNITS:
+            scale = _SIZE_UNITS[value[-1]]
+            value = value[:-1]
+        try:
+            size = int(float(value) * scale)
+        except ValueError:
+            raise ValueError(f"invalid object cache size '{size}'")
+    return int(size)
+
+
+def _get_cache_flags(job):
+    """Get the compile flags that affect the object file created by a compile
+    job. Source, object, module, and include paths are removed so that the
+    same source file compiled in different directories has the same flags.
+
+    Parameters
+    ----------
+    job : _CompileJob
+        compile job
+
+    Returns
+    -------
+    flags : list
+        list of compile flags
+
+    """
+    flags = []
+    skip = False
+    for arg in job.cmdlist[1:]:
+        if skip:
+            skip = False
+            continue
+        if arg in ("-o", "-module"):
+            skip = True
+            continue
+        if arg in ("-c", job.name) or arg.startswith(("-I", "-J")):
+            continue
+        flags.append(arg)
+    return flags
+
+
+class _ObjectCache:
+    """Shared object and module file cache.
+
+    Parameters
+    ----------
+    moddir : str
+        path to the directory with the module files for the target
+    cachedir : str
+        path to the object cache directory. The objects directory in the
+        pymake user cache directory is used if cachedir is None.
+        (default is None)
+    max_size : int or str
+        maximum size of the object cache in bytes or a string with a K, M,
+        G, or T suffix. The PYMAKE_CACHE_SIZE environment variable or 5G is
+        used if max_size is None. (default is None)
+
+    """
+
+    def __init__(self, moddir, cachedir=None, max_size=None):
+        if cachedir is None:
+            cachedir = os.path.join(_get_user_cache_dir(), "objects")
+        if max_size is None:
+            max_size = os.environ.get("PYMAKE_CACHE_SIZE", _OBJECT_CACHE_SIZE)
+        self.moddir = moddir
+        self.cachedir = cachedir
+        self.max_size = _parse_cache_size(max_size)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        return
+
+    def _get_source(self, job):
+        """Get the preprocessed source for a compile job. Paths in preprocessor
+        line markers are reduced to file names. Fortran source files are
+        combined with the files included using INCLUDE statements, which are
+        not expanded by the preprocessor.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        source : bytes
+            preprocessed source. None is returned if the source file cannot
+            be preprocessed.
+
+        """
+        ext = os.path.splitext(job.name)[1].lower()
+        preprocess = ext in (".c", ".cpp") or any(
+            arg in ("-cpp", "-fpp") for arg in job.cmdlist
+        )
+        if preprocess:
+            cmdlist = []
+            skip = False
+            for arg in job.cmdlist:
+                if skip:
+                    skip = False
+                elif arg == "-o":
+                    skip = True
+                elif arg != "-c":
+                    cmdlist.append(arg)
+            cmdlist.insert(1, "-E")
+            result = _run_process(cmdlist, verbose=False, errors="surrogateescape")
+            if result.returncode != 0:
+                return None
+            source = result.stdout.encode("utf-8", "surrogateescape")
+            source = _LINE_MARKER.sub(
+                lambda m: m.group(1) + b'"' + os.path.basename(m.group(2)) + b'"',
+                source,
+            )
+        else:
+            with open(job.name, "rb") as f:
+                source = f.read()
+        if ext in (".c", ".cpp"):
+            return source
+
+        # add fortran include files found in the source file directory or
+        # the include paths
+        searchdirs = [os.path.dirname(job.name)] + [
+            arg[2:] for arg in job.cmdlist if arg.startswith("-I")
+        ]
+        for name in _FORTRAN_INCLUDE.findall(source):
+            name = name.decode("ascii", "replace")
+            for searchdir in searchdirs:
+                fpth = os.path.join(searchdir, name)
+                if os.path.isfile(fpth):
+                    with open(fpth, "rb") as f:
+                        source += b"\0" + name.encode() + b"\0" + f.read()
+                    break
+        return source
+
+    def get_key(self, job):
+        """Create the object cache key for a compile job.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        key : str
+            hexadecimal sha256 hash of the preprocessed source, compiler
+            identity, compile flags, and module interface hashes. None is
+            returned if the source file cannot be preprocessed.
+
+        """
+        source = self._get_source(job)
+        if source is None:
+            return None
+        compiler = shutil.which(job.cmdlist[0]) or job.cmdlist[0]
+        modules = {}
+        for module_name in sorted(job.modules_used):
+            for fpth in _get_module_files(self.moddir, module_name):
+                modules[os.path.basename(fpth)] = _get_module_hash(fpth)
+        flags = _get_cache_flags(job)
+        data = {
+            "version": _OBJECT_CACHE_VERSION,
+            "source": hashlib.sha256(source).hexdigest(),
+            "compiler": [
+                os.path.realpath(compiler),
+                _get_compiler_version(job.cmdlist[0]),
+            ],
+            "flags": flags,
+            "modules": modules,
+        }
+        # debug information includes the build directory
+        if any(flag.startswith("-g") for flag in flags):
+            data["cwd"] = os.getcwd()
+        data = json.dumps(data, sort_keys=True).encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def _get_entry(self, key):
+        return os.path.join(self.cachedir, key[:2], key)
+
+    def restore(self, job):
+        """Restore the object file and module files for a compile job from
+        the object cache.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        restored : bool
+            boolean indicating if the compile job was restored from the
+            object cache
+
+        """
+        key = self.get_key(job)
+        job.cache_key = key
+        restored = False
+        if key is not None:
+            entry = self._get_entry(key)
+            try:
+                with open(os.path.join(entry, _MANIFEST_FILE)) as f:
+                    manifest = json.load(f)
+                shutil.copyfile(os.path.join(entry, _OBJECT_FILE), job.objfile)
+                for name in manifest["modules"]:
+                    src = os.path.join(entry, name)
+                    dst = os.path.join(self.moddir, name)
+                    with open(src, "rb") as f:
+                        data = f.read()
+                    # keep existing module files that have not changed
+                    if os.path.isfile(dst):
+                        with open(dst, "rb") as f:
+                            if f.read() == data:
+                                continue
+                    with open(dst, "wb") as f:
+                        f.write(data)
+                os.utime(entry)
+                restored = True
+            except (OSError, ValueError, KeyError):
+                restored = False
+        with self._lock:
+            if restored:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return restored
+
+    def store(self, job):
+        """Store the object file and module files created by a successful
+        compile job in the object cache.
+
+        Parameters
+        ----------
+        job : _CompileJob
+            compile job
+
+        Returns
+        -------
+        None
+
+        """
+        key = job.cache_key
+        if key is None or not os.path.isfile(job.objfile):
+            return
+        entry = self._get_entry(key)
+        if os.path.isdir(entry):
+            return
+        parent = os.path.dirname(entry)
+        try:
+            os.makedirs(parent, exist_ok=True)
+            tempdir = tempfile.mkdtemp(dir=parent, prefix=".tmp")
+        except OSError:
+            return
+
+        # write the entry to a temporary directory and rename it so
+        # concurrent builds never see a partial entry
+        try:
+            shutil.copyfile(job.objfile, os.path.join(tempdir, _OBJECT_FILE))
+            modules = []
+            for module_name in sorted(job.modules_provided):
+                for fpth in _get_module_files(self.moddir, module_name):
+                    name = os.path.basename(fpth)
+                    shutil.copyfile(fpth, os.path.join(tempdir, name))
+                    modules.append(name)
+            with open(os.path.join(tempdir, _MANIFEST_FILE), "w") as f:
+                json.dump({"source": job.name, "modules": modules}, f)
+            os.rename(tempdir, entry)
+        except OSError:
+            shutil.rmtree(tempdir, ignore_errors=True)
+        return
+
+    def trim(self):
+        """Remove the least recently used entries until the object cache is
+        smaller than the maximum size.
+
+        Returns
+        -------
+        None
+
+        """
+        if not os.path.isdir(self.cachedir):
+            return
+        entries = []
+        total = 0
+        with os.scandir(self.cachedir) as parents:
+            for parent in parents:
+                if not parent.is_dir():
+                    continue
+                with os.scandir(parent.path) as items:
+                    for item in items:
+                        if not item.is_dir() or item.name.startswith("."):
+                            continue
+                        size = 0
+                        with os.scandir(item.path) as files:
+                            for fentry in files:
+                                size += fentry.stat().st_size
+                        entries.append((item.stat().st_mtime, size, item.path))
+                        total += size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+        return
+
+    def report(self):
+        """Write the number of object cache hits and misses to the screen.
+
+        Returns
+        -------
+        None
+
+        """
+        print(
+            f"object cache: {self.hits} hits, {self.misses} misses ('{self.cachedir}')"
+        )
+        return
@@ -0,0 +1,597 @@
+"""Private functions and classes for running compiler, linker, meson, and
+probe processes using asyncio. Processes are run concurrently up to a maximum
+number of jobs, stdout and stderr are streamed to the terminal line by line
+with an optional prefix for each process, and each process can be timed out
+or cancelled. The wall time and peak resident set size (RSS) of every process
+are recorded. A job budget can be activated so processes started by process
+runners in different threads, such as the compile jobs of targets built at
+the same time, share a single maximum number of jobs.
+"""
+
+import asyncio
+import collections
+import contextlib
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# maximum line length read from stdout and stderr
+_STREAM_LIMIT = 2**24
+
+# processes are started in a new process group on posix systems so child
+# processes created by compiler drivers are also stopped
+_POSIX = os.name == "posix" and hasattr(os, "wait4")
+
+# job budget shared by all of the process runners
+_ACTIVE_JOB_BUDGET = None
+
+
+class _ProcessResult:
+    """Result of running a process.
+
+    Parameters
+    ----------
+    cmdlist : list
+        command list used to start the process
+
+    """
+
+    def __init__(self, cmdlist):
+        self.cmdlist = cmdlist
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.elapsed = None
+        self.peak_rss = None
+        self.timed_out = False
+        self.cancelled = False
+        return
+
+
+def _get_peak_rss(rusage):
+    """Convert the maximum resident set size of a process to bytes.
+
+    Parameters
+    ----------
+    rusage : resource.struct_rusage
+        resource usage of a process returned by os.wait4
+
+    Returns
+    -------
+    peak_rss : int
+        peak resident set size in bytes
+
+    """
+    # ru_maxrss is in bytes on macOS and kilobytes on other systems
+    if sys.platform == "darwin":
+        return int(rusage.ru_maxrss)
+    return int(rusage.ru_maxrss) * 1024
+
+
+def _kill_process(proc):
+    """Kill a process and the processes it started.
+
+    Parameters
+    ----------
+    proc : subprocess.Popen or asyncio.subprocess.Process
+        process to kill
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass
+    return
+
+
+async def _read_stream(reader, chunks, prefix, stream, errors):
+    """Read a process stream and optionally write each line to the terminal.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        process stdout or stderr stream
+    chunks : list
+        list the data read from the stream is appended to
+    prefix : str
+        prefix added to each line written to the terminal
+    stream : bool
+        boolean indicating if lines are written to the terminal
+    errors : str
+        error handler used to decode the stream
+
+    Returns
+    -------
+    None
+
+    """
+    if not stream:
+        chunks.append(await reader.read())
+        return
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        chunks.append(line)
+        text = line.decode("utf-8", errors).rstrip("\r\n")
+        print(f"{prefix}{text}", flush=True)
+    return
+
+
+class _JobBudget:
+    """Maximum number of processes run at the same time by process runners
+    in all threads. Jobs are acquired in an event loop and can be released
+    from any thread.
+
+    Parameters
+    ----------
+    jobs : int
+        maximum number of processes run at the same time. The number of
+        available processors is used if jobs is None or less than 1.
+
+    """
+
+    def __init__(self, jobs):
+        if jobs is None or jobs < 1:
+            jobs = os.cpu_count() or 1
+        self.jobs = jobs
+        self.available = jobs
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+        return
+
+    def _notify(self):
+        # wake the first waiter whose event loop is still running. Must be
+        # called with the lock held.
+        while self._waiters:
+            loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_future_result, future)
+                return
+            except RuntimeError:
+                continue
+        return
+
+    async def acquire(self):
+        """Wait until a job is available and acquire it.
+
+        Returns
+        -------
+        None
+
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.available > 0:
+                    self.available -= 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                # pass the wake up to the next waiter if this waiter was
+                # woken before it was cancelled
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif self.available > 0:
+                        self._notify()
+                raise
+
+    def release(self):
+        """Release a job acquired using acquire.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self.available += 1
+            self._notify()
+        return
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+        return False
+
+
+def _set_future_result(future):
+    """Set the result of a future if it is not done.
+
+    Parameters
+    ----------
+    future : asyncio.Future
+        future
+
+    Returns
+    -------
+    None
+
+    """
+    if not future.done():
+        future.set_result(None)
+    return
+
+
+def _activate_job_budget(jobs):
+    """Share a maximum number of jobs between the process runners in all
+    threads.
+
+    Parameters
+    ----------
+    jobs : int
+        maximum number of processes run at the same time. The number of
+        available processors is used if jobs is None or less than 1.
+
+    Returns
+    -------
+    budget : _JobBudget
+        active job budget
+
+    """
+    global _ACTIVE_JOB_BUDGET
+    _ACTIVE_JOB_BUDGET = _JobBudget(jobs)
+    return _ACTIVE_JOB_BUDGET
+
+
+def _get_active_job_budget():
+    """Return the active job budget.
+
+    Returns
+    -------
+    budget : _JobBudget
+        active job budget. None is returned if a job budget is not active.
+
+    """
+    return _ACTIVE_JOB_BUDGET
+
+
+def _deactivate_job_budget():
+    """Stop sharing a maximum number of jobs between process runners.
+
+    Returns
+    -------
+    None
+
+    """
+    global _ACTIVE_JOB_BUDGET
+    _ACTIVE_JOB_BUDGET = None
+    return
+
+
+class _ProcessRunner:
+    """Run processes concurrently using asyncio.
+
+    Parameters
+    ----------
+    jobs : int
+        maximum number of processes run at the same time (default is 1).
+        Processes also wait for the active job budget, if there is one.
+
+    """
+
+    def __init__(self, jobs=1):
+        if jobs is None or jobs < 1:
+            jobs = os.cpu_count() or 1
+        self.jobs = jobs
+        self.results = []
+        self._semaphore = None
+        self._executor = None
+        return
+
+    def _get_semaphore(self):
+        # the semaphore is created in the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.jobs)
+        return self._semaphore
+
+    def _get_executor(self):
+        # threads used to wait for processes so their resource usage is
+        # available
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.jobs, thread_name_prefix="pymake-wait"
+            )
+        return self._executor
+
+    def close(self):
+        """Release the threads used to wait for processes.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return
+
+    async def _start(self, cmdlist, cwd, env, merge_stderr):
+        stderr = subprocess.STDOUT if merge_stderr else subprocess.PIPE
+        loop = asyncio.get_running_loop()
+        if not _POSIX:
+            proc = await asyncio.create_subprocess_exec(
+                *cmdlist,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                cwd=cwd,
+                env=env,
+                limit=_STREAM_LIMIT,
+            )
+            return proc, proc.stdout, proc.stderr, proc.wait()
+
+        # start the process using Popen so it can be waited for using
+        # os.wait4, which returns the resource usage of the process and
+        # the processes it started
+        proc = subprocess.Popen(
+            cmdlist,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,
+        )
+        readers = []
+        for pipe in (proc.stdout, proc.stderr):
+            if pipe is None:
+                readers.append(None)
+                continue
+            reader = asyncio.StreamReader(limit=_STREAM_LIMIT)
+            await loop.connect_read_pipe(
+                lambda reader=reader: asyncio.StreamReaderProtocol(reader), pipe
+            )
+            readers.append(reader)
+        waiter = loop.run_in_executor(self._get_executor(), os.wait4, proc.pid, 0)
+        return proc, readers[0], readers[1], waiter
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait until a process can be run. A slot is available once fewer
+        than jobs processes are running in the process runner and the active
+        job budget, if any, has an available job.
+
+        Yields
+        ------
+        None
+
+        """
+        budget = _get_active_job_budget()
+        if budget is None:
+            budget = contextlib.nullcontext()
+        async with self._get_semaphore(), budget:
+            yield
+
+    async def run(
+        self,
+        cmdlist,
+        prefix=None,
+        echo=False,
+        stream=True,
+        timeout=None,
+        cwd=None,
+        env=None,
+        merge_stderr=False,
+        errors="replace",
+        acquire=True,
+    ):
+        """Run a process.
+
+        Parameters
+        ----------
+        cmdlist : list
+            command list used to start the process
+        prefix : str
+            prefix added to each line of stdout and stderr written to the
+            terminal (default is None)
+        echo : bool
+            boolean indicating if the command is written to the terminal
+            before it is run (default is False)
+        stream : bool
+            boolean indicating if stdout and stderr are written to the
+            terminal as they are produced (default is True)
+        timeout : float
+            number of seconds the process can run before it is killed. The
+            process can run until it finishes if timeout is None.
+            (default is None)
+        cwd : str
+            path to run the process in (default is None)
+        env : dict
+            environment variables for the process. The environment of the
+            current process is used if env is None. (default is None)
+        merge_stderr : bool
+            boolean indicating if stderr is combined with stdout
+            (default is False)
+        errors : str
+            error handler used to decode stdout and stderr
+            (default is 'replace')
+        acquire : bool
+            boolean indicating if the process waits for a slot. Set acquire
+            to False if the caller already holds a slot from slot().
+            (default is True)
+
+        Returns
+        -------
+        result : _ProcessResult
+            process result
+
+        """
+        result = _ProcessResult(cmdlist)
+        if prefix is None:
+            prefix = ""
+        slot = self.slot() if acquire else contextlib.nullcontext()
+        async with slot:
+            if echo:
+                print(" ".join(cmdlist), flush=True)
+            tic = time.perf_counter()
+            try:
+                proc, stdout, stderr, waiter = await self._start(
+                    cmdlist, cwd, env, merge_stderr
+                )
+            except OSError as e:
+                result.returncode = 127
+                result.stderr = str(e)
+                result.elapsed = time.perf_counter() - tic
+                if stream:
+                    print(f"{prefix}{e}", flush=True)
+                self.results.append(result)
+                return result
+            waiter = asyncio.ensure_future(waiter)
+            stdout_chunks = []
+            stderr_chunks = []
+            readers = [
+                asyncio.ensure_future(
+                    _read_stream(reader, chunks, prefix, stream, errors)
+                )
+                for reader, chunks in (
+                    (stdout, stdout_chunks),
+                    (stderr, stderr_chunks),
+                )
+                if reader is not None
+            ]
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                _kill_process(proc)
+            except asyncio.CancelledError:
+                result.cancelled = True
+                _kill_process(proc)
+                await asyncio.gather(waiter, *readers, return_exceptions=True)
+                raise
+            status = await waiter
+            await asyncio.gather(*readers)
+            result.elapsed = time.perf_counter() - tic
+
+        if _POSIX:
+            _, status, rusage = status
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            result.peak_rss = _get_peak_rss(rusage)
+        result.returncode = proc.returncode
+        result.stdout = b"".join(stdout_chunks).decode("utf-8", errors)
+        result.stderr = b"".join(stderr_chunks).decode("utf-8", errors)
+        if result.timed_out:
+            msg = f"{' '.join(cmdlist)} timed out after {timeout} seconds"
+            result.stderr += msg
+            print(f"{prefix}{msg}", flush=True)
+        self.results.append(result)
+        return result
+
+
+def _run_coroutine(coroutine):
+    """Run a coroutine to completion from synchronous code. The coroutine is
+    run in a separate thread if an event loop is already running in the
+    current thread.
+
+    Parameters
+    ----------
+    coroutine : coroutine
+        coroutine to run
+
+    Returns
+    -------
+    value : object
+        value returned by the coroutine
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _run_process(cmdlist, verbose=True, echo=False, **kwargs):
+    """Run a single process from synchronous code.
+
+    Parameters
+    ----------
+    cmdlist : list
+        command list used to start the process
+    verbose : bool
+        boolean indicating if stdout and stderr are written to the terminal
+        (default is True)
+    echo : bool
+        boolean indicating if the command is written to the terminal
+        before it is run (default is False)
+    kwargs : dict
+        additional keyword arguments passed to _ProcessRunner.run
+
+    Returns
+    -------
+    result : _ProcessResult
+        process result
+
+    """
+    runner = _ProcessRunner()
+
+    async def _run():
+        try:
+            return await runner.run(cmdlist, echo=echo, stream=verbose, **kwargs)
+        finally:
+            runner.close()
+
+    return _run_coroutine(_run())
+
+
+def _run_processes(cmdlists, jobs=1, prefixes=None, timeout=None, **kwargs):
+    """Run several processes concurrently from synchronous code.
+
+    Parameters
+    ----------
+    cmdlists : list
+        list of command lists
+    jobs : int
+        maximum number of processes run at the same time. The number of
+        available processors is used if jobs is None or less than 1.
+        (default is 1)
+    prefixes : list
+        list of prefixes added to the terminal output of each process
+        (default is None)
+    timeout : float
+        number of seconds each process can run before it is killed
+        (default is None)
+    kwargs : dict
+        additional keyword arguments passed to _ProcessRunner.run
+
+    Returns
+    -------
+    results : list
+        list of _ProcessResult objects in the same order as cmdlists
+
+    """
+    if prefixes is None:
+        prefixes = [None for _ in cmdlists]
+    runner = _ProcessRunner(jobs)
+
+    async def _run():
+        try:
+            return await asyncio.gather(
+                *(
+                    runner.run(cmdlist, prefix=prefix, timeout=timeout, **kwargs)
+                    for cmdlist, prefix in zip(cmdlists, prefixes)
+                )
+            )
+        finally:
+            runner.close()
+
+    return list(_run_coroutine(_run()))
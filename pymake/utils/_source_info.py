@@ -0,0 +1,389 @@
+"""Private functions for scanning c/c++ and fortran source files. Each source
+file is scanned once for the information needed to order, preprocess, and
+build it and the results are kept between builds.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# module statements that define module procedures instead of modules
+_MODULE_PROCEDURE_TAGS = (
+    "PROCEDURE",
+    "FUNCTION",
+    "SUBROUTINE",
+    "PURE",
+    "IMPURE",
+    "ELEMENTAL",
+    "RECURSIVE",
+    "NON_RECURSIVE",
+)
+
+# preprocessor directives that require a source file to be preprocessed
+_PREPROCESS_DIRECTIVES = (
+    "#define",
+    "#undef",
+    "#ifdef",
+    "#ifndef",
+    "#if",
+    "#error",
+)
+
+_USE_PATTERN = re.compile(
+    r"^use\b\s*(?:,\s*(?:non_)?intrinsic\s*)?(?:::)?\s*(\w+)", re.IGNORECASE
+)
+_SUBMODULE_PATTERN = re.compile(r"^submodule\s*\(([^)]+)\)\s*(\w+)?", re.IGNORECASE)
+# lines that can contain information used by _SourceInfo.scan
+_SCAN_PATTERN = re.compile(
+    rb"^[ \t]*(?:#|module\b|use\b|submodule\b|include\b|program\b|"
+    rb"int[ \t]+main\()[^\n]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+_INCLUDE_PATTERN = re.compile(r"^#?\s*include\s*['\"<]([^'\">]+)['\">]", re.IGNORECASE)
+
+# source file information from previous scans
+_SOURCE_INFO = {}
+
+# source file information file saved in the build directory
+_SOURCE_INFO_FILE = ".pymake_source_info.json"
+_SOURCE_INFO_VERSION = 1
+_SOURCE_INFO_KEYS = (
+    "size",
+    "mtime",
+    "hash",
+    "modules",
+    "submodules",
+    "uses",
+    "submodule_parents",
+    "includes",
+    "directives",
+    "iso_c",
+    "main",
+)
+
+
+class _SourceInfo:
+    """Information for a source file that is determined in a single scan
+    of the source file.
+
+    Parameters
+    ----------
+    name : str
+        source file path
+
+    Attributes
+    ----------
+    modules : list
+        upper case names of the modules defined in the source file
+    submodules : list
+        upper case names of the submodules defined in the source file. The
+        ancestor module and submodule names are separated by a colon.
+    uses : list
+        upper case names of the modules used by the source file, including
+        the parents of submodules
+    submodule_parents : list
+        upper case names of the parents of submodules defined in the source
+        file
+    includes : list
+        names of the files included in the source file
+    directives : list
+        lower case preprocessor directives in the source file
+    iso_c : bool
+        boolean indicating if the source file uses iso_c_binding
+    main : bool
+        boolean indicating if the source file has a fortran program or a
+        c/c++ main function
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.size = None
+        self.mtime = None
+        self.hash = None
+        self.modules = []
+        self.submodules = []
+        self.uses = []
+        self.submodule_parents = []
+        self.includes = []
+        self.directives = []
+        self.iso_c = False
+        self.main = False
+        return
+
+    def to_dict(self):
+        """Return the source file information as a dictionary that can be
+        saved to a json file.
+
+        Returns
+        -------
+        data : dict
+            source file information
+
+        """
+        return {key: getattr(self, key) for key in _SOURCE_INFO_KEYS}
+
+    def from_dict(self, data):
+        """Set the source file information from a dictionary created using
+        to_dict.
+
+        Parameters
+        ----------
+        data : dict
+            source file information
+
+        Returns
+        -------
+        None
+
+        """
+        for key in _SOURCE_INFO_KEYS:
+            setattr(self, key, data[key])
+        return
+
+    @property
+    def preprocess(self):
+        """Boolean indicating if the source file should be preprocessed."""
+        for directive in self.directives:
+            if directive in _PREPROCESS_DIRECTIVES:
+                return True
+        return False
+
+    def scan(self, lines):
+        """Set the source file information from the lines in the source file.
+
+        Parameters
+        ----------
+        lines : list
+            decoded lines in the source file. Only lines that start with
+            a keyword or preprocessor directive are required.
+
+        Returns
+        -------
+        None
+
+        """
+        for line in lines:
+            line = line.strip()
+            if len(line) == 0:
+                continue
+            linelist = line.split()
+            tag = linelist[0].upper()
+
+            # preprocessor directives and c/c++ include files
+            if tag.startswith("#"):
+                directive = linelist[0].lower()
+                if directive not in self.directives:
+                    self.directives.append(directive)
+                if tag == "#INCLUDE" and len(linelist) > 1:
+                    name = linelist[1]
+                    for cval in ['"', "'", "<", ">"]:
+                        name = name.replace(cval, "")
+                    if name not in self.includes:
+                        self.includes.append(name)
+                continue
+
+            # fortran modules and module use
+            if tag == "MODULE":
+                if len(linelist) > 1:
+                    modulename = linelist[1].upper()
+                    if modulename not in _MODULE_PROCEDURE_TAGS:
+                        if modulename not in self.modules:
+                            self.modules.append(modulename)
+            elif tag.startswith("USE"):
+                match = _USE_PATTERN.match(line)
+                if match is not None:
+                    modulename = match.group(1).upper()
+                    if modulename not in self.uses:
+                        self.uses.append(modulename)
+                    if modulename == "ISO_C_BINDING":
+                        self.iso_c = True
+            elif tag.startswith("SUBMODULE"):
+                match = _SUBMODULE_PATTERN.match(line)
+                if match is not None:
+                    parent = match.group(1).replace(" ", "").upper()
+                    if parent not in self.uses:
+                        self.uses.append(parent)
+                    if parent not in self.submodule_parents:
+                        self.submodule_parents.append(parent)
+                    if match.group(2) is not None:
+                        ancestor = parent.split(":")[0]
+                        submodule = f"{ancestor}:{match.group(2).upper()}"
+                        if submodule not in self.submodules:
+                            self.submodules.append(submodule)
+            elif tag == "INCLUDE":
+                match = _INCLUDE_PATTERN.match(line)
+                if match is not None and match.group(1) not in self.includes:
+                    self.includes.append(match.group(1))
+
+            # fortran program or c/c++ main function
+            lower = line.lower()
+            if lower.startswith("program ") or lower.startswith("int main("):
+                self.main = True
+        return
+
+
+def _get_source_info(srcfile):
+    """Get the information for a source file. Source files are only scanned
+    again if the size or modification time of the source file has changed
+    and the contents of the source file have changed.
+
+    Parameters
+    ----------
+    srcfile : str
+        source file path
+
+    Returns
+    -------
+    info : _SourceInfo
+        source file information. None is returned if the source file
+        cannot be read.
+
+    """
+    try:
+        stat = os.stat(srcfile)
+    except OSError:
+        return None
+    info = _SOURCE_INFO.get(srcfile)
+    if info is not None:
+        if info.size == stat.st_size and info.mtime == stat.st_mtime_ns:
+            return info
+
+    # memory map the source file and only decode the lines that start with
+    # a keyword or preprocessor directive
+    try:
+        with open(srcfile, "rb") as f:
+            if stat.st_size > 0:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = b""
+            try:
+                file_hash = hashlib.sha256(data).hexdigest()
+
+                # reuse the source file information if the contents have
+                # not changed
+                if info is not None and info.hash == file_hash:
+                    info.size = stat.st_size
+                    info.mtime = stat.st_mtime_ns
+                    return info
+
+                lines = [
+                    match.group(0).decode("ascii", "replace")
+                    for match in _SCAN_PATTERN.finditer(data)
+                ]
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+    except (OSError, ValueError):
+        return None
+
+    info = _SourceInfo(srcfile)
+    info.size = stat.st_size
+    info.mtime = stat.st_mtime_ns
+    info.hash = file_hash
+    info.scan(lines)
+    _SOURCE_INFO[srcfile] = info
+    return info
+
+
+def _scan_source_files(srcfiles, jobs=None):
+    """Scan source files using a pool of threads so that the latency of
+    reading source files on network file systems overlaps. Source files
+    that have not changed are not scanned again.
+
+    Parameters
+    ----------
+    srcfiles : list
+        list of source file paths
+    jobs : int
+        maximum number of threads. The default number of threads used by
+        ThreadPoolExecutor is used if jobs is None. (default is None)
+
+    Returns
+    -------
+    infos : list
+        list of _SourceInfo objects in srcfiles order. None is included for
+        source files that cannot be read.
+
+    """
+    if jobs == 1 or len(srcfiles) < 2:
+        return [_get_source_info(srcfile) for srcfile in srcfiles]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_get_source_info, srcfiles))
+
+
+def _load_source_info(cachedir):
+    """Load source file information saved in a previous build. Source file
+    information from the current session is not replaced.
+
+    Parameters
+    ----------
+    cachedir : str
+        path to the directory with the source file information file
+
+    Returns
+    -------
+    None
+
+    """
+    fpth = os.path.join(cachedir, _SOURCE_INFO_FILE)
+    if not os.path.isfile(fpth):
+        return
+    try:
+        with open(fpth) as f:
+            data = json.load(f)
+        if data.get("version") != _SOURCE_INFO_VERSION:
+            return
+        for srcfile, values in data["files"].items():
+            if srcfile not in _SOURCE_INFO:
+                info = _SourceInfo(srcfile)
+                info.from_dict(values)
+                _SOURCE_INFO[srcfile] = info
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return
+
+
+def _save_source_info(cachedir, srcfiles):
+    """Save the source file information for a list of source files so it can
+    be used in later builds. The file is only written if the source file
+    information has changed.
+
+    Parameters
+    ----------
+    cachedir : str
+        path to the directory for the source file information file
+    srcfiles : list
+        list of source file paths
+
+    Returns
+    -------
+    None
+
+    """
+    files = {}
+    for srcfile in srcfiles:
+        info = _SOURCE_INFO.get(srcfile)
+        if info is not None:
+            files[srcfile] = info.to_dict()
+    text = json.dumps(
+        {"version": _SOURCE_INFO_VERSION, "files": files}, indent=1, sort_keys=True
+    )
+
+    fpth = os.path.join(cachedir, _SOURCE_INFO_FILE)
+    if os.path.isfile(fpth):
+        with open(fpth) as f:
+            if f.read() == text:
+                return
+
+    # write to a temporary file and replace the existing file so that
+    # concurrent builds do not read a partial file
+    fd, tmppth = tempfile.mkstemp(dir=cachedir, prefix=".tmp", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmppth, fpth)
+    return
@@ -0,0 +1,266 @@
+"""Private class to mirror source files into the temporary source directory.
+Only source files that have been added or changed since the last build are
+copied, hard linked, or reflinked into the temporary source directory and
+files that are no longer part of the build are removed, so repeated builds of
+the same source tree touch almost no files.
+"""
+
+import fnmatch
+import os
+import shutil
+
+from ._file_utils import _get_file_hash
+
+_LINK_MODES = ("copy", "hardlink", "reflink")
+
+# linux ioctl request to clone the extents of a file (reflink)
+_FICLONE = 0x40049409
+
+
+def _reflink_file(src, dst):
+    """Create a copy-on-write clone of a file. The modification time and
+    permission bits of the source file are copied to the clone.
+
+    Parameters
+    ----------
+    src : str
+        source file path
+    dst : str
+        destination file path
+
+    Returns
+    -------
+    None
+
+    """
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    except OSError:
+        if os.path.isfile(dst):
+            os.remove(dst)
+        raise
+    shutil.copystat(src, dst)
+    return
+
+
+class _SourceMirror:
+    """Incrementally mirror source files into a directory.
+
+    Parameters
+    ----------
+    dstdir : str
+        path to the directory the source files are mirrored into
+    linkmode : str
+        method used to add new and changed source files to dstdir. Files
+        are copied if linkmode is 'copy', hard linked if linkmode is
+        'hardlink', and cloned using copy-on-write reflinks if linkmode is
+        'reflink'. Files are copied if the file system does not support hard
+        links or reflinks. (default is 'copy')
+
+    """
+
+    def __init__(self, dstdir, linkmode="copy"):
+        if linkmode is None:
+            linkmode = "copy"
+        if linkmode not in _LINK_MODES:
+            raise ValueError(
+                f"invalid linkmode '{linkmode}' (valid options are "
+                + ", ".join(f"'{value}'" for value in _LINK_MODES)
+                + ")"
+            )
+        self.dstdir = dstdir
+        self.linkmode = linkmode
+        self.files = set()
+        self.dirs = {os.path.abspath(dstdir)}
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+        return
+
+    def _is_current(self, src, dst):
+        """Determine if a mirrored file has the same contents as the source
+        file. File hashes are only compared if the file sizes are the same
+        and the modification times are different.
+
+        Parameters
+        ----------
+        src : str
+            source file path
+        dst : str
+            mirrored file path
+
+        Returns
+        -------
+        current : bool
+            boolean indicating if the mirrored file is current
+
+        """
+        try:
+            dst_stat = os.stat(dst, follow_symlinks=False)
+        except OSError:
+            return False
+        if not os.path.isfile(dst) or os.path.islink(dst):
+            return False
+        src_stat = os.stat(src)
+        if os.path.samestat(src_stat, dst_stat):
+            return True
+        if src_stat.st_size != dst_stat.st_size:
+            return False
+        if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+            return True
+        if _get_file_hash(src) != _get_file_hash(dst):
+            return False
+
+        # reset the modification time so the file is not hashed again
+        os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+
+    def _link_file(self, src, dst):
+        """Add a source file to the mirror using the link mode.
+
+        Parameters
+        ----------
+        src : str
+            source file path
+        dst : str
+            mirrored file path
+
+        Returns
+        -------
+        None
+
+        """
+        if os.path.isdir(dst) and not os.path.islink(dst):
+            shutil.rmtree(dst)
+        elif os.path.lexists(dst):
+            os.remove(dst)
+        if self.linkmode == "hardlink":
+            try:
+                os.link(src, dst)
+                return
+            except (OSError, AttributeError):
+                pass
+        elif self.linkmode == "reflink":
+            try:
+                _reflink_file(src, dst)
+                return
+            except (OSError, ImportError):
+                pass
+        shutil.copy2(src, dst)
+        return
+
+    def _add_dir(self, dst):
+        dst = os.path.abspath(dst)
+        if os.path.lexists(dst) and (os.path.islink(dst) or not os.path.isdir(dst)):
+            os.remove(dst)
+        os.makedirs(dst, exist_ok=True)
+        self.dirs.add(dst)
+        return
+
+    def add_file(self, src, dst):
+        """Mirror a source file.
+
+        Parameters
+        ----------
+        src : str
+            source file path
+        dst : str
+            mirrored file path
+
+        Returns
+        -------
+        None
+
+        """
+        dst = os.path.abspath(dst)
+        self._add_dir(os.path.dirname(dst))
+        if self._is_current(src, dst):
+            self.unchanged += 1
+        else:
+            self._link_file(src, dst)
+            self.updated += 1
+        self.files.add(dst)
+        return
+
+    def is_mirrored(self, fpth):
+        """Determine if a file was added to the mirror.
+
+        Parameters
+        ----------
+        fpth : str
+            mirrored file path
+
+        Returns
+        -------
+        mirrored : bool
+            boolean indicating if the file was added to the mirror
+
+        """
+        return os.path.abspath(fpth) in self.files
+
+    def add_tree(self, srcdir, dstdir, exclude=None):
+        """Mirror a directory tree.
+
+        Parameters
+        ----------
+        srcdir : str
+            path to the source directory
+        dstdir : str
+            path to the mirrored directory
+        exclude : list
+            list of glob-style file and directory name patterns that are
+            not mirrored (default is None)
+
+        Returns
+        -------
+        None
+
+        """
+        if exclude is None:
+            exclude = []
+        self._add_dir(dstdir)
+        for dirpath, dirnames, filenames in os.walk(srcdir, followlinks=True):
+            relpath = os.path.relpath(dirpath, srcdir)
+            dstpath = os.path.normpath(os.path.join(dstdir, relpath))
+            for pattern in exclude:
+                for name in fnmatch.filter(dirnames, pattern):
+                    dirnames.remove(name)
+                filenames = [
+                    name for name in filenames if not fnmatch.fnmatch(name, pattern)
+                ]
+            for name in dirnames:
+                self._add_dir(os.path.join(dstpath, name))
+            for name in filenames:
+                self.add_file(
+                    os.path.join(dirpath, name),
+                    os.path.join(dstpath, name),
+                )
+        return
+
+    def remove_stale(self):
+        """Remove files and directories in the mirrored directory that
+        were not added to the mirror.
+
+        Returns
+        -------
+        None
+
+        """
+        for dirpath, dirnames, filenames in os.walk(self.dstdir, topdown=False):
+            for name in filenames:
+                fpth = os.path.abspath(os.path.join(dirpath, name))
+                if fpth not in self.files:
+                    os.remove(fpth)
+                    self.removed += 1
+            for name in dirnames:
+                dpth = os.path.abspath(os.path.join(dirpath, name))
+                if dpth not in self.dirs:
+                    if os.path.islink(dpth):
+                        os.remove(dpth)
+                    else:
+                        shutil.rmtree(dpth)
+                    self.removed += 1
+        return
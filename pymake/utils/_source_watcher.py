@@ -0,0 +1,259 @@
+"""Private class and function for rebuilding a target when its source files
+change. The source directories, the extrafiles and excludefiles files, and the
+files listed in the extrafiles file are polled for added, changed, and removed
+files. The contents of files with a new size or modification time are hashed
+so files rewritten with the same contents, such as the openspec.inc files
+replaced by pymake, do not trigger a rebuild. Each rebuild runs in the same
+process so the scanned source file information, toolchain profiles, and
+compiler probes cached in memory by earlier builds are reused and, combined
+with expedited builds, only the source files affected by a change are
+compiled before the target is relinked.
+"""
+
+import os
+import time
+
+from ._file_utils import _get_extra_exclude_files, _get_file_hash
+
+# file names that are ignored, such as editor swap and backup files
+_IGNORE_SUFFIXES = ("~", ".swp", ".swx", ".tmp")
+
+
+def _is_ignored(name):
+    """Determine if a file name should not be watched.
+
+    Parameters
+    ----------
+    name : str
+        file name
+
+    Returns
+    -------
+    ignored : bool
+        boolean indicating if the file is not watched
+
+    """
+    return name.startswith(".") or name.endswith(_IGNORE_SUFFIXES)
+
+
+class _SourceWatcher:
+    """Poll source directories and files for changes.
+
+    Parameters
+    ----------
+    srcdirs : list
+        list of directories that are watched, including subdirectories
+    files : list
+        list of additional files that are watched (default is None)
+    extrafiles : str or list
+        path of an extrafiles file or list of source files. The extrafiles
+        file and the files it lists are watched. (default is None)
+    exclude_paths : list
+        list of directories and files that are not watched, such as the
+        temporary source, object, and module directories and the target
+        (default is None)
+    interval : float
+        number of seconds between polls (default is 0.5)
+    settle : float
+        number of seconds without further changes before a change is
+        reported, so several files saved at once trigger a single rebuild
+        (default is 0.25)
+
+    """
+
+    def __init__(
+        self,
+        srcdirs,
+        files=None,
+        extrafiles=None,
+        exclude_paths=None,
+        interval=0.5,
+        settle=0.25,
+    ):
+        self.srcdirs = [os.path.abspath(srcdir) for srcdir in srcdirs if srcdir]
+        self.files = [os.path.abspath(fpth) for fpth in (files or []) if fpth]
+        self.extrafiles = extrafiles
+        if isinstance(extrafiles, str):
+            self.files.append(os.path.abspath(extrafiles))
+        self.exclude_paths = [
+            os.path.abspath(path) for path in (exclude_paths or []) if path
+        ]
+        self.interval = interval
+        self.settle = settle
+        self.state = {}
+        self.changes()
+        return
+
+    def _is_excluded(self, path):
+        for excluded in self.exclude_paths:
+            if path == excluded or path.startswith(excluded + os.sep):
+                return True
+        return False
+
+    def _get_paths(self):
+        paths = []
+        for srcdir in self.srcdirs:
+            for path, dirs, names in os.walk(srcdir):
+                dirs[:] = sorted(
+                    name
+                    for name in dirs
+                    if not name.startswith(".")
+                    and not self._is_excluded(os.path.join(path, name))
+                )
+                for name in names:
+                    fpth = os.path.join(path, name)
+                    if not _is_ignored(name) and not self._is_excluded(fpth):
+                        paths.append(fpth)
+        paths += self.files
+
+        # files listed in the extrafiles file are read on every poll so
+        # files added to the extrafiles file are also watched
+        try:
+            files = _get_extra_exclude_files(self.extrafiles)
+        except Exception:
+            files = None
+        if files is not None:
+            paths += [os.path.abspath(fpth) for fpth in files]
+        return paths
+
+    def snapshot(self):
+        """Return the size and modification time of every watched file.
+
+        Returns
+        -------
+        state : dict
+            dictionary with the file path as the key and a tuple with the
+            size and modification time of the file as the value. Files that
+            do not exist have a value of None.
+
+        """
+        state = {}
+        for fpth in self._get_paths():
+            try:
+                stat = os.stat(fpth)
+                state[fpth] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                state[fpth] = None
+        return state
+
+    def changes(self):
+        """Return the files that have changed since the last call to
+        changes or wait_for_changes and update the saved state. Files are
+        only hashed if their size or modification time has changed.
+
+        Returns
+        -------
+        changed : list
+            sorted list of added, changed, and removed file paths
+
+        """
+        state = {}
+        changed = []
+        for fpth, stat in self.snapshot().items():
+            previous = self.state.get(fpth)
+            if stat is not None and previous is not None and previous[:2] == stat:
+                state[fpth] = previous
+                continue
+            value = None
+            if stat is not None:
+                try:
+                    value = (*stat, _get_file_hash(fpth))
+                except OSError:
+                    value = None
+            state[fpth] = value
+            if value is None or previous is None:
+                if value != previous:
+                    changed.append(fpth)
+            elif value[2] != previous[2]:
+                changed.append(fpth)
+        for fpth, previous in self.state.items():
+            if fpth not in state and previous is not None:
+                changed.append(fpth)
+        self.state = state
+        return sorted(changed)
+
+    def wait_for_changes(self, timeout=None):
+        """Wait until at least one watched file is added, changed, or
+        removed and no further changes are made for settle seconds.
+
+        Parameters
+        ----------
+        timeout : float
+            maximum number of seconds to wait. An empty list is returned if
+            no files changed before the timeout. Wait until a file changes
+            if timeout is None. (default is None)
+
+        Returns
+        -------
+        changed : list
+            sorted list of added, changed, and removed file paths
+
+        """
+        start = time.monotonic()
+        changed = set()
+        while True:
+            changed.update(self.changes())
+            if changed:
+                break
+            if timeout is not None and time.monotonic() - start >= timeout:
+                return []
+            time.sleep(self.interval)
+
+        # wait for the changes to settle
+        while True:
+            time.sleep(self.settle)
+            latest = self.changes()
+            if not latest:
+                break
+            changed.update(latest)
+        return sorted(changed)
+
+
+def _watch_build(build, watcher, max_builds=None):
+    """Build a target and rebuild it every time a watched file changes.
+    Watching stops when the build is interrupted using Ctrl+C. Builds that
+    raise an exception are reported as failed builds and watching continues.
+
+    Parameters
+    ----------
+    build : callable
+        function without arguments that builds the target and returns a
+        return code
+    watcher : _SourceWatcher
+        watcher for the source files of the target
+    max_builds : int
+        maximum number of builds. Watch until interrupted if max_builds is
+        None. (default is None)
+
+    Returns
+    -------
+    returncode : int
+        return code of the last build. The return code is 1 if the last
+        build raised an exception.
+
+    """
+    returncode = 0
+    nbuilds = 0
+    try:
+        while True:
+            tic = time.perf_counter()
+            try:
+                returncode = build()
+            except Exception as e:
+                print(f"build raised an exception: {e!r}")
+                returncode = 1
+            nbuilds += 1
+            elapsed = time.perf_counter() - tic
+            status = "succeeded" if returncode == 0 else "failed"
+            print(f"build {nbuilds} {status} in {elapsed:.3f} seconds")
+            if max_builds is not None and nbuilds >= max_builds:
+                break
+            print("watching for source file changes (press Ctrl+C to stop)...")
+            changed = watcher.wait_for_changes()
+            cwd = os.getcwd()
+            print(f"\n{len(changed)} watched file(s) changed:")
+            for fpth in changed:
+                print(f"    {os.path.relpath(fpth, cwd)}")
+    except KeyboardInterrupt:
+        print("\nstopped watching for source file changes")
+    return returncode
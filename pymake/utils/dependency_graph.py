@@ -0,0 +1,760 @@
+"""Queryable dependency graph of the source files for an application. The
+dependency graph can be used to determine the source files that are impacted
+by a change to source files, include files, or modules, the modules each
+source file provides and consumes, and the circular dependencies in the source
+files. The files impacted by a change can be used to select the source files
+that need to be compiled or the tests that need to be run after a change. The
+parallelism available in a build, including the critical path, the estimated
+speedup for different numbers of compile jobs, and the modules that most
+serialize the build, can also be analyzed. The whole dependency graph can be
+written to a DOT file for Graphviz or to a JSON file.
+
+.. code-block:: python
+
+    import pymake
+
+    graph = pymake.DependencyGraph.from_directory("src", include_subdirs=True)
+    graph.impacted(files=["src/Utilities/kind.f90"])
+    graph.impacted(modules=["KindModule"])
+    graph.provides("src/Utilities/kind.f90")
+    graph.consumes("src/mf6.f90")
+    graph.cycles()
+    graph.parallelism(objdir="obj_mf6", max_jobs=16)
+    graph.write("mf6_dependencies.dot")
+
+"""
+
+import heapq
+import json
+import os
+
+from ._compile_scheduler import _get_compile_weights, _load_compile_times
+from ._compiler_language_files import _get_srcfiles
+from ._dag import DirectedAcyclicGraph, Node, _find_cycle
+from ._file_utils import _get_extra_exclude_files
+from ._source_info import _scan_source_files
+
+
+def _normalize_path(fpth):
+    """Normalize a file path so file paths can be compared.
+
+    Parameters
+    ----------
+    fpth : str
+        file path
+
+    Returns
+    -------
+    fpth : str
+        normalized absolute file path
+
+    """
+    return os.path.normcase(os.path.abspath(fpth))
+
+
+class DependencyGraph:
+    """Dependency graph of Fortran, C, and C++ source files. A source file
+    depends on the source files that provide the modules it uses and the
+    source files it includes. Circular dependencies are allowed so they can
+    be reported.
+
+    Parameters
+    ----------
+    srcfiles : list
+        list of source file paths
+
+    Attributes
+    ----------
+    srcfiles : list
+        list of source file paths in compile order. Source files are listed
+        in the order they were provided if there are circular dependencies.
+    module_files : dict
+        dictionary with the upper case module name as the key and the source
+        file that provides the module as the value
+
+    """
+
+    def __init__(self, srcfiles):
+        srcfiles = list(dict.fromkeys(srcfiles))
+        self._paths = {_normalize_path(fpth): fpth for fpth in srcfiles}
+        self._provides = {}
+        self._consumes = {}
+        self._includes = {}
+        self.module_files = {}
+
+        # get the modules provided, modules used, and files included by
+        # each source file
+        for srcfile, info in zip(srcfiles, _scan_source_files(srcfiles)):
+            if info is None:
+                print(f"DependencyGraph: could not open {srcfile}")
+                self._provides[srcfile] = []
+                self._consumes[srcfile] = []
+                self._includes[srcfile] = []
+                continue
+            provides = info.modules + info.submodules
+            self._provides[srcfile] = provides
+            self._consumes[srcfile] = [
+                module for module in info.uses if module not in provides
+            ]
+            self._includes[srcfile] = list(info.includes)
+            for module in provides:
+                self.module_files[module] = srcfile
+
+        # include files are matched to source files using the file name
+        basenames = {}
+        for srcfile in srcfiles:
+            basenames.setdefault(os.path.basename(srcfile).lower(), srcfile)
+
+        # build the dependencies and dependents of each source file
+        self._dependencies = {srcfile: [] for srcfile in srcfiles}
+        self._dependents = {srcfile: [] for srcfile in srcfiles}
+        self._included_by = {}
+        self._reasons = {}
+        for srcfile in srcfiles:
+            # the modules and include files that create each dependency
+            reasons = {}
+            for module in self._consumes[srcfile]:
+                provider = self.module_files.get(module)
+                if provider is not None:
+                    reasons.setdefault(provider, set()).add(module)
+            for name in self._includes[srcfile]:
+                name = os.path.basename(name).lower()
+                self._included_by.setdefault(name, []).append(srcfile)
+                provider = basenames.get(name)
+                if provider is not None:
+                    reasons.setdefault(provider, set()).add(None)
+            reasons.pop(srcfile, None)
+            self._reasons[srcfile] = reasons
+            for dependency in reasons:
+                self._dependencies[srcfile].append(dependency)
+                self._dependents[dependency].append(srcfile)
+
+        # sort the source files in compile order if there are no circular
+        # dependencies
+        self._cycles = None
+        self.srcfiles = srcfiles
+        if len(self.cycles()) < 1:
+            self.srcfiles = [node.name for node in self._get_dag().toposort()]
+        self._order = {srcfile: idx for idx, srcfile in enumerate(self.srcfiles)}
+        return
+
+    @classmethod
+    def from_directory(
+        cls,
+        srcdir,
+        include_subdirs=False,
+        srcdir2=None,
+        extrafiles=None,
+        excludefiles=None,
+    ):
+        """Create the dependency graph for the source files in one or more
+        directories.
+
+        Parameters
+        ----------
+        srcdir : str
+            path for directory containing source files
+        include_subdirs : bool
+            boolean indicating source files in srcdir and srcdir2
+            subdirectories should be included (default is False)
+        srcdir2 : str
+            additional directory with common source files (default is None)
+        extrafiles : str or list
+            path for extrafiles file that contains paths to additional source
+            files to include or a list of source files (default is None)
+        excludefiles : str or list
+            path for excludefiles file that contains the source files to
+            exclude or a list of source files (default is None)
+
+        Returns
+        -------
+        graph : DependencyGraph
+            dependency graph of the source files
+
+        """
+        srcfiles = _get_srcfiles(srcdir, include_subdirs)
+        if srcdir2 is not None:
+            srcfiles += _get_srcfiles(srcdir2, include_subdirs)
+        files = _get_extra_exclude_files(extrafiles)
+        if files is not None:
+            srcfiles += [os.path.relpath(fpth) for fpth in files]
+        files = _get_extra_exclude_files(excludefiles)
+        if files is not None:
+            exclude = set(os.path.basename(fpth) for fpth in files)
+            srcfiles = [
+                fpth for fpth in srcfiles if os.path.basename(fpth) not in exclude
+            ]
+        return cls(srcfiles)
+
+    def _get_dag(self):
+        nodes = {srcfile: Node(srcfile) for srcfile in self.srcfiles}
+        for srcfile, node in nodes.items():
+            for dependency in self._dependencies[srcfile]:
+                node.add_dependency(nodes[dependency])
+        return DirectedAcyclicGraph(list(nodes.values()))
+
+    def _get_srcfile(self, fpth):
+        """Return the source file in the dependency graph for a file path or
+        None if the file is not a source file in the dependency graph."""
+        if fpth in self._dependencies:
+            return fpth
+        return self._paths.get(_normalize_path(fpth))
+
+    def _check_srcfile(self, fpth):
+        srcfile = self._get_srcfile(fpth)
+        if srcfile is None:
+            raise ValueError(f"{fpth} is not a source file in the dependency graph")
+        return srcfile
+
+    def provides(self, srcfile):
+        """Return the modules and submodules provided by a source file.
+
+        Parameters
+        ----------
+        srcfile : str
+            source file path
+
+        Returns
+        -------
+        modules : list
+            upper case names of the modules and submodules defined in the
+            source file
+
+        """
+        return list(self._provides[self._check_srcfile(srcfile)])
+
+    def consumes(self, srcfile):
+        """Return the modules used by a source file that are not defined in
+        the source file.
+
+        Parameters
+        ----------
+        srcfile : str
+            source file path
+
+        Returns
+        -------
+        modules : list
+            upper case names of the modules used by the source file,
+            including intrinsic and external modules that are not provided by
+            a source file in the dependency graph
+
+        """
+        return list(self._consumes[self._check_srcfile(srcfile)])
+
+    def includes(self, srcfile):
+        """Return the files included by a source file.
+
+        Parameters
+        ----------
+        srcfile : str
+            source file path
+
+        Returns
+        -------
+        includes : list
+            names of the files included in the source file
+
+        """
+        return list(self._includes[self._check_srcfile(srcfile)])
+
+    def dependencies(self, srcfile, transitive=False):
+        """Return the source files a source file depends on.
+
+        Parameters
+        ----------
+        srcfile : str
+            source file path
+        transitive : bool
+            boolean indicating if the source files the dependencies depend on
+            are also returned (default is False)
+
+        Returns
+        -------
+        srcfiles : list
+            list of source files in compile order
+
+        """
+        srcfile = self._check_srcfile(srcfile)
+        if transitive:
+            found = self._walk([srcfile], self._dependencies)
+            found.discard(srcfile)
+        else:
+            found = self._dependencies[srcfile]
+        return sorted(found, key=self._order.get)
+
+    def dependents(self, srcfile, transitive=False):
+        """Return the source files that depend on a source file.
+
+        Parameters
+        ----------
+        srcfile : str
+            source file path
+        transitive : bool
+            boolean indicating if the source files that depend on the
+            dependents are also returned (default is False)
+
+        Returns
+        -------
+        srcfiles : list
+            list of source files in compile order
+
+        """
+        srcfile = self._check_srcfile(srcfile)
+        if transitive:
+            found = self._walk([srcfile], self._dependents)
+            found.discard(srcfile)
+        else:
+            found = self._dependents[srcfile]
+        return sorted(found, key=self._order.get)
+
+    @staticmethod
+    def _walk(roots, edges):
+        found = set(roots)
+        stack = list(roots)
+        while stack:
+            for other in edges[stack.pop()]:
+                if other not in found:
+                    found.add(other)
+                    stack.append(other)
+        return found
+
+    def impacted(self, files=None, modules=None, include_changed=True):
+        """Return the source files impacted by a change to source files,
+        include files, or modules. A source file is impacted if it depends,
+        directly or indirectly, on a changed source file or module.
+
+        Parameters
+        ----------
+        files : str or list
+            changed source file or include file paths. Include files are
+            matched to the source files that include them using the file
+            name. Files that are not source or include files used by the
+            source files in the dependency graph are ignored.
+            (default is None)
+        modules : str or list
+            names of changed modules. Module names are not case sensitive.
+            (default is None)
+        include_changed : bool
+            boolean indicating if changed source files and the source files
+            that provide changed modules or include changed files are
+            included (default is True)
+
+        Returns
+        -------
+        srcfiles : list
+            list of impacted source files in compile order
+
+        """
+        if isinstance(files, str):
+            files = [files]
+        if isinstance(modules, str):
+            modules = [modules]
+
+        roots = set()
+        for fpth in files or []:
+            srcfile = self._get_srcfile(fpth)
+            if srcfile is not None:
+                roots.add(srcfile)
+            roots.update(self._included_by.get(os.path.basename(fpth).lower(), []))
+        for module in modules or []:
+            module = module.upper()
+            srcfile = self.module_files.get(module)
+            if srcfile is not None:
+                roots.add(srcfile)
+            else:
+                # modules that are not provided by a source file, such as
+                # external library modules, impact the source files using them
+                for srcfile, consumes in self._consumes.items():
+                    if module in consumes:
+                        roots.add(srcfile)
+
+        if not include_changed:
+            roots = [
+                dependent for root in roots for dependent in self._dependents[root]
+            ]
+        found = self._walk(roots, self._dependents)
+        return sorted(found, key=self._order.get)
+
+    def cycles(self):
+        """Return the circular dependencies in the source files. A circular
+        dependency is returned for each group of source files that depend on
+        each other.
+
+        Returns
+        -------
+        cycles : list
+            list of circular dependencies. Each circular dependency is a list
+            of source files with the first source file repeated at the end.
+
+        """
+        if self._cycles is None:
+            self._cycles = []
+            for component in self._get_components():
+                if len(component) < 2:
+                    continue
+                nodes = {srcfile: Node(srcfile) for srcfile in component}
+                for srcfile, node in nodes.items():
+                    for dependency in self._dependencies[srcfile]:
+                        if dependency in nodes:
+                            node.add_dependency(nodes[dependency])
+                self._cycles.append(_find_cycle(list(nodes.values())))
+        return [list(cycle) for cycle in self._cycles]
+
+    def _get_components(self):
+        """Return the strongly connected components of the dependency graph
+        using an iterative version of Tarjan's algorithm."""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self.srcfiles:
+            if root in index:
+                continue
+            work = [(root, iter(self._dependencies[root]))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self._dependencies[child])))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component[::-1])
+        return components
+
+    def _check_cycles(self):
+        cycles = self.cycles()
+        if len(cycles) > 0:
+            cycle = " -> ".join(cycles[0])
+            raise ValueError(
+                f"Circular dependencies are present. Cannot analyze the build: {cycle}"
+            )
+        return
+
+    def levels(self):
+        """Return the source files in each level of the dependency graph. The
+        source files in the first level do not depend on other source files
+        and the source files in each of the other levels depend on at least
+        one source file in the previous level.
+
+        Returns
+        -------
+        levels : list
+            list with a list of source files for each level
+
+        """
+        self._check_cycles()
+        level = {}
+        for srcfile in self.srcfiles:
+            level[srcfile] = 1 + max(
+                (level[dependency] for dependency in self._dependencies[srcfile]),
+                default=0,
+            )
+        levels = [[] for _ in range(max(level.values(), default=0))]
+        for srcfile in self.srcfiles:
+            levels[level[srcfile] - 1].append(srcfile)
+        return levels
+
+    def compile_weights(self, objdir=None):
+        """Return the estimated compile time of each source file. Compile
+        times saved in the object directory by previous builds are matched
+        to source files using the file name. The compile time of the other
+        source files is estimated from the size of the source files.
+
+        Parameters
+        ----------
+        objdir : str
+            path to the object directory of a previous build. Compile times
+            are estimated from the size of the source files if objdir is
+            None. (default is None)
+
+        Returns
+        -------
+        weights : dict
+            dictionary with the source file path as the key and the estimated
+            compile time as the value
+        timed : int
+            number of source files with a compile time from a previous build
+
+        """
+        compile_times = {}
+        if objdir is not None:
+            basenames = {
+                os.path.basename(srcfile): srcfile for srcfile in self.srcfiles
+            }
+            for name, value in _load_compile_times(objdir).items():
+                srcfile = basenames.get(os.path.basename(name))
+                if srcfile is not None:
+                    compile_times[os.path.normpath(srcfile)] = value
+        return _get_compile_weights(self.srcfiles, compile_times)
+
+    def _longest_paths(self, weights, skip_module=None):
+        """Return the length of the longest weighted path that ends at each
+        source file. Dependencies that are only created by skip_module are
+        ignored."""
+        lengths = {}
+        for srcfile in self.srcfiles:
+            length = 0.0
+            for dependency, reasons in self._reasons[srcfile].items():
+                if skip_module is not None and reasons == {skip_module}:
+                    continue
+                length = max(length, lengths[dependency])
+            lengths[srcfile] = weights[srcfile] + length
+        return lengths
+
+    def _simulate_schedule(self, weights, priorities, jobs):
+        """Return the time to compile the source files with a number of
+        compile jobs. Ready source files are started in order of decreasing
+        priority, which is how the compile scheduler starts compile jobs."""
+        waiting = {
+            srcfile: len(self._dependencies[srcfile]) for srcfile in self.srcfiles
+        }
+        ready = [
+            (-priorities[srcfile], self._order[srcfile], srcfile)
+            for srcfile in self.srcfiles
+            if waiting[srcfile] == 0
+        ]
+        heapq.heapify(ready)
+        running = []
+        time = 0.0
+        while ready or running:
+            while ready and len(running) < jobs:
+                _, order, srcfile = heapq.heappop(ready)
+                heapq.heappush(running, (time + weights[srcfile], order, srcfile))
+            time, _, srcfile = heapq.heappop(running)
+            for dependent in self._dependents[srcfile]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    heapq.heappush(
+                        ready,
+                        (-priorities[dependent], self._order[dependent], dependent),
+                    )
+        return time
+
+    def parallelism(self, weights=None, objdir=None, max_jobs=None, top=5):
+        """Analyze the parallelism available when compiling the source files.
+
+        Parameters
+        ----------
+        weights : dict
+            dictionary with the source file path as the key and the compile
+            time as the value. Weights are determined using compile_weights
+            if weights is None. (default is None)
+        objdir : str
+            path to the object directory of a previous build that is used to
+            determine weights if weights is None (default is None)
+        max_jobs : int
+            the estimated speedup is determined for 1 to max_jobs compile
+            jobs. The number of available processors is used if max_jobs is
+            None. (default is None)
+        top : int
+            number of modules that most serialize the build that are
+            returned (default is 5)
+
+        Returns
+        -------
+        report : dict
+            dictionary with the number of source files (files), number of
+            source files with a compile time from a previous build (timed),
+            number of levels (depth), number of source files in each level
+            (widths), total compile time (total_work), critical path length
+            (critical_path_length), source files on the critical path
+            (critical_path), maximum speedup (max_speedup), estimated speedup
+            for each number of compile jobs (speedups), and the modules that
+            most serialize the build (serializing_modules). Each serializing
+            module is a dictionary with the module name (module), source file
+            that provides the module (file), number of source files that use
+            the module (consumers), and reduction in the critical path length
+            if the source files that use the module did not have to wait for
+            it to be compiled (reduction).
+
+        """
+        levels = self.levels()
+        timed = None
+        if weights is None:
+            weights, timed = self.compile_weights(objdir)
+        if max_jobs is None:
+            max_jobs = os.cpu_count() or 1
+        max_jobs = max(int(max_jobs), 1)
+
+        # critical path
+        total_work = sum(weights[srcfile] for srcfile in self.srcfiles)
+        lengths = self._longest_paths(weights)
+        critical_path = []
+        critical_path_length = 0.0
+        if len(lengths) > 0:
+            srcfile = max(self.srcfiles, key=lambda srcfile: lengths[srcfile])
+            critical_path_length = lengths[srcfile]
+            while srcfile is not None:
+                critical_path.append(srcfile)
+                srcfile = max(
+                    self._dependencies[srcfile],
+                    key=lambda dependency: lengths[dependency],
+                    default=None,
+                )
+            critical_path.reverse()
+
+        # estimated speedup using the priorities used by the compile scheduler
+        nodes = {
+            srcfile: Node(srcfile, weight=weights[srcfile]) for srcfile in self.srcfiles
+        }
+        for srcfile, node in nodes.items():
+            for dependency in self._dependencies[srcfile]:
+                node.add_dependency(nodes[dependency])
+        priorities = DirectedAcyclicGraph(list(nodes.values())).critical_path_lengths()
+        speedups = {}
+        for jobs in range(1, max_jobs + 1):
+            makespan = self._simulate_schedule(weights, priorities, jobs)
+            speedups[jobs] = total_work / makespan if makespan > 0.0 else 1.0
+
+        # modules that most serialize the build
+        consumers = {}
+        for srcfile in self.srcfiles:
+            for reasons in self._reasons[srcfile].values():
+                for module in reasons:
+                    if module is not None:
+                        consumers[module] = consumers.get(module, 0) + 1
+        serializing = []
+        for module, count in consumers.items():
+            reduced = max(self._longest_paths(weights, skip_module=module).values())
+            reduction = critical_path_length - reduced
+            if reduction > 0.0:
+                serializing.append(
+                    {
+                        "module": module,
+                        "file": self.module_files[module],
+                        "consumers": count,
+                        "reduction": reduction,
+                    }
+                )
+        serializing.sort(key=lambda item: (-item["reduction"], item["module"]))
+
+        return {
+            "files": len(self.srcfiles),
+            "timed": timed,
+            "depth": len(levels),
+            "widths": [len(level) for level in levels],
+            "total_work": total_work,
+            "critical_path_length": critical_path_length,
+            "critical_path": critical_path,
+            "max_speedup": (
+                total_work / critical_path_length if critical_path_length > 0.0 else 1.0
+            ),
+            "speedups": speedups,
+            "serializing_modules": serializing[:top],
+        }
+
+    def to_dict(self):
+        """Return the dependency graph as a dictionary that can be saved to a
+        json file.
+
+        Returns
+        -------
+        data : dict
+            dictionary with the provided modules, consumed modules, included
+            files, and dependencies of each source file and the circular
+            dependencies
+
+        """
+        return {
+            "srcfiles": {
+                srcfile: {
+                    "provides": self.provides(srcfile),
+                    "consumes": self.consumes(srcfile),
+                    "includes": self.includes(srcfile),
+                    "dependencies": self.dependencies(srcfile),
+                }
+                for srcfile in self.srcfiles
+            },
+            "cycles": self.cycles(),
+        }
+
+    def to_dot(self):
+        """Return the dependency graph in the Graphviz DOT language. Each
+        source file is a node labeled with the file name and each dependency
+        is an edge from a source file to the source file it depends on,
+        labeled with the modules that create the dependency. Dependencies
+        created by include files are dashed.
+
+        Returns
+        -------
+        dot : str
+            dependency graph in the DOT language
+
+        """
+
+        def _quote(value):
+            value = value.replace("\\", "\\\\").replace('"', '\\"')
+            return f'"{value}"'
+
+        lines = [
+            "digraph dependencies {",
+            "    node [shape=box, style=filled, fillcolor=lightgray];",
+        ]
+        for srcfile in self.srcfiles:
+            label = os.path.basename(srcfile)
+            lines.append(f"    {_quote(srcfile)} [label={_quote(label)}];")
+        for srcfile in self.srcfiles:
+            for dependency in self._dependencies[srcfile]:
+                reasons = self._reasons[srcfile][dependency]
+                modules = sorted(module for module in reasons if module is not None)
+                attrs = []
+                if modules:
+                    attrs.append(f"label={_quote(', '.join(modules))}")
+                else:
+                    attrs.append("style=dashed")
+                lines.append(
+                    f"    {_quote(srcfile)} -> {_quote(dependency)} "
+                    f"[{', '.join(attrs)}];"
+                )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, fpth):
+        """Write the dependency graph to a DOT file (.dot or .gv extension)
+        or a JSON file (.json extension).
+
+        Parameters
+        ----------
+        fpth : str
+            path of the file
+
+        Returns
+        -------
+        None
+
+        """
+        ext = os.path.splitext(fpth)[1].lower()
+        if ext in (".dot", ".gv"):
+            text = self.to_dot()
+        elif ext == ".json":
+            text = json.dumps(self.to_dict(), indent=2) + "\n"
+        else:
+            raise ValueError(
+                f"unknown dependency graph file extension '{ext}' - "
+                "use .dot, .gv, or .json"
+            )
+        with open(fpth, "w") as f:
+            f.write(text)
+        return
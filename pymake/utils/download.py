@@ -15,13 +15,17 @@ import os
 import shutil
 import sys
 import tarfile
+import time
 import timeit
-from http.client import responses
 from pathlib import Path
 from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 import requests
 
+from ._build_profile import _profile_step
+from ._download_cache import _get_download_cache
+from ._http_session import _request
+
 
 class pymakeZipFile(ZipFile):
     """ZipFile file attributes are not being preserved. This class preserves
@@ -186,7 +190,9 @@ class pymakeZipFile(ZipFile):
         return success
 
 
-def _request_get(url, verify=True, timeout=1, max_requests=10, verbose=False):
+def _request_get(
+    url, verify=True, timeout=None, max_requests=10, verbose=False, headers=None
+):
     """Make a url request
 
     Parameters
@@ -196,13 +202,21 @@ def _request_get(url, verify=True, timeout=1, max_requests=10, verbose=False):
     verify : bool
         boolean indicating if the url request should be verified
         (default is True)
-    timeout : int
-        url request time out length (default is 1 seconds)
+    timeout : float or tuple
+        url request read timeout in seconds or a tuple with the connect and
+        read timeouts. A 10 second connect timeout and a 60 second read
+        timeout are used if timeout is None. (default is None)
     max_requests : int
-        number of url download request attempts (default is 10)
+        number of url download request attempts. Failed requests are retried
+        with exponential backoff. (default is 10)
     verbose : bool
         boolean indicating if output will be printed to the terminal
         (default is False)
+    headers : dict
+        additional request headers, such as the conditional request headers
+        used to validate a cached file or the range request headers used to
+        resume a download. A not modified (304) or partial content (206)
+        response is returned for these requests. (default is None)
 
     Returns
     -------
@@ -213,24 +227,16 @@ def _request_get(url, verify=True, timeout=1, max_requests=10, verbose=False):
     if verbose:
         print(f"request url '{url}'")
 
-    for idx in range(max_requests):
-        if verbose:
-            print(f"  request attempt {idx + 1} of {max_requests}")
-        req = None
-        try:
-            req = requests.get(
-                url,
-                stream=True,
-                verify=verify,
-                timeout=timeout,
-            )
-            if verbose:
-                print(f"    status: {responses[req.status_code]}")
-        except:
-            continue
-
-        if req.status_code == 200:
-            break
+    req = _request(
+        "GET",
+        url,
+        max_requests=max_requests,
+        timeout=timeout,
+        verbose=verbose,
+        stream=True,
+        verify=verify,
+        headers=headers,
+    )
 
     # final test for success
     if req is None:
@@ -241,7 +247,141 @@ def _request_get(url, verify=True, timeout=1, max_requests=10, verbose=False):
     return req
 
 
-def _request_header(url, max_requests=10, timeout=1, verbose=False):
+def _get_content_length(req):
+    """Get the length of a downloaded file from the response headers.
+
+    Parameters
+    ----------
+    req : request object
+        request object for the complete file
+
+    Returns
+    -------
+    content_length : int
+        length of the file in bytes or 0 if the length is not reported or
+        the file is compressed for the transfer
+
+    """
+    content_encoding = req.headers.get("Content-Encoding", "identity").lower()
+    if content_encoding != "identity":
+        return 0
+    try:
+        return int(req.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _accepts_ranges(req):
+    """Determine if a download can be resumed with range requests.
+
+    Parameters
+    ----------
+    req : request object
+        request object for the complete file
+
+    Returns
+    -------
+    accepts_ranges : bool
+        boolean indicating if the server accepts byte range requests and
+        reports the length of the file
+
+    """
+    accept_ranges = req.headers.get("Accept-Ranges", "none").lower()
+    return accept_ranges == "bytes" and _get_content_length(req) > 0
+
+
+def _get_range_headers(start, validator=None):
+    """Get the request headers used to resume a download.
+
+    Parameters
+    ----------
+    start : int
+        first byte of the requested range. A range request is not made if
+        start is 0.
+    validator : str
+        ETag or Last-Modified header of the complete file. The server
+        returns the complete file instead of the range if the file has
+        changed. (default is None)
+
+    Returns
+    -------
+    headers : dict
+        Range and If-Range headers or None if start is 0
+
+    """
+    if start < 1:
+        return None
+    headers = {"Range": f"bytes={start}-"}
+    if validator is not None:
+        headers["If-Range"] = validator
+    return headers
+
+
+def _is_range_response(req, start):
+    """Determine if a response contains the requested byte range.
+
+    Parameters
+    ----------
+    req : request object
+        request object for the range request
+    start : int
+        first byte of the requested range
+
+    Returns
+    -------
+    is_range_response : bool
+        boolean indicating if the response continues the download at start
+
+    """
+    if start < 1 or req.status_code != 206:
+        return False
+    content_range = req.headers.get("Content-Range", "")
+    return content_range.startswith(f"bytes {start}-")
+
+
+def _remove_download_dir(pth, verbose=False):
+    """Remove a directory with downloaded files. Removal is attempted several
+    times because files may still be in use on Windows.
+
+    Parameters
+    ----------
+    pth : str
+        path of the directory
+    verbose : bool
+        boolean indicating if output will be printed to the terminal
+        (default is False)
+
+    Returns
+    -------
+    None
+
+    """
+    if os.path.exists(pth):
+        ntries = 10
+        for itries in range(ntries):
+            # wait to delete on windows
+            if sys.platform.lower() == "win32":
+                time.sleep(3)
+
+            # remove the directory
+            try:
+                shutil.rmtree(pth)
+                if verbose:
+                    print(f"removing download directory...'{pth}'")
+                break
+            except:
+                if verbose:
+                    msg = f"    removal attempt {itries + 1:>2d} of {ntries:>2d}"
+                    print(msg)
+
+        # wait prior to returning on windows
+        if sys.platform.lower() == "win32":
+            time.sleep(6)
+
+    return
+
+
+def _request_header(url, max_requests=10, timeout=None, verbose=False):
     """Get the headers from a url
 
     Parameters
@@ -249,9 +389,12 @@ def _request_header(url, max_requests=10, timeout=1, verbose=False):
     url : str
         url address for the zip file
     max_requests : int
-        number of url download request attempts (default is 10)
-    timeout : int
-        url request time out length (default is 1 seconds)
+        number of url download request attempts. Failed requests are retried
+        with exponential backoff. (default is 10)
+    timeout : float or tuple
+        url request read timeout in seconds or a tuple with the connect and
+        read timeouts. A 10 second connect timeout and a 60 second read
+        timeout are used if timeout is None. (default is None)
     verbose : bool
         boolean indicating if output will be printed to the terminal
         (default is False)
@@ -265,23 +408,14 @@ def _request_header(url, max_requests=10, timeout=1, verbose=False):
     if verbose:
         print(f"request url: '{url}'")
 
-    for idx in range(max_requests):
-        if verbose:
-            print(f"  request attempt {idx + 1} of {max_requests}")
-        header = None
-        try:
-            header = requests.head(
-                url,
-                allow_redirects=True,
-                timeout=timeout,
-            )
-            if verbose:
-                print(f"    status: {responses[header.status_code]}")
-        except:
-            continue
-
-        if header.status_code == 200:
-            break
+    header = _request(
+        "HEAD",
+        url,
+        max_requests=max_requests,
+        timeout=timeout,
+        verbose=verbose,
+        allow_redirects=True,
+    )
 
     # final test for success
     if header is None:
@@ -301,8 +435,11 @@ def download_and_unzip(
     max_requests=10,
     chunk_size=2048000,
     verbose=False,
+    cache=True,
 ):
-    """Download and unzip a zip file from a url.
+    """Download and unzip a zip file from a url. Downloaded files are stored in
+    a download cache and the cached file is used if the server confirms that
+    the file has not changed since it was downloaded.
 
     Parameters
     ----------
@@ -323,6 +460,11 @@ def download_and_unzip(
         maximum url download request chunk size (default is 2048000 bytes)
     verbose : bool
         boolean indicating if output will be printed to the terminal
+    cache : bool or str
+        boolean indicating if the download cache in the pymake user cache
+        directory is used or the path to a download cache directory. The
+        download cache is not used if cache is False or the
+        PYMAKE_DOWNLOAD_CACHE environment variable is 0. (default is True)
 
     Returns
     -------
@@ -342,93 +484,188 @@ def download_and_unzip(
     file_name = os.path.join(pth, url.split("/")[-1])
 
     # download the file
-    success = False
-    tic = timeit.default_timer()
-
-    # open request
-    req = _request_get(
-        url,
-        verify=verify,
-        timeout=timeout,
-        max_requests=max_requests,
-        verbose=verbose,
-    )
-
-    # get content length, if available
-    tag = "Content-length"
-    if tag in req.headers:
-        file_size = req.headers[tag]
-        len_file_size = len(file_size)
-        file_size = int(file_size)
-
-        bfmt = "{:" + f"{len_file_size}" + ",d}"
-        sbfmt = "{:>" + f"{len(bfmt.format(int(file_size)))}" + "s} bytes"
-        msg = f"   file size: {sbfmt.format(bfmt.format(int(file_size)))}"
-        if verbose:
-            print(msg)
-    else:
-        file_size = 0.0
-
-    # download data from url
-    for idx in range(max_requests):
-        # print download attempt message
-        if verbose:
-            print(f" download attempt: {idx + 1}")
-
-        # connection established - download the file
-        download_size = 0
+    with _profile_step(os.path.basename(file_name), "download", url=url) as step:
+        success = False
+        tic = timeit.default_timer()
+
+        # conditional request headers used to validate the cached file
+        download_cache = _get_download_cache(cache)
+        headers = None
+        if download_cache is not None:
+            headers = download_cache.get_headers(url)
+
+        # open request. The cached file is used if the server is not
+        # available.
         try:
-            with open(file_name, "wb") as f:
-                for chunk in req.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        # increment the counter
-                        download_size += len(chunk)
-
-                        # write the chunk
-                        f.write(chunk)
-
-                        # write information to the screen
-                        if verbose:
-                            if file_size > 0:
-                                download_percent = float(download_size) / float(
-                                    file_size
-                                )
-                                msg = (
-                                    "     downloaded "
-                                    + sbfmt.format(bfmt.format(download_size))
-                                    + " of "
-                                    + bfmt.format(int(file_size))
-                                    + " bytes"
-                                    + f" ({download_percent:10.4%})"
-                                )
-                            else:
-                                msg = (
-                                    "     downloaded "
-                                    + sbfmt.format(bfmt.format(download_size))
-                                    + " bytes"
-                                )
-                            print(msg)
-                        else:
-                            sys.stdout.write(".")
-                            sys.stdout.flush()
-
-                success = True
-        except:
-            # reestablish request
             req = _request_get(
                 url,
                 verify=verify,
                 timeout=timeout,
                 max_requests=max_requests,
                 verbose=verbose,
+                headers=headers,
             )
+        except ConnectionError:
+            if download_cache is None or not download_cache.restore(url, file_name):
+                raise
+            print(f"could not validate the cached copy of...'{url}'")
+            req = None
+            success = True
+
+        # use the cached file if it has not changed
+        if req is not None and req.status_code == 304:
+            if download_cache.restore(url, file_name):
+                success = True
+            else:
+                req = _request_get(
+                    url,
+                    verify=verify,
+                    timeout=timeout,
+                    max_requests=max_requests,
+                    verbose=verbose,
+                )
+        if success:
+            print(f"using the cached copy of...'{url}'")
+            step["cached"] = True
+
+        file_size = 0.0
+        if not success:
+            # get content length, if available
+            tag = "Content-length"
+            if tag in req.headers:
+                file_size = req.headers[tag]
+                len_file_size = len(file_size)
+                file_size = int(file_size)
+
+                bfmt = "{:" + f"{len_file_size}" + ",d}"
+                sbfmt = "{:>" + f"{len(bfmt.format(int(file_size)))}" + "s} bytes"
+                msg = f"   file size: {sbfmt.format(bfmt.format(int(file_size)))}"
+                if verbose:
+                    print(msg)
+            else:
+                file_size = 0.0
+
+            # data is written to a partial file that is renamed after the
+            # download is complete. An interrupted download is resumed with
+            # a range request if the server supports range requests.
+            part_name = f"{file_name}.part"
+            if os.path.isfile(part_name):
+                os.remove(part_name)
+            content_length = _get_content_length(req)
+            resumable = _accepts_ranges(req)
+            validator = req.headers.get("ETag", req.headers.get("Last-Modified"))
+
+            # download data from url
+            download_size = 0
+            for idx in range(max_requests):
+                # print download attempt message
+                if verbose:
+                    print(f" download attempt: {idx + 1}")
+
+                # connection established - download the file
+                try:
+                    with open(part_name, "ab" if download_size > 0 else "wb") as f:
+                        for chunk in req.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                # write the chunk
+                                f.write(chunk)
+
+                                # increment the counter
+                                download_size += len(chunk)
+
+                                # write information to the screen
+                                if verbose:
+                                    if file_size > 0:
+                                        download_percent = float(download_size) / float(
+                                            file_size
+                                        )
+                                        msg = (
+                                            "     downloaded "
+                                            + sbfmt.format(bfmt.format(download_size))
+                                            + " of "
+                                            + bfmt.format(int(file_size))
+                                            + " bytes"
+                                            + f" ({download_percent:10.4%})"
+                                        )
+                                    else:
+                                        msg = (
+                                            "     downloaded "
+                                            + sbfmt.format(bfmt.format(download_size))
+                                            + " bytes"
+                                        )
+                                    print(msg)
+                                else:
+                                    sys.stdout.write(".")
+                                    sys.stdout.flush()
+
+                    # the download is incomplete if fewer bytes than the
+                    # content length were received
+                    if content_length > 0 and download_size != content_length:
+                        raise OSError(
+                            f"downloaded {download_size} of {content_length} bytes"
+                        )
+                    success = True
+                except:
+                    if verbose:
+                        print(f"  download interrupted after {download_size} bytes")
+
+                    # reestablish request and resume the download from the
+                    # last byte written to the partial file
+                    download_size = 0
+                    if resumable and os.path.isfile(part_name):
+                        download_size = os.path.getsize(part_name)
+                    req.close()
+                    req = _request_get(
+                        url,
+                        verify=verify,
+                        timeout=timeout,
+                        max_requests=max_requests,
+                        verbose=verbose,
+                        headers=_get_range_headers(download_size, validator),
+                    )
+
+                    # start over if the server returned the complete file
+                    # instead of the requested range
+                    if not _is_range_response(req, download_size):
+                        download_size = 0
+                        if req.status_code != 200:
+                            req.close()
+                            req = _request_get(
+                                url,
+                                verify=verify,
+                                timeout=timeout,
+                                max_requests=max_requests,
+                                verbose=verbose,
+                            )
+                        content_length = _get_content_length(req)
+                        resumable = _accepts_ranges(req)
+                        validator = req.headers.get(
+                            "ETag", req.headers.get("Last-Modified")
+                        )
+                    elif verbose:
+                        print(f"  resuming download at byte {download_size}")
+
+                    # try to download the data again
+                    continue
+
+                # terminate the download attempt loop
+                if success:
+                    os.replace(part_name, file_name)
+                    break
+
+            # remove the partial file if the download failed
+            if not success and os.path.isfile(part_name):
+                os.remove(part_name)
 
-            # try to download the data again
-            continue
+            # add the downloaded file to the download cache
+            if success and download_cache is not None:
+                download_cache.store(url, file_name, req.headers)
 
-        # terminate the download attempt loop
+        # record the download size
         if success:
-            break
+            step["output_size"] = os.path.getsize(file_name)
+        else:
+            step["returncode"] = 1
 
     # write the total download time
     toc = timeit.default_timer()
@@ -447,21 +684,25 @@ def download_and_unzip(
     # Unzip the file, and delete zip file if successful.
     if "zip" in os.path.basename(file_name) or "exe" in os.path.basename(file_name):
         z = pymakeZipFile(file_name)
-        try:
-            # write a message
-            if not verbose:
-                sys.stdout.write("\n")
-            print(f"uncompressing...'{file_name}'")
-
-            # extract the files
-            z.extractall(pth)
-        except:
-            p = "Could not unzip the file.  Stopping."
-            raise Exception(p)
+        with _profile_step(os.path.basename(file_name), "extract") as step:
+            try:
+                # write a message
+                if not verbose:
+                    sys.stdout.write("\n")
+                print(f"uncompressing...'{file_name}'")
+
+                # extract the files
+                z.extractall(pth)
+            except:
+                p = "Could not unzip the file.  Stopping."
+                raise Exception(p)
+            step["output_size"] = sum(info.file_size for info in z.infolist())
         z.close()
     elif "tar" in os.path.basename(file_name):
         ar = tarfile.open(file_name)
-        ar.extractall(path=pth)
+        with _profile_step(os.path.basename(file_name), "extract") as step:
+            ar.extractall(path=pth)
+            step["output_size"] = sum(member.size for member in ar.getmembers())
         ar.close()
 
     # delete the zipfile
@@ -827,6 +1068,7 @@ def getmfexes(
     exes=None,
     verbose=False,
     verify=True,
+    cache=True,
 ):
     """Get the latest MODFLOW binary executables from a github site
     (https://github.com/MODFLOW-USGS/executables) for the specified operating
@@ -849,6 +1091,10 @@ def getmfexes(
         boolean indicating if output will be printed to the terminal
     verify : bool
         boolean indicating if the url request should be verified
+    cache : bool or str
+        boolean indicating if the download cache in the pymake user cache
+        directory is used or the path to a download cache directory
+        (default is True)
 
     """
     # set download directory to path in case a selection of files
@@ -879,6 +1125,7 @@ def getmfexes(
         download_dir,
         verbose=verbose,
         verify=verify,
+        cache=cache,
     )
 
     if exes is not None:
@@ -912,6 +1159,7 @@ def getmfnightly(
     exes=None,
     verbose=False,
     verify=True,
+    cache=True,
 ):
     """Get the latest MODFLOW 6 binary nightly-build executables from github
     (https://github.com/MODFLOW-USGS/modflow6-nightly-build/) for the specified
@@ -931,6 +1179,10 @@ def getmfnightly(
         boolean indicating if output will be printed to the terminal
     verify : bool
         boolean indicating if the url request should be verified
+    cache : bool or str
+        boolean indicating if the download cache in the pymake user cache
+        directory is used or the path to a download cache directory
+        (default is True)
 
     """
     # set download directory to path in case a selection of files
@@ -959,6 +1211,7 @@ def getmfnightly(
         download_dir,
         verbose=verbose,
         verify=verify,
+        cache=cache,
     )
 
     if exes is not None: